@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = "apps.accounts"
+
+    def ready(self):
+        # Register the user cache invalidation signal handlers
+        from . import signals  # noqa: F401
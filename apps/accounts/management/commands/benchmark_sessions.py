@@ -0,0 +1,72 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.accounts.models import User
+
+SESSION_TIERS = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookie': 'django.contrib.sessions.backends.signed_cookies',
+}
+PAGES = ['dashboard', 'customer-list', 'product-list', 'invoice-list', 'payment-list']
+
+
+class Command(BaseCommand):
+    help = (
+        "Requests the dashboard and list pages as a logged-in user under every session "
+        "tier, with and without the per-process user cache, and reports the session and "
+        "user queries each request costs. Runs in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=20,
+            help="Requests per page and configuration (default: 20).",
+        )
+
+    def handle(self, *args, **options):
+        rounds = options['requests']
+        urls = [reverse(name) for name in PAGES]
+        self.stdout.write(
+            f"{'session tier':<14} {'user cache':<11} {'session':>8} {'user':>6} {'total':>7} {'ms':>8}   per request"
+        )
+        with transaction.atomic():
+            user = User.objects.create_user('session-benchmark@example.invalid', None, is_staff=True)
+            for tier, engine in SESSION_TIERS.items():
+                for user_cache in (0, settings.USER_CACHE_TIMEOUT or 30):
+                    with override_settings(
+                        SESSION_ENGINE=engine, USER_CACHE_TIMEOUT=user_cache,
+                        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+                    ):
+                        self.stdout.write(self.run_tier(tier, user_cache, user, urls, rounds))
+            transaction.set_rollback(True)
+
+    def run_tier(self, tier, user_cache, user, urls, rounds):
+        client = Client()
+        client.force_login(user)
+        for url in urls:  # Warm the session and user caches
+            client.get(url)
+
+        session_queries = user_queries = total = 0
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for url in urls:
+                with CaptureQueriesContext(connection) as queries:
+                    response = client.get(url)
+                if response.status_code != 200:
+                    return f"{tier:<14} GET {url} returned {response.status_code}"
+                total += len(queries)
+                session_queries += sum('"django_session"' in q['sql'] for q in queries)
+                user_queries += sum('FROM "accounts_user"' in q['sql'] for q in queries)
+        elapsed = (time.perf_counter() - started) * 1000
+        count = rounds * len(urls)
+        return (
+            f"{tier:<14} {'on' if user_cache else 'off':<11} {session_queries / count:>8.2f} "
+            f"{user_queries / count:>6.2f} {total / count:>7.2f} {elapsed / count:>8.2f}"
+        )
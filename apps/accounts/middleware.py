@@ -0,0 +1,62 @@
+# accounts/middleware.py
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.core.cache import caches
+from django.utils.crypto import constant_time_compare
+from django.utils.functional import SimpleLazyObject
+
+
+def user_cache_key(user_id) -> str:
+    return f'accounts:user:{user_id}'
+
+
+def invalidate_cached_user(user_id):
+    """Drops this process's cached copy of a user (see CachedAuthenticationMiddleware)."""
+    caches[settings.USER_CACHE_ALIAS].delete(user_cache_key(user_id))
+
+
+def get_cached_user(request):
+    """
+    Returns the session's user from the per-process user cache when the
+    entry was loaded for the same session auth hash, falling back to
+    django.contrib.auth.get_user() (and filling the cache) otherwise.
+    """
+    timeout = settings.USER_CACHE_TIMEOUT
+    session = request.session
+    user_id = session.get(SESSION_KEY)
+    backend_path = session.get(BACKEND_SESSION_KEY)
+    session_hash = session.get(HASH_SESSION_KEY)
+    if not timeout or user_id is None or not session_hash:
+        return get_user(request)
+
+    cache = caches[settings.USER_CACHE_ALIAS]
+    key = user_cache_key(user_id)
+    cached = cache.get(key)
+    if cached is not None:
+        cached_backend, user_hash, user = cached
+        if cached_backend == backend_path and constant_time_compare(session_hash, user_hash):
+            return user
+
+    user = get_user(request)
+    if user.is_authenticated:
+        cache.set(key, (backend_path, user.get_session_auth_hash(), user), timeout)
+    return user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """
+    AuthenticationMiddleware that resolves request.user through a short-lived
+    per-process cache of the accounts.User row, saving the user query on
+    every request after the first.
+
+    An entry only matches sessions whose stored auth hash equals the cached
+    user's, so a password change made in this process takes effect at once.
+    Saving or deleting a user drops this process's entry; other processes
+    pick up the change within USER_CACHE_TIMEOUT seconds. Set it to 0 to
+    disable the cache.
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: get_cached_user(request))
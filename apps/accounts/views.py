@@ -4,6 +4,7 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.shortcuts import render
 from django.urls import reverse_lazy
 from django.views.generic import TemplateView
+from django.conf import settings
 from django.db.models import Sum, Count, F
 from django.utils import timezone
 
@@ -11,7 +12,9 @@ from .forms import CustomLoginForm
 from apps.billing.models import Invoice
 from apps.payments.models import Payment
 from apps.catalog.models import Product
-from apps.reports.services import get_monthly_revenue, get_total_due, get_invoice_status_counts, get_top_customers
+from apps.catalog.services import with_current_stock
+from common.concurrency import Unavailable, fan_out
+from common.db_routers import reporting_reads
 
 
 class CustomLoginView(LoginView):
@@ -26,36 +29,63 @@ class DashboardView(LoginRequiredMixin, TemplateView):
     template_name = 'accounts/dashboard.html'
     login_url = reverse_lazy('login')
 
+    def dispatch(self, request, *args, **kwargs):
+        # Every figure here is a reporting read. The widgets inherit the block
+        # on their threads; render inside it too, for anything the template reads.
+        with reporting_reads():
+            response = super().dispatch(request, *args, **kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+        return response
+
     def get_context_data(self, **kwargs):
+        # Only the dashboard needs the report services; importing them here
+        # keeps them out of the startup of every other view and command.
+        from apps.reports.services import (
+            get_invoice_status_counts, get_monthly_revenue, get_top_customers, get_total_due,
+        )
+
         context = super().get_context_data(**kwargs)
-        
-        # --- Core Metrics ---
-        context['total_invoices'] = Invoice.objects.count()
-        context['paid_invoices'] = Invoice.objects.filter(status=Invoice.Status.PAID).count()
-        context['total_revenue'] = Payment.objects.aggregate(Sum('amount'))['amount__sum'] or 0
-        context['total_due'] = get_total_due()
-
-        # --- Actionable Lists ---
-        context['overdue_invoices'] = Invoice.objects.filter(
-            due_at__lt=timezone.now().date()
-        ).exclude(status__in=[Invoice.Status.PAID, Invoice.Status.CANCELLED]).select_related('customer')[:5]
-
-        context['top_customers'] = get_top_customers(limit=5)
-
-        # Low stock alert (products with less than 10 units)
-        context['low_stock_products'] = Product.objects.filter(
-            track_inventory=True
-        ).filter(stock_quantity__lt=10).order_by('stock_quantity')[:5]
-
-        # --- Data for Charts ---
-        # Monthly Revenue (for the last 12 months)
-        monthly_revenue_qs = get_monthly_revenue(years=1)
-        context['revenue_chart_labels'] = [item['month'].strftime('%b %Y') for item in monthly_revenue_qs]
-        context['revenue_chart_data'] = [float(item['revenue']) for item in monthly_revenue_qs]
+        today = timezone.now().date()
+
+        # Every widget is an independent read, so they run concurrently and a
+        # slow or failing one is shown as unavailable instead of failing the page
+        widgets = fan_out({
+            # --- Core Metrics ---
+            'total_invoices': lambda: Invoice.objects.count(),
+            'paid_invoices': lambda: Invoice.objects.filter(status=Invoice.Status.PAID).count(),
+            'total_revenue': lambda: Payment.objects.aggregate(Sum('amount'))['amount__sum'] or 0,
+            'total_due': get_total_due,
+
+            # --- Actionable Lists ---
+            'overdue_invoices': lambda: list(
+                Invoice.objects.filter(due_at__lt=today)
+                .exclude(status__in=[Invoice.Status.PAID, Invoice.Status.CANCELLED])
+                .select_related('customer')[:5]
+            ),
+            'top_customers': lambda: list(get_top_customers(limit=5)),
+            # Low stock alert (products with less than 10 units)
+            'low_stock_products': lambda: list(
+                with_current_stock(Product.objects.filter(track_inventory=True))
+                .filter(current_stock__lt=10).order_by('current_stock')[:5]
+            ),
+
+            # --- Data for Charts ---
+            # Monthly Revenue (for the last 12 months)
+            'monthly_revenue': lambda: get_monthly_revenue(years=1),
+            'status_counts': get_invoice_status_counts,
+        }, timeout=settings.DASHBOARD_WIDGET_TIMEOUT, workers=settings.DASHBOARD_FANOUT_WORKERS)
+
+        context.update(widgets)
+        context['unavailable'] = {name for name, value in widgets.items() if isinstance(value, Unavailable)}
+
+        monthly_revenue = widgets['monthly_revenue'] or []
+        context['revenue_chart_labels'] = [item['month'].strftime('%b %Y') for item in monthly_revenue]
+        context['revenue_chart_data'] = [float(item['revenue']) for item in monthly_revenue]
 
         # Invoice Status Breakdown
-        status_counts = get_invoice_status_counts()
+        status_counts = widgets['status_counts'] or {}
         context['status_chart_labels'] = [dict(Invoice.Status.choices).get(status, status) for status in status_counts.keys()]
         context['status_chart_data'] = list(status_counts.values())
 
-        return context
\ No newline at end of file
+        return context
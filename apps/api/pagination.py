@@ -0,0 +1,13 @@
+# api/pagination.py
+from rest_framework.pagination import CursorPagination
+
+
+class ApiCursorPagination(CursorPagination):
+    """
+    Keyset pagination on the primary key: every page is one indexed range
+    query, with no COUNT(*) and no OFFSET, however deep the client pages.
+    """
+    ordering = '-id'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
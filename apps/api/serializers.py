@@ -0,0 +1,165 @@
+# api/serializers.py
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
+
+from apps.billing.models import Invoice, InvoiceItem
+from apps.catalog.models import Product, validate_inventory_fields
+from apps.customers.models import Customer
+from apps.payments.models import Payment
+
+
+def requested_fields(request):
+    """The field names listed in ?fields=a,b,c on a read request, or None for all fields."""
+    if request is None or request.method != 'GET':
+        return None
+    value = request.query_params.get('fields')
+    if not value:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class ApiSerializerMixin:
+    """
+    Shared behaviour of the API's top-level serializers:
+
+    * Sparse fieldsets: on GET, fields not named in ?fields= are dropped (the
+      views also skip the joins that only those fields need).
+    * Bulk writes: uniqueness is checked by the bulk services with one query
+      for the whole batch, so the per-row UniqueValidator queries are removed.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        wanted = requested_fields(self.context.get('request'))
+        if wanted:
+            for name in set(self.fields) - wanted:
+                self.fields.pop(name)
+        if self.context.get('bulk'):
+            for field in self.fields.values():
+                field.validators = [v for v in field.validators if not isinstance(v, UniqueValidator)]
+
+
+# --- Customers ---
+
+class CustomerSerializer(ApiSerializerMixin, serializers.ModelSerializer):
+    invoice_count = serializers.IntegerField(source='stats.invoice_count', read_only=True)
+    lifetime_billed = serializers.DecimalField(
+        source='stats.lifetime_billed', max_digits=14, decimal_places=2, read_only=True)
+    lifetime_paid = serializers.DecimalField(
+        source='stats.lifetime_paid', max_digits=14, decimal_places=2, read_only=True)
+    outstanding = serializers.DecimalField(
+        source='stats.outstanding', max_digits=14, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = Customer
+        fields = [
+            'id', 'name', 'email', 'phone', 'address', 'is_active',
+            'invoice_count', 'lifetime_billed', 'lifetime_paid', 'outstanding',
+            'created_at', 'updated_at',
+        ]
+        read_only_fields = ['is_active']
+
+
+# --- Products ---
+
+class ProductSerializer(ApiSerializerMixin, serializers.ModelSerializer):
+    current_stock = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Product
+        fields = [
+            'id', 'sku', 'name', 'description', 'unit_price', 'track_inventory',
+            'stock_quantity', 'current_stock', 'is_active', 'created_at', 'updated_at',
+        ]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Inventory settings are fixed at creation; stock then changes
+        # through the stock ledger, never by overwriting the quantity.
+        if self.context.get('updating'):
+            for name in ('track_inventory', 'stock_quantity'):
+                if name in self.fields:
+                    self.fields[name].read_only = True
+
+    def validate(self, attrs):
+        if not self.context.get('updating'):
+            try:
+                validate_inventory_fields(attrs.get('track_inventory', False), attrs.get('stock_quantity'))
+            except DjangoValidationError as e:
+                raise serializers.ValidationError(e.message_dict)
+        return attrs
+
+
+# --- Invoices ---
+
+class InvoiceItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = InvoiceItem
+        fields = ['id', 'product', 'description', 'quantity', 'unit_price', 'total']
+
+
+class InvoiceSerializer(ApiSerializerMixin, serializers.ModelSerializer):
+    customer_name = serializers.CharField(source='customer.name', read_only=True)
+    amount_paid = serializers.DecimalField(source='paid_total', max_digits=12, decimal_places=2, read_only=True)
+    balance_due = serializers.DecimalField(source='balance', max_digits=12, decimal_places=2, read_only=True)
+    items = InvoiceItemSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Invoice
+        fields = [
+            'id', 'invoice_number', 'customer', 'customer_name', 'status', 'issued_at', 'due_at',
+            'subtotal', 'tax_amount', 'total_amount', 'amount_paid', 'balance_due', 'notes',
+            'items', 'created_at', 'updated_at',
+        ]
+        read_only_fields = fields
+
+
+class InvoiceLineInputSerializer(serializers.Serializer):
+    product_id = serializers.IntegerField(min_value=1)
+    quantity = serializers.IntegerField(min_value=1)
+
+
+class InvoiceCreateSerializer(serializers.Serializer):
+    """Input for new draft invoices; ids are checked in bulk by the billing service."""
+    customer_id = serializers.IntegerField(min_value=1)
+    issued_at = serializers.DateField(required=False)
+    due_at = serializers.DateField()
+    notes = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    items = InvoiceLineInputSerializer(many=True, required=False)
+
+    def validate(self, attrs):
+        if attrs.get('issued_at') and attrs['due_at'] < attrs['issued_at']:
+            raise serializers.ValidationError({'due_at': "The due date cannot be before the issue date."})
+        return attrs
+
+
+class InvoiceUpdateSerializer(serializers.Serializer):
+    due_at = serializers.DateField(required=False)
+    notes = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+
+# --- Payments ---
+
+class PaymentSerializer(ApiSerializerMixin, serializers.ModelSerializer):
+    invoice_number = serializers.CharField(source='invoice.invoice_number', read_only=True)
+
+    class Meta:
+        model = Payment
+        fields = [
+            'id', 'invoice', 'invoice_number', 'amount', 'method', 'transaction_id',
+            'paid_at', 'notes', 'created_at',
+        ]
+        read_only_fields = fields
+
+
+class PaymentCreateSerializer(serializers.Serializer):
+    """Input for new payments; invoices and overpayment are checked in bulk by the payment service."""
+    invoice_id = serializers.IntegerField(min_value=1)
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'))
+    method = serializers.ChoiceField(choices=Payment._meta.get_field('method').choices)
+    paid_at = serializers.DateTimeField(required=False)
+    transaction_id = serializers.CharField(required=False, allow_blank=True, allow_null=True, max_length=255)
+    notes = serializers.CharField(required=False, allow_blank=True)
@@ -0,0 +1,280 @@
+import datetime
+from decimal import Decimal
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from apps.accounts.models import User
+from apps.billing.models import Invoice, StockReservation
+from apps.billing.services import bulk_create_invoices
+from apps.catalog.cache import get_product_snapshots
+from apps.catalog.models import Product
+from apps.catalog.services import get_current_stock
+from apps.customers.models import Customer, CustomerStats
+from apps.payments.models import Payment
+from apps.payments.services import bulk_record_payments
+
+
+@override_settings(CATALOG_CACHE_ALIAS='default', CATALOG_CACHE_VERSION_CHECK=0)
+class ApiQueryCountTests(APITestCase):
+    """
+    Every endpoint must cost the same number of queries whether it returns or
+    writes two objects or twenty. Authentication is forced so only the view's
+    own queries are counted.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user('api@example.com', 'secret', is_staff=True)
+        self.client.force_authenticate(self.user)
+        self.widget = Product.objects.create(
+            name='Widget', unit_price=Decimal('2.50'), track_inventory=True, stock_quantity=1000,
+        )
+        self.service = Product.objects.create(name='Consulting', unit_price=Decimal('100.00'))
+
+    def make_data(self, count):
+        """Creates ``count`` customers, each with an invoice of two items and a part payment."""
+        start = Customer.objects.count()
+        customers = Customer.objects.bulk_create([
+            Customer(name=f'Customer {start + i}', email=f'c{start + i}@example.com') for i in range(count)
+        ])
+        invoices = bulk_create_invoices([
+            {
+                'customer_id': customer.pk,
+                'due_at': datetime.date(2030, 1, 1),
+                'items': [
+                    {'product_id': self.widget.pk, 'quantity': 2},
+                    {'product_id': self.service.pk, 'quantity': 1},
+                ],
+            }
+            for customer in customers
+        ])
+        bulk_record_payments([
+            {'invoice_id': invoice.pk, 'amount': Decimal('10.00'), 'method': 'cash'} for invoice in invoices
+        ])
+        return customers, invoices
+
+    def count_queries(self, method, url, data=None, expected_status=200):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data, format='json')
+        self.assertEqual(response.status_code, expected_status, response.content)
+        return len(queries), response
+
+    def assertConstantQueries(self, expected, method, url, make_payload=None, expected_status=200):
+        """Runs the request at two data sizes and checks both cost ``expected`` queries."""
+        for size in (2, 20):
+            if make_payload is None:
+                self.make_data(size)
+                payload = None
+            else:
+                payload = make_payload(size)
+            count, response = self.count_queries(method, url, payload, expected_status)
+            self.assertEqual(count, expected, f"{method.upper()} {url} with {size} objects")
+        return response
+
+    # --- CustomerSerializer ---
+
+    def test_customer_list(self):
+        response = self.assertConstantQueries(1, 'get', reverse('api-customer-list') + '?page_size=100')
+        row = response.data['results'][0]
+        self.assertEqual(row['invoice_count'], 1)
+        self.assertEqual(row['outstanding'], '105.50')
+
+    def test_customer_detail(self):
+        customers, _ = self.make_data(1)
+        count, _ = self.count_queries('get', reverse('api-customer-detail', args=[customers[0].pk]))
+        self.assertEqual(count, 1)
+
+    def test_customer_sparse_fields_skip_stats_join(self):
+        self.make_data(3)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('api-customer-list') + '?fields=id,email')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'email'})
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('JOIN', queries[0]['sql'])
+
+    def test_customer_bulk_create_and_update(self):
+        offset = iter(range(0, 1000, 100))
+
+        def payload(size):
+            base = next(offset)
+            return [{'name': f'New {base + i}', 'email': f'new{base + i}@example.com'} for i in range(size)]
+
+        # Savepoint, uniqueness check, INSERT, release, re-read with stats
+        self.assertConstantQueries(5, 'post', reverse('api-customer-bulk'), payload, 201)
+
+        def updates(size):
+            return [{'id': pk, 'phone': '555'} for pk in Customer.objects.values_list('pk', flat=True)[:size]]
+
+        # Savepoint, read, UPDATE, release, re-read; no email to check
+        response = self.assertConstantQueries(5, 'patch', reverse('api-customer-bulk'), updates)
+        self.assertEqual(response.data[0]['phone'], '555')
+
+    def test_customer_bulk_rejects_taken_email(self):
+        Customer.objects.create(name='Taken', email='taken@example.com')
+        _, response = self.count_queries(
+            'post', reverse('api-customer-bulk'), [{'name': 'X', 'email': 'taken@example.com'}], 400,
+        )
+        self.assertIn('taken@example.com', str(response.data))
+
+    # --- ProductSerializer ---
+
+    def test_product_list(self):
+        response = self.assertConstantQueries(1, 'get', reverse('api-product-list'))
+        widget = next(row for row in response.data['results'] if row['id'] == self.widget.pk)
+        self.assertEqual(widget['current_stock'], 1000)
+
+    def test_product_bulk_create_opens_stock_ledger(self):
+        offset = iter(range(0, 1000, 100))
+
+        def payload(size):
+            base = next(offset)
+            return [
+                {'sku': f'SKU-{base + i}', 'name': f'Item {base + i}', 'unit_price': '1.00',
+                 'track_inventory': True, 'stock_quantity': 5}
+                for i in range(size)
+            ]
+
+        response = self.assertConstantQueries(7, 'post', reverse('api-product-bulk'), payload, 201)
+        self.assertEqual(response.data[0]['current_stock'], 5)
+        self.assertEqual(get_current_stock(response.data[0]['id']), 5)
+
+    def test_product_update_cannot_overwrite_stock(self):
+        url = reverse('api-product-detail', args=[self.widget.pk])
+        count, response = self.count_queries('patch', url, {'unit_price': '3.00', 'stock_quantity': 1})
+        self.assertEqual(count, 6)
+        self.assertEqual(response.data['unit_price'], '3.00')
+        self.assertEqual(response.data['current_stock'], 1000)
+
+    def test_product_writes_need_staff(self):
+        self.client.force_authenticate(User.objects.create_user('plain@example.com', 'secret'))
+        self.count_queries('post', reverse('api-product-list'), {'name': 'X', 'unit_price': '1.00'}, 403)
+        self.assertFalse(Product.objects.filter(name='X').exists())
+
+    # --- InvoiceSerializer ---
+
+    def test_invoice_list(self):
+        response = self.assertConstantQueries(2, 'get', reverse('api-invoice-list') + '?page_size=100')
+        row = response.data['results'][0]
+        self.assertEqual(len(row['items']), 2)
+        self.assertEqual(row['amount_paid'], '10.00')
+        self.assertEqual(row['balance_due'], '105.50')
+
+    def test_invoice_sparse_fields_skip_items(self):
+        self.make_data(5)
+        count, response = self.count_queries('get', reverse('api-invoice-list') + '?fields=id,balance_due')
+        self.assertEqual(count, 1)
+        self.assertEqual(set(response.data['results'][0]), {'id', 'balance_due'})
+
+    def test_invoice_bulk_create(self):
+        customer = Customer.objects.create(name='Buyer', email='buyer@example.com')
+        CustomerStats.objects.create(customer=customer)  # Not the first activity
+        get_product_snapshots([self.widget.pk, self.service.pk])  # Warm the catalog cache
+
+        def payload(size):
+            return [
+                {'customer_id': customer.pk, 'due_at': '2030-01-01',
+                 'items': [{'product_id': self.widget.pk, 'quantity': 1},
+                           {'product_id': self.service.pk, 'quantity': 2}]}
+                for _ in range(size)
+            ]
+
+        response = self.assertConstantQueries(12, 'post', reverse('api-invoice-bulk'), payload, 201)
+        self.assertEqual(response.data[0]['total_amount'], '222.75')
+        self.assertEqual(get_current_stock(self.widget.pk), 1000)
+        self.assertEqual(
+            StockReservation.objects.filter(product=self.widget, status=StockReservation.Status.ACTIVE).count(), 22,
+        )
+
+    def test_invoice_bulk_create_rolls_back_on_missing_stock(self):
+        customer = Customer.objects.create(name='Buyer', email='buyer@example.com')
+        payload = [{'customer_id': customer.pk, 'due_at': '2030-01-01',
+                    'items': [{'product_id': self.widget.pk, 'quantity': 1001}]}]
+        self.count_queries('post', reverse('api-invoice-bulk'), payload, 400)
+        self.assertFalse(Invoice.objects.exists())
+
+    # --- PaymentSerializer ---
+
+    def test_payment_list(self):
+        response = self.assertConstantQueries(1, 'get', reverse('api-payment-list') + '?page_size=100')
+        self.assertTrue(response.data['results'][0]['invoice_number'].startswith('INV-'))
+
+    def test_payment_bulk_create_settles_invoices(self):
+        customer = Customer.objects.create(name='Buyer', email='buyer@example.com')
+
+        def payload(size):
+            invoices = bulk_create_invoices([
+                {'customer_id': customer.pk, 'due_at': '2030-01-01',
+                 'items': [{'product_id': self.widget.pk, 'quantity': 2},
+                           {'product_id': self.service.pk, 'quantity': 1}]}
+                for _ in range(size)
+            ])
+            return [{'invoice_id': invoice.pk, 'amount': '115.50', 'method': 'card'} for invoice in invoices]
+
+        self.assertConstantQueries(15, 'post', reverse('api-payment-bulk'), payload, 201)
+        self.assertEqual(Payment.objects.count(), 22)
+        self.assertFalse(Invoice.objects.exclude(status=Invoice.Status.PAID).exists())
+        self.assertFalse(StockReservation.objects.filter(status=StockReservation.Status.ACTIVE).exists())
+        self.assertEqual(get_current_stock(self.widget.pk), 1000 - 2 * 22)
+
+    def test_zero_payment_is_refused(self):
+        [invoice] = self.make_data(1)[1]
+        payload = {'invoice_id': invoice.pk, 'amount': '0.00', 'method': 'cash'}
+        _, response = self.count_queries('post', reverse('api-payment-list'), payload, 400)
+        self.assertIn('amount', response.data)
+
+
+class ApiJWTAuthenticationTests(APITestCase):
+    """A valid access token authenticates and authorises without any query."""
+
+    def setUp(self):
+        self.staff = User.objects.create_user('staff@example.com', 'secret', is_staff=True)
+        self.plain = User.objects.create_user('plain@example.com', 'secret')
+
+    def obtain(self, email):
+        response = self.client.post(reverse('api-token-obtain'), {'email': email, 'password': 'secret'})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data
+
+    def request(self, method, url, token, data=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(self.client, method)(url, data, format='json', HTTP_AUTHORIZATION=f'Bearer {token}')
+        return len(queries), response
+
+    def test_token_authentication_costs_no_queries(self):
+        Customer.objects.create(name='Customer', email='c@example.com')
+        count, response = self.request('get', reverse('api-customer-list'), self.obtain('plain@example.com')['access'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(count, 1)  # The customer list itself
+
+    def test_role_claims_decide_permissions(self):
+        url = reverse('api-customer-bulk')
+        rows = [{'name': 'X', 'email': 'x@example.com'}]
+        count, response = self.request('post', url, self.obtain('plain@example.com')['access'], rows)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(count, 0)
+        _, response = self.request('post', url, self.obtain('staff@example.com')['access'], rows)
+        self.assertEqual(response.status_code, 201)
+
+    def test_invoice_created_by_token_user(self):
+        customer = Customer.objects.create(name='Customer', email='c@example.com')
+        payload = {'customer_id': customer.pk, 'due_at': '2030-01-01', 'items': []}
+        token = self.obtain('staff@example.com')['access']
+        _, response = self.request('post', reverse('api-invoice-list'), token, payload)
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(Invoice.objects.get().created_by, self.staff)
+
+    def test_refresh_reloads_role_claims(self):
+        tokens = self.obtain('plain@example.com')
+        User.objects.filter(pk=self.plain.pk).update(is_staff=True)
+        response = self.client.post(reverse('api-token-refresh'), {'refresh': tokens['refresh']})
+        _, response = self.request(
+            'post', reverse('api-customer-bulk'), response.data['access'], [{'name': 'X', 'email': 'x@example.com'}],
+        )
+        self.assertEqual(response.status_code, 201)
+
+        User.objects.filter(pk=self.plain.pk).update(is_active=False)
+        response = self.client.post(reverse('api-token-refresh'), {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, 401)
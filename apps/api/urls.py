@@ -0,0 +1,18 @@
+# api/urls.py
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+
+from . import views
+
+router = DefaultRouter()
+router.register('customers', views.CustomerViewSet, basename='api-customer')
+router.register('products', views.ProductViewSet, basename='api-product')
+router.register('invoices', views.InvoiceViewSet, basename='api-invoice')
+router.register('payments', views.PaymentViewSet, basename='api-payment')
+
+urlpatterns = [
+    path('auth/token/', TokenObtainPairView.as_view(), name='api-token-obtain'),
+    path('auth/token/refresh/', TokenRefreshView.as_view(), name='api-token-refresh'),
+    path('', include(router.urls)),
+]
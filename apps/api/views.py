@@ -0,0 +1,266 @@
+# api/views.py
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import F, OuterRef, Prefetch, Subquery, Sum
+from django.db.models.functions import Coalesce
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import MethodNotAllowed, ValidationError
+from rest_framework.response import Response
+
+from apps.billing.models import Invoice, InvoiceItem
+from apps.billing.services import bulk_create_invoices, bulk_update_invoices
+from apps.catalog.models import Product
+from apps.catalog.services import bulk_create_products, bulk_update_products, with_current_stock
+from apps.customers.models import Customer
+from apps.customers.services import bulk_create_customers, bulk_update_customers
+from apps.payments.models import Payment
+from apps.payments.services import bulk_record_payments
+from common.permissions import IsStaffOrAdmin
+
+from .serializers import (
+    CustomerSerializer,
+    InvoiceCreateSerializer,
+    InvoiceSerializer,
+    InvoiceUpdateSerializer,
+    PaymentCreateSerializer,
+    PaymentSerializer,
+    ProductSerializer,
+    requested_fields,
+)
+
+
+@contextmanager
+def service_errors():
+    """Turns the ValueError/ValidationError raised by the service layer into a 400 response."""
+    try:
+        yield
+    except DjangoValidationError as e:
+        raise ValidationError(e.messages)
+    except ValueError as e:
+        raise ValidationError(str(e))
+
+
+def _flag(value):
+    return None if value is None else value.lower() in ('1', 'true', 'yes')
+
+
+def _id_param(request, name):
+    value = request.query_params.get(name)
+    if not value:
+        return None
+    if not value.isdigit():
+        raise ValidationError({name: "Must be an integer id."})
+    return int(value)
+
+
+class ServiceViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    Read endpoints plus create/update endpoints that go through the batched
+    service functions, one object or many at a time:
+
+        POST  /<resource>/        create one
+        PATCH /<resource>/<id>/   update one
+        POST  /<resource>/bulk/   create a list
+        PATCH /<resource>/bulk/   update a list of objects, each with its "id"
+
+    Subclasses name the service functions in ``create_function`` and
+    ``update_function`` (or override create_objects()/update_objects());
+    writes without one are refused with 405. Responses are always rendered with ``serializer_class`` from the view's
+    tuned queryset, so a write costs a constant number of extra queries.
+    """
+    create_serializer_class = None
+    update_serializer_class = None
+    # Batched services taking a list of validated rows and returning the saved objects in order
+    create_function = None
+    update_function = None
+    max_bulk_size = 500
+
+    def get_serializer_class(self):
+        if self.request.method == 'POST' and self.create_serializer_class is not None:
+            return self.create_serializer_class
+        if self.request.method in ('PUT', 'PATCH') and self.update_serializer_class is not None:
+            return self.update_serializer_class
+        return self.serializer_class
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['bulk'] = self.action == 'bulk'
+        context['updating'] = self.request.method in ('PUT', 'PATCH')
+        return context
+
+    def get_permissions(self):
+        # Mass writes are for staff and admins only
+        if self.action == 'bulk':
+            return [IsStaffOrAdmin()]
+        return super().get_permissions()
+
+    def create_objects(self, rows: list) -> list:
+        if self.create_function is None:
+            raise MethodNotAllowed(self.request.method)
+        return self.create_function(rows)
+
+    def update_objects(self, rows: list) -> list:
+        if self.update_function is None:
+            raise MethodNotAllowed(self.request.method)
+        return self.update_function(rows)
+
+    def _render(self, objects: list) -> list:
+        fresh = self.get_queryset().in_bulk([obj.pk for obj in objects])
+        return self.serializer_class(
+            [fresh[obj.pk] for obj in objects], many=True, context=self.get_serializer_context(),
+        ).data
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        with service_errors():
+            objects = self.create_objects([serializer.validated_data])
+        return Response(self._render(objects)[0], status=status.HTTP_201_CREATED)
+
+    def update(self, request, *args, **kwargs):
+        instance = self.get_object()
+        serializer = self.get_serializer(instance, data=request.data, partial=kwargs.get('partial', False))
+        serializer.is_valid(raise_exception=True)
+        with service_errors():
+            objects = self.update_objects([{'id': instance.pk, **serializer.validated_data}])
+        return Response(self._render(objects)[0])
+
+    def partial_update(self, request, *args, **kwargs):
+        return self.update(request, *args, partial=True, **kwargs)
+
+    @action(detail=False, methods=['post', 'patch'], url_path='bulk')
+    def bulk(self, request):
+        rows = request.data
+        if not isinstance(rows, list) or not rows:
+            raise ValidationError("Expected a non-empty list of objects.")
+        if len(rows) > self.max_bulk_size:
+            raise ValidationError(f"At most {self.max_bulk_size} objects can be sent at once.")
+
+        if request.method == 'POST':
+            serializer = self.get_serializer(data=rows, many=True)
+            serializer.is_valid(raise_exception=True)
+            with service_errors():
+                objects = self.create_objects(serializer.validated_data)
+            return Response(self._render(objects), status=status.HTTP_201_CREATED)
+
+        ids = [row.get('id') if isinstance(row, dict) else None for row in rows]
+        if not all(isinstance(pk, int) for pk in ids):
+            raise ValidationError("Every object must include its integer id.")
+        serializer = self.get_serializer(data=rows, many=True, partial=True)
+        serializer.is_valid(raise_exception=True)
+        with service_errors():
+            objects = self.update_objects([{'id': pk, **data} for pk, data in zip(ids, serializer.validated_data)])
+        return Response(self._render(objects))
+
+
+class CustomerViewSet(ServiceViewSet):
+    """Customers with their lifetime totals. Filter with ?is_active=true|false."""
+    serializer_class = CustomerSerializer
+    create_function = staticmethod(bulk_create_customers)
+    update_function = staticmethod(bulk_update_customers)
+
+    def get_queryset(self):
+        queryset = Customer.objects.all()
+        wanted = requested_fields(self.request)
+        stats_fields = {'invoice_count', 'lifetime_billed', 'lifetime_paid', 'outstanding'}
+        if wanted is None or wanted & stats_fields:
+            queryset = queryset.select_related('stats')
+        is_active = _flag(self.request.query_params.get('is_active'))
+        if is_active is not None:
+            queryset = queryset.filter(is_active=is_active)
+        return queryset
+
+
+class ProductViewSet(ServiceViewSet):
+    """
+    Products with live stock from the stock ledger. Filter with
+    ?is_active=true|false or ?sku=. Creating or changing products requires
+    staff or admin rights.
+    """
+    serializer_class = ProductSerializer
+    create_function = staticmethod(bulk_create_products)
+    update_function = staticmethod(bulk_update_products)
+
+    def get_permissions(self):
+        if self.request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            return [IsStaffOrAdmin()]
+        return super().get_permissions()
+
+    def get_queryset(self):
+        queryset = Product.objects.all()
+        wanted = requested_fields(self.request)
+        if wanted is None or 'current_stock' in wanted:
+            queryset = with_current_stock(queryset)
+        is_active = _flag(self.request.query_params.get('is_active'))
+        if is_active is not None:
+            queryset = queryset.filter(is_active=is_active)
+        sku = self.request.query_params.get('sku')
+        if sku:
+            queryset = queryset.filter(sku=sku)
+        return queryset
+
+
+class InvoiceViewSet(ServiceViewSet):
+    """
+    Invoices with their items, amount paid and balance due. Filter with
+    ?customer=<id> or ?status=. New invoices are created as drafts; only the
+    due date and notes can be changed afterwards.
+    """
+    serializer_class = InvoiceSerializer
+    create_serializer_class = InvoiceCreateSerializer
+    update_serializer_class = InvoiceUpdateSerializer
+    update_function = staticmethod(bulk_update_invoices)
+
+    def get_queryset(self):
+        paid = (
+            Payment.objects.filter(invoice=OuterRef('pk'))
+            .values('invoice').annotate(total=Sum('amount')).values('total')
+        )
+        queryset = Invoice.objects.annotate(
+            paid_total=Coalesce(Subquery(paid), Decimal('0.00')),
+            balance=F('total_amount') - F('paid_total'),
+        )
+        wanted = requested_fields(self.request)
+        if wanted is None or 'customer_name' in wanted:
+            queryset = queryset.select_related('customer')
+        if wanted is None or 'items' in wanted:
+            queryset = queryset.prefetch_related(
+                Prefetch('items', queryset=InvoiceItem.objects.order_by('pk'))
+            )
+        customer = _id_param(self.request, 'customer')
+        if customer:
+            queryset = queryset.filter(customer_id=customer)
+        invoice_status = self.request.query_params.get('status')
+        if invoice_status:
+            queryset = queryset.filter(status=invoice_status.upper())
+        return queryset
+
+    def create_objects(self, rows):
+        return bulk_create_invoices(
+            [
+                {**row, 'items': [dict(line) for line in row.get('items', [])]}
+                for row in rows
+            ],
+            created_by_id=self.request.user.id,
+        )
+
+
+class PaymentViewSet(ServiceViewSet):
+    """Payments, newest first. Filter with ?invoice=<id>. Payments cannot be changed once recorded."""
+    serializer_class = PaymentSerializer
+    create_serializer_class = PaymentCreateSerializer
+    create_function = staticmethod(bulk_record_payments)
+    http_method_names = ['get', 'post', 'head', 'options']
+
+    def get_queryset(self):
+        queryset = Payment.objects.all()
+        wanted = requested_fields(self.request)
+        if wanted is None or 'invoice_number' in wanted:
+            queryset = queryset.select_related('invoice')
+        invoice = _id_param(self.request, 'invoice')
+        if invoice:
+            queryset = queryset.filter(invoice_id=invoice)
+        return queryset
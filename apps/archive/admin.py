@@ -0,0 +1,36 @@
+# archive/admin.py
+
+from django.contrib import admin
+
+from .models import ArchivedInvoice, ArchivedPayment
+
+
+class ReadOnlyAdmin(admin.ModelAdmin):
+    """Archived records are history: they can be looked up but not changed."""
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedInvoice)
+class ArchivedInvoiceAdmin(ReadOnlyAdmin):
+    list_display = ('invoice_number', 'customer', 'status', 'issued_at', 'total_amount', 'archived_at')
+    list_filter = ('status',)
+    search_fields = ('invoice_number', 'customer__name')
+    list_select_related = ('customer',)
+    show_full_result_count = False
+
+
+@admin.register(ArchivedPayment)
+class ArchivedPaymentAdmin(ReadOnlyAdmin):
+    list_display = ('invoice', 'customer', 'amount', 'method', 'paid_at', 'transaction_id')
+    list_filter = ('method',)
+    search_fields = ('invoice__invoice_number', 'transaction_id')
+    list_select_related = ('invoice', 'customer')
+    show_full_result_count = False
@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.archive.services import archivable_invoices, archive_closed_invoices, archive_cutoff
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves paid and cancelled invoices older than ARCHIVE_AFTER_MONTHS months, with their items "
+        "and payments, into the archive tables. Safe to interrupt and run again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months', type=int, default=settings.ARCHIVE_AFTER_MONTHS,
+            help=f"Archive invoices issued before this many months ago (default: {settings.ARCHIVE_AFTER_MONTHS}).",
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=settings.ARCHIVE_CHUNK_SIZE,
+            help=f"Invoices moved per transaction (default: {settings.ARCHIVE_CHUNK_SIZE}).",
+        )
+        parser.add_argument('--limit', type=int, help="Stop after this many invoices.")
+        parser.add_argument('--pause', type=float, default=0, help="Seconds to sleep between chunks.")
+        parser.add_argument('--dry-run', action='store_true', help="Only count the invoices that would be moved.")
+
+    def handle(self, *args, **options):
+        if options['months'] < 0 or options['chunk_size'] < 1:
+            raise CommandError("--months must not be negative and --chunk-size must be at least 1.")
+        cutoff = archive_cutoff(options['months'])
+
+        if options['dry_run']:
+            count = archivable_invoices(cutoff).count()
+            self.stdout.write(f"{count} invoices issued before {cutoff} would be archived.")
+            return
+
+        def progress(moved):
+            self.stderr.write(f"  {moved['invoices']} invoices, {moved['payments']} payments archived", ending='\r')
+
+        moved = archive_closed_invoices(
+            months=options['months'],
+            chunk_size=options['chunk_size'],
+            limit=options['limit'],
+            pause=options['pause'],
+            progress=progress if options['verbosity'] > 1 else None,
+        )
+        if options['verbosity'] > 1:
+            self.stderr.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {moved['invoices']} invoices and {moved['payments']} payments issued before {cutoff}."
+        ))
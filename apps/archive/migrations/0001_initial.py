@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:14
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('customers', '0004_active_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedInvoice',
+            fields=[
+                ('id', models.BigIntegerField(help_text="The invoice's original id.", primary_key=True, serialize=False)),
+                ('created_by_id', models.BigIntegerField(blank=True, null=True)),
+                ('invoice_number', models.CharField(db_index=True, max_length=50, verbose_name='invoice number')),
+                ('status', models.CharField(max_length=20, verbose_name='status')),
+                ('issued_at', models.DateField(db_index=True, verbose_name='date issued')),
+                ('due_at', models.DateField(verbose_name='due at')),
+                ('subtotal', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='subtotal')),
+                ('tax_amount', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='tax amount')),
+                ('total_amount', models.DecimalField(decimal_places=2, max_digits=12, verbose_name='total amount')),
+                ('notes', models.TextField(blank=True, null=True, verbose_name='notes')),
+                ('items', models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text="The invoice's line items.", verbose_name='items')),
+                ('created_at', models.DateTimeField(verbose_name='created at')),
+                ('updated_at', models.DateTimeField(verbose_name='updated at')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='archived at')),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_invoices', to='customers.customer', verbose_name='Customer')),
+            ],
+            options={
+                'verbose_name': 'archived invoice',
+                'verbose_name_plural': 'archived invoices',
+                'ordering': ['-issued_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedPayment',
+            fields=[
+                ('id', models.BigIntegerField(help_text="The payment's original id.", primary_key=True, serialize=False)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='amount')),
+                ('method', models.CharField(max_length=50, verbose_name='payment method')),
+                ('transaction_id', models.CharField(blank=True, max_length=255, null=True, verbose_name='transaction ID')),
+                ('paid_at', models.DateTimeField(db_index=True, verbose_name='payment date')),
+                ('notes', models.TextField(blank=True, verbose_name='notes')),
+                ('created_at', models.DateTimeField(verbose_name='created at')),
+                ('updated_at', models.DateTimeField(verbose_name='updated at')),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archived_payments', to='customers.customer', verbose_name='Customer')),
+                ('invoice', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payments', to='archive.archivedinvoice', verbose_name='Invoice')),
+            ],
+            options={
+                'verbose_name': 'archived payment',
+                'verbose_name_plural': 'archived payments',
+                'ordering': ['-paid_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedinvoice',
+            index=models.Index(fields=['customer', 'issued_at'], name='archived_invoice_customer_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedpayment',
+            index=models.Index(fields=['customer', 'paid_at'], name='archived_payment_customer_idx'),
+        ),
+    ]
@@ -0,0 +1,176 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class ArchivedInvoice(models.Model):
+    """
+    A closed (paid or cancelled) invoice moved out of the hot billing tables
+    by apps.archive.services.archive_closed_invoices.
+
+    Keeps the original primary key and invoice number, so the invoice can
+    still be looked up, and everything reports need. The line items are
+    only ever read with their invoice, so they are kept inline as JSON.
+    """
+    id = models.BigIntegerField(
+        primary_key=True,
+        help_text=_("The invoice's original id."),
+    )
+
+    customer = models.ForeignKey(
+        'customers.Customer',
+        on_delete=models.PROTECT,
+        related_name='archived_invoices',
+        verbose_name=_("Customer"),
+    )
+
+    created_by_id = models.BigIntegerField(
+        null=True,
+        blank=True,
+    )
+
+    invoice_number = models.CharField(
+        _("invoice number"),
+        max_length=50,
+        db_index=True,
+    )
+
+    status = models.CharField(
+        _("status"),
+        max_length=20,
+    )
+    # --- Date Fields ---
+    issued_at = models.DateField(
+        _("date issued"),
+        db_index=True,
+    )
+
+    due_at = models.DateField(
+        _("due at"),
+    )
+    # --- Financial ---
+    subtotal = models.DecimalField(
+        _("subtotal"),
+        max_digits=12,
+        decimal_places=2,
+    )
+
+    tax_amount = models.DecimalField(
+        _("tax amount"),
+        max_digits=12,
+        decimal_places=2,
+    )
+
+    total_amount = models.DecimalField(
+        _("total amount"),
+        max_digits=12,
+        decimal_places=2,
+    )
+
+    notes = models.TextField(
+        _("notes"),
+        blank=True,
+        null=True,
+    )
+
+    items = models.JSONField(
+        _("items"),
+        default=list,
+        encoder=DjangoJSONEncoder,
+        help_text=_("The invoice's line items."),
+    )
+    # --- Bookkeeping ---
+    created_at = models.DateTimeField(
+        _("created at"),
+    )
+
+    updated_at = models.DateTimeField(
+        _("updated at"),
+    )
+
+    archived_at = models.DateTimeField(
+        _("archived at"),
+        auto_now_add=True,
+    )
+
+    class Meta:
+        verbose_name = _("archived invoice")
+        verbose_name_plural = _("archived invoices")
+        ordering = ['-issued_at']
+        indexes = [
+            # Customer statements and stats
+            models.Index(fields=['customer', 'issued_at'], name='archived_invoice_customer_idx'),
+        ]
+
+    def __str__(self):
+        return f"Archived invoice {self.invoice_number}"
+
+
+class ArchivedPayment(models.Model):
+    """A payment against an archived invoice, with its original id."""
+    id = models.BigIntegerField(
+        primary_key=True,
+        help_text=_("The payment's original id."),
+    )
+
+    invoice = models.ForeignKey(
+        ArchivedInvoice,
+        on_delete=models.CASCADE,
+        related_name='payments',
+        verbose_name=_("Invoice"),
+    )
+
+    # Copied from the invoice so statements need no join
+    customer = models.ForeignKey(
+        'customers.Customer',
+        on_delete=models.PROTECT,
+        related_name='archived_payments',
+        verbose_name=_("Customer"),
+    )
+
+    amount = models.DecimalField(
+        _("amount"),
+        max_digits=10,
+        decimal_places=2,
+    )
+
+    method = models.CharField(
+        _("payment method"),
+        max_length=50,
+    )
+
+    transaction_id = models.CharField(
+        _("transaction ID"),
+        max_length=255,
+        null=True,
+        blank=True,
+    )
+
+    paid_at = models.DateTimeField(
+        _("payment date"),
+        db_index=True,
+    )
+
+    notes = models.TextField(
+        _("notes"),
+        blank=True,
+    )
+
+    created_at = models.DateTimeField(
+        _("created at"),
+    )
+
+    updated_at = models.DateTimeField(
+        _("updated at"),
+    )
+
+    class Meta:
+        verbose_name = _("archived payment")
+        verbose_name_plural = _("archived payments")
+        ordering = ['-paid_at']
+        indexes = [
+            models.Index(fields=['customer', 'paid_at'], name='archived_payment_customer_idx'),
+        ]
+
+    def __str__(self):
+        return f"Archived payment {self.id} - {self.amount} for {self.invoice_id}"
@@ -0,0 +1,172 @@
+# archive/services.py
+import datetime
+from collections import defaultdict
+from time import monotonic, sleep, time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Exists, Max, OuterRef
+from django.utils import timezone
+
+from apps.billing.models import Invoice, InvoiceItem, StockReservation
+from apps.catalog.models import StockMovement
+from apps.payments.models import Payment
+from common.services import raw_delete
+
+from .models import ArchivedInvoice, ArchivedPayment
+
+ARCHIVABLE_STATUSES = [Invoice.Status.PAID, Invoice.Status.CANCELLED]
+
+HORIZON_VERSION_KEY = 'archive:horizon-version'
+
+# Per-process cache of archive_horizon() by database alias: (read at, version, horizon)
+_horizons = {}
+
+INVOICE_FIELDS = (
+    'id', 'customer_id', 'created_by_id', 'invoice_number', 'status', 'issued_at', 'due_at',
+    'subtotal', 'tax_amount', 'total_amount', 'notes', 'created_at', 'updated_at',
+)
+ITEM_FIELDS = ('id', 'product_id', 'description', 'quantity', 'unit_price', 'total')
+PAYMENT_FIELDS = (
+    'id', 'invoice_id', 'amount', 'method', 'transaction_id', 'paid_at', 'notes', 'created_at', 'updated_at',
+)
+
+
+def archive_cutoff(months: int = None, today: datetime.date = None) -> datetime.date:
+    """The first day of the month ``months`` (ARCHIVE_AFTER_MONTHS) months before ``today``."""
+    months = settings.ARCHIVE_AFTER_MONTHS if months is None else months
+    today = today or timezone.localdate()
+    month_index = today.year * 12 + today.month - 1 - months
+    return datetime.date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def archivable_invoices(cutoff: datetime.date):
+    """
+    Closed invoices issued before ``cutoff`` with no payment on or after it,
+    so nothing archived ever falls into a report period starting at the cutoff.
+    """
+    late_payments = Payment.objects.filter(invoice=OuterRef('pk'), paid_at__date__gte=cutoff)
+    return Invoice.objects.filter(status__in=ARCHIVABLE_STATUSES, issued_at__lt=cutoff).exclude(Exists(late_payments))
+
+
+def _archive_chunk(invoice_ids: list) -> tuple:
+    """Moves the given invoices with their items and payments into the archive. Returns (invoices, payments)."""
+    invoices = list(Invoice.objects.filter(pk__in=invoice_ids).values(*INVOICE_FIELDS))
+    items = defaultdict(list)
+    for item in InvoiceItem.objects.filter(invoice_id__in=invoice_ids).order_by('pk').values('invoice_id', *ITEM_FIELDS):
+        items[item.pop('invoice_id')].append(item)
+    payments = list(Payment.objects.filter(invoice_id__in=invoice_ids).values(*PAYMENT_FIELDS))
+    customers = {invoice['id']: invoice['customer_id'] for invoice in invoices}
+
+    ArchivedInvoice.objects.bulk_create([
+        ArchivedInvoice(items=items.get(invoice['id'], []), **invoice) for invoice in invoices
+    ])
+    ArchivedPayment.objects.bulk_create([
+        ArchivedPayment(customer_id=customers[payment['invoice_id']], **payment) for payment in payments
+    ])
+
+    # Everything below is the archived data itself, so no signal handler or
+    # stats update is due; delete without loading the rows. Stock movements
+    # keep their invoice_id, which now points into the archive
+    raw_delete(StockReservation.objects.filter(invoice_id__in=invoice_ids))
+    raw_delete(InvoiceItem.objects.filter(invoice_id__in=invoice_ids))
+    raw_delete(Payment.objects.filter(invoice_id__in=invoice_ids))
+    raw_delete(Invoice.objects.filter(pk__in=invoice_ids))
+    return len(invoices), len(payments)
+
+
+def archive_closed_invoices(
+    months: int = None,
+    chunk_size: int = None,
+    limit: int = None,
+    pause: float = 0,
+    progress=None,
+) -> dict:
+    """
+    Moves paid and cancelled invoices older than ``months`` months (see
+    archivable_invoices), with their items and payments, into the archive
+    tables, ``chunk_size`` invoices per transaction and in primary key order,
+    sleeping ``pause`` seconds between chunks so other writers get the
+    database. Stops after ``limit`` invoices when given.
+
+    Customer stats keep counting archived invoices (see
+    refresh_customer_stats), so they are left as they are.
+    Returns the number of invoices and payments moved.
+    """
+    cutoff = archive_cutoff(months)
+    chunk_size = chunk_size or settings.ARCHIVE_CHUNK_SIZE
+    moved = {'invoices': 0, 'payments': 0}
+    last_pk = 0
+    while limit is None or moved['invoices'] < limit:
+        size = chunk_size if limit is None else min(chunk_size, limit - moved['invoices'])
+        with transaction.atomic():
+            invoice_ids = list(
+                archivable_invoices(cutoff).filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:size]
+            )
+            if not invoice_ids:
+                break
+            invoices, payments = _archive_chunk(invoice_ids)
+        _bump_horizon_version()
+        last_pk = invoice_ids[-1]
+        moved['invoices'] += invoices
+        moved['payments'] += payments
+        if progress:
+            progress(moved)
+        if pause:
+            sleep(pause)
+    return moved
+
+
+def archive_horizon(using: str = None):
+    """
+    The last date any archived invoice or payment falls on, or None while the
+    archive is empty. A report whose period starts after it can skip the
+    archive.
+    """
+    invoices = ArchivedInvoice.objects.using(using).aggregate(last=Max('issued_at'))['last']
+    payments = ArchivedPayment.objects.using(using).aggregate(last=Max('paid_at'))['last']
+    dates = [invoices] + ([timezone.localdate(payments)] if payments else [])
+    dates = [date for date in dates if date is not None]
+    return max(dates) if dates else None
+
+
+def _shared_cache():
+    return caches[settings.ARCHIVE_CACHE_ALIAS]
+
+
+def _bump_horizon_version():
+    """Makes every process re-read archive_horizon() on its next call."""
+    _horizons.clear()
+    try:
+        _shared_cache().incr(HORIZON_VERSION_KEY)
+    except ValueError:
+        # The stamp expired or was never set; any new value invalidates
+        _shared_cache().set(HORIZON_VERSION_KEY, int(time() * 1000), timeout=None)
+
+
+def cached_archive_horizon(using: str = None):
+    """
+    archive_horizon(), re-read by each process at most every
+    ARCHIVE_HORIZON_CACHE_SECONDS, or sooner once an archive run in any
+    process has bumped the shared version stamp. Costs one read of
+    ARCHIVE_CACHE_ALIAS per call.
+    """
+    key = using or 'default'
+    now = monotonic()
+    version = _shared_cache().get_or_set(HORIZON_VERSION_KEY, 1, timeout=None)
+    read_at, read_version, horizon = _horizons.get(key, (None, None, None))
+    if read_at is None or read_version != version or now - read_at >= settings.ARCHIVE_HORIZON_CACHE_SECONDS:
+        horizon = archive_horizon(using=using)
+        _horizons[key] = (now, version, horizon)
+    return horizon
+
+
+def find_invoice(invoice_number: str = None, pk: int = None):
+    """
+    Returns the Invoice, or else the ArchivedInvoice, with this number (or
+    primary key, e.g. a StockMovement.invoice_id); None if neither exists.
+    Archived invoices keep their primary key.
+    """
+    lookup = {'invoice_number': invoice_number} if pk is None else {'pk': pk}
+    return Invoice.objects.filter(**lookup).first() or ArchivedInvoice.objects.filter(**lookup).first()
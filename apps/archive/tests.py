@@ -0,0 +1,114 @@
+import datetime
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.archive.models import ArchivedInvoice, ArchivedPayment
+from apps.archive.services import archive_closed_invoices, cached_archive_horizon, find_invoice
+from apps.billing.models import Invoice, InvoiceItem
+from apps.billing.services import bulk_create_invoices
+from apps.catalog.models import Product, StockMovement
+from apps.catalog.services import record_stock_movement
+from apps.customers.models import Customer, CustomerStats
+from apps.customers.services import refresh_customer_stats
+from apps.payments.models import Payment
+from apps.reports import services as reports
+
+
+@override_settings(CATALOG_CACHE_ALIAS='default', CATALOG_CACHE_VERSION_CHECK=0)
+class ArchiveTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = product = Product.objects.create(name='Widget', unit_price=Decimal('10.00'))
+        cls.customer = Customer.objects.create(name='Customer', email='customer@example.com')
+        invoices = bulk_create_invoices([
+            {
+                'customer_id': cls.customer.pk,
+                'due_at': datetime.date(2030, 1, 1),
+                'items': [{'product_id': product.pk, 'quantity': quantity}],
+            }
+            for quantity in (1, 2, 3, 4)
+        ])
+        cls.old_paid, cls.old_cancelled, cls.old_late_payment, cls.recent = invoices
+        old = datetime.date(2020, 3, 10)
+        Invoice.objects.filter(pk__in=[invoice.pk for invoice in invoices[:3]]).update(issued_at=old)
+        Invoice.objects.filter(pk=cls.old_cancelled.pk).update(status=Invoice.Status.CANCELLED)
+        Invoice.objects.filter(pk__in=[cls.old_paid.pk, cls.old_late_payment.pk]).update(status=Invoice.Status.PAID)
+        paid_at = timezone.make_aware(datetime.datetime(2020, 4, 1, 12))
+        Payment.objects.create(invoice=cls.old_paid, amount=Decimal('10.00'), paid_at=paid_at)
+        Payment.objects.create(invoice=cls.old_late_payment, amount=Decimal('5.00'), paid_at=paid_at)
+        # Paid off only recently, so it still shows on this year's reports
+        Payment.objects.create(invoice=cls.old_late_payment, amount=Decimal('25.00'))
+
+    def snapshot(self):
+        refresh_customer_stats([self.customer.pk])
+        stats = CustomerStats.objects.get(customer=self.customer)
+        start, end = datetime.date(2020, 1, 1), timezone.localdate()
+        return {
+            'revenue': reports.get_monthly_revenue(years=10),
+            'status_counts': reports.get_invoice_status_counts(),
+            'opening_balance': reports.get_statement_opening_balance(self.customer.pk, datetime.date(2021, 1, 1)),
+            'statement': list(reports.iter_customer_statement(self.customer.pk, start, end)),
+            'statement_customers': reports.get_statement_customer_ids(end),
+            'stats': (stats.invoice_count, stats.lifetime_billed, stats.lifetime_paid, stats.last_payment_at),
+        }
+
+    def test_reports_and_stats_are_unchanged_by_archiving(self):
+        before = self.snapshot()
+
+        moved = archive_closed_invoices(months=1, chunk_size=1)
+
+        self.assertEqual(moved, {'invoices': 2, 'payments': 1})
+        self.assertEqual(
+            set(ArchivedInvoice.objects.values_list('pk', flat=True)), {self.old_paid.pk, self.old_cancelled.pk},
+        )
+        self.assertFalse(Invoice.objects.filter(pk__in=[self.old_paid.pk, self.old_cancelled.pk]).exists())
+        self.assertFalse(InvoiceItem.objects.filter(invoice_id=self.old_paid.pk).exists())
+        self.assertEqual(ArchivedPayment.objects.get().customer, self.customer)
+        self.assertEqual(ArchivedInvoice.objects.get(pk=self.old_paid.pk).items[0]['quantity'], 1)
+        self.assertEqual(self.snapshot(), before)
+
+    def test_archiving_again_moves_nothing(self):
+        archive_closed_invoices(months=1)
+        self.assertEqual(archive_closed_invoices(months=1), {'invoices': 0, 'payments': 0})
+
+    def test_find_invoice_falls_back_to_the_archive(self):
+        archive_closed_invoices(months=1, limit=1)
+        self.assertIsInstance(find_invoice(self.old_paid.invoice_number), ArchivedInvoice)
+        self.assertIsInstance(find_invoice(self.recent.invoice_number), Invoice)
+        self.assertIsNone(find_invoice('missing'))
+
+    def test_stock_movements_keep_their_archived_invoice(self):
+        movement = record_stock_movement(self.product.pk, -1, StockMovement.Reason.SALE, invoice=self.old_paid)
+
+        archive_closed_invoices(months=1)
+
+        movement.refresh_from_db()
+        self.assertEqual(movement.invoice_id, self.old_paid.pk)
+        self.assertEqual(find_invoice(pk=movement.invoice_id), ArchivedInvoice.objects.get(pk=self.old_paid.pk))
+
+    @override_settings(ARCHIVE_HORIZON_CACHE_SECONDS=60)
+    @mock.patch.dict('apps.archive.services._horizons', clear=True)
+    def test_archive_horizon_is_cached_until_invoices_are_archived(self):
+        self.assertIsNone(cached_archive_horizon())
+        with self.assertNumQueries(1):
+            reports.get_invoice_status_counts()  # Reuses the horizon read above
+
+        archive_closed_invoices(months=1)
+        with self.assertNumQueries(2):
+            self.assertEqual(cached_archive_horizon(), datetime.date(2020, 4, 1))
+        with self.assertNumQueries(0):
+            cached_archive_horizon()
+
+    @override_settings(ARCHIVE_HORIZON_CACHE_SECONDS=60)
+    @mock.patch.dict('apps.archive.services._horizons', clear=True)
+    def test_archiving_in_another_process_drops_the_cached_horizon(self):
+        self.assertIsNone(cached_archive_horizon())
+        # This process's entry survives; only the shared stamp moves
+        with mock.patch.dict('apps.archive.services._horizons'):
+            archive_closed_invoices(months=1)
+
+        self.assertEqual(cached_archive_horizon(), datetime.date(2020, 4, 1))
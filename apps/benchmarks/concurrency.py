@@ -0,0 +1,158 @@
+# benchmarks/concurrency.py
+import multiprocessing
+import random
+import shutil
+import sqlite3
+import tempfile
+from decimal import Decimal
+from pathlib import Path
+from time import perf_counter, sleep
+
+from django.conf import settings
+from django.db import OperationalError, close_old_connections, connections
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from apps.accounts.models import User
+from apps.billing.models import Invoice
+from apps.payments.services import record_payment
+
+from .runner import percentile
+
+# Connection settings compared by the benchmark. "default" is what Django
+# does without configuration: rollback journal, deferred transactions and a
+# new connection per request.
+SQLITE_PROFILES = {
+    'default': {
+        'OPTIONS': {'init_command': 'PRAGMA journal_mode=DELETE;'},
+        'CONN_MAX_AGE': 0,
+    },
+    'tuned': {
+        'OPTIONS': settings.SQLITE_OPTIONS,
+        'CONN_MAX_AGE': settings.SQLITE_CONN_MAX_AGE,
+    },
+}
+
+
+def _use_database(path, profile):
+    """Points this (forked) process's default connection at ``path`` with the profile's settings."""
+    database = settings.DATABASES['default']
+    database.update(NAME=str(path), OPTIONS=dict(SQLITE_PROFILES[profile]['OPTIONS']),
+                    CONN_MAX_AGE=SQLITE_PROFILES[profile]['CONN_MAX_AGE'])
+    del connections['default']
+
+
+def _writer(path, profile, invoice_ids, pause, start, deadline, seed, results):
+    """Records 0.01 payments against random open invoices, one simulated request every ``pause`` seconds."""
+    _use_database(path, profile)
+    rng = random.Random(seed)
+    latencies, errors = [], 0
+    start.wait()
+    while perf_counter() < deadline.value:
+        close_old_connections()  # What request_started does
+        started = perf_counter()
+        try:
+            record_payment(rng.choice(invoice_ids), Decimal('0.01'), 'card', notes='')
+            latencies.append((perf_counter() - started) * 1000)
+        except OperationalError:  # "database is locked"
+            errors += 1
+        close_old_connections()  # What request_finished does
+        sleep(pause)
+    results.put(('writer', latencies, errors))
+
+
+def _reader(path, profile, user_id, start, deadline, results):
+    """Requests the dashboard as a logged-in user."""
+    _use_database(path, profile)
+    latencies, errors = [], 0
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+        client = Client(raise_request_exception=False)
+        client.force_login(User.objects.get(pk=user_id))
+        close_old_connections()
+        url = reverse('dashboard')
+        start.wait()
+        while perf_counter() < deadline.value:
+            started = perf_counter()
+            response = client.get(url)
+            if response.status_code == 200:
+                latencies.append((perf_counter() - started) * 1000)
+            else:
+                errors += 1
+    results.put(('reader', latencies, errors))
+
+
+def _copy_database(source, target):
+    """Copies the SQLite database through the backup API, so a live WAL file is included."""
+    with sqlite3.connect(source) as src, sqlite3.connect(target) as dst:
+        src.backup(dst)
+
+
+def run_concurrency_benchmark(
+    writers: int = 4, readers: int = 8, duration: float = 10.0, writer_pause: float = 0.05, seed: int = None,
+) -> dict:
+    """
+    Runs ``writers`` processes calling record_payment (pausing
+    ``writer_pause`` seconds between payments, like users submitting forms)
+    and ``readers`` processes loading the dashboard back to back,
+    concurrently for ``duration`` seconds,
+    once per connection profile in SQLITE_PROFILES. Each profile works on its
+    own copy of the database, which is deleted afterwards.
+
+    Returns per profile and role: completed operations, throughput, p50/p95
+    latency in milliseconds, and failures ("database is locked" for writers,
+    non-200 responses for readers).
+    """
+    if connections['default'].vendor != 'sqlite':
+        raise ValueError("The concurrency benchmark only runs against SQLite.")
+    invoice_ids = list(
+        Invoice.objects.filter(status__in=[Invoice.Status.SENT, Invoice.Status.OVERDUE])
+        .values_list('pk', flat=True)[:10000]
+    )
+    if not invoice_ids:
+        raise ValueError("No open invoices to pay. Run seed_benchmark_data first.")
+    user = User.objects.create_user('concurrency-benchmark@example.invalid', None, is_staff=True)
+    source = settings.DATABASES['default']['NAME']
+
+    context = multiprocessing.get_context('fork')
+    report = {}
+    workdir = Path(tempfile.mkdtemp(prefix='sqlite-bench-'))
+    try:
+        for profile in SQLITE_PROFILES:
+            path = workdir / f'{profile}.sqlite3'
+            connections.close_all()
+            _copy_database(source, path)
+
+            start, results = context.Event(), context.Queue()
+            deadline = context.Value('d', 0.0)
+            processes = [
+                context.Process(
+                    target=_writer,
+                    args=(path, profile, invoice_ids, writer_pause, start, deadline, seed and seed + n, results),
+                )
+                for n in range(writers)
+            ] + [
+                context.Process(target=_reader, args=(path, profile, user.pk, start, deadline, results))
+                for _ in range(readers)
+            ]
+            for process in processes:
+                process.start()
+            deadline.value = perf_counter() + duration  # perf_counter is system-wide on Linux
+            start.set()
+            collected = [results.get() for _ in processes]
+            for process in processes:
+                process.join()
+
+            report[profile] = {}
+            for role in ('writer', 'reader'):
+                latencies = [ms for r, values, _ in collected if r == role for ms in values]
+                report[profile][role] = {
+                    'ops': len(latencies),
+                    'ops_per_second': round(len(latencies) / duration, 1),
+                    'p50_ms': round(percentile(latencies, 0.50), 2) if latencies else None,
+                    'p95_ms': round(percentile(latencies, 0.95), 2) if latencies else None,
+                    'errors': sum(errors for r, _, errors in collected if r == role),
+                }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+        user.delete()
+    return report
@@ -0,0 +1,52 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.benchmarks.workers import run_preload_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Starts gunicorn with config/gunicorn.py with and without preload_app (and with "
+        "gc.freeze()), and compares cold-start time and per-worker memory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help="Worker processes (default: 4).")
+        parser.add_argument(
+            '--requests', type=int, default=50,
+            help="Requests sent before memory is read, so every worker has done real work (default: 50).",
+        )
+        parser.add_argument('--no-gc-freeze', action='store_true', help="Skip the preload + gc.freeze() run.")
+        parser.add_argument('--output', help="Write the results as JSON to this file.")
+
+    def handle(self, *args, **options):
+        try:
+            results = run_preload_benchmark(options['workers'], options['requests'], not options['no_gc_freeze'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            f"{'profile':<16} {'first ms':>9} {'master MB':>10} "
+            f"{'worker RSS':>11} {'worker PSS':>11} {'worker USS':>11} {'total PSS':>10}"
+        )
+        for result in results:
+            profile = 'preload' if result['preload'] else 'no preload'
+            if result['gc_freeze']:
+                profile += ' + freeze'
+            self.stdout.write(
+                f"{profile:<16} {result['first_response_ms']:>9} "
+                f"{_mb(result['master_rss_kb']):>10} {_mb(result['worker_rss_kb']):>11} "
+                f"{_mb(result['worker_pss_kb']):>11} {_mb(result['worker_uss_kb']):>11} {_mb(result['total_pss_kb']):>10}"
+            )
+        self.stdout.write(
+            "PSS shares pages between the processes using them; USS is what each worker holds alone."
+        )
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}."))
+
+
+def _mb(kb) -> str:
+    return f"{kb / 1024:.1f}"
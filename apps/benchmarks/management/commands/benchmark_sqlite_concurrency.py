@@ -0,0 +1,50 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.benchmarks.concurrency import run_concurrency_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs record_payment writers and dashboard readers in parallel processes against a "
+        "copy of the SQLite database, once with Django's default connection settings and "
+        "once with SQLITE_OPTIONS, and compares throughput, latency and lock errors."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=4, help="Writer processes (default: 4).")
+        parser.add_argument('--readers', type=int, default=8, help="Reader processes (default: 8).")
+        parser.add_argument('--duration', type=float, default=10.0, help="Seconds per profile (default: 10).")
+        parser.add_argument(
+            '--writer-pause', type=float, default=0.05,
+            help="Seconds each writer waits between payments (default: 0.05).",
+        )
+        parser.add_argument('--seed', type=int, help="Random seed for picking invoices.")
+        parser.add_argument('--output', help="Write the results as JSON to this file.")
+
+    def handle(self, *args, **options):
+        try:
+            report = run_concurrency_benchmark(
+                options['writers'], options['readers'], options['duration'], options['writer_pause'], options['seed'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            f"{'profile':<9} {'role':<7} {'ops':>7} {'ops/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'errors':>7}"
+        )
+        for profile, roles in report.items():
+            for role, result in roles.items():
+                self.stdout.write(
+                    f"{profile:<9} {role:<7} {result['ops']:>7} {result['ops_per_second']:>8} "
+                    f"{_ms(result['p50_ms']):>9} {_ms(result['p95_ms']):>9} {result['errors']:>7}"
+                )
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}."))
+
+
+def _ms(value) -> str:
+    return '-' if value is None else f"{value:.2f}"
@@ -0,0 +1,88 @@
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# "import time: self [us] | cumulative | imported package", the package name
+# indented two spaces per nesting level
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+STARTUP_SCRIPT = """
+import importlib, django
+django.setup()
+for name in {modules!r}:
+    importlib.import_module(name)
+"""
+
+
+def parse_importtime(output: str) -> list:
+    """Turns ``python -X importtime`` output into (module, self_us, cumulative_us, depth) rows."""
+    rows = []
+    for line in output.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures how long a worker takes to import the project (django.setup() plus the given "
+        "modules) with python -X importtime, and summarises the slowest imports."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'modules', nargs='*',
+            help="Modules a worker imports after django.setup() (default: the root URLconf, which imports every view).",
+        )
+        parser.add_argument('--runs', type=int, default=3, help="Fresh interpreters to time; the fastest is reported.")
+        parser.add_argument('--top', type=int, default=15, help="How many modules and packages to list.")
+        parser.add_argument(
+            '--forbid', action='append', default=[], metavar='PACKAGE',
+            help="Fail if this package is imported at startup, e.g. --forbid reportlab.",
+        )
+
+    def measure(self, modules):
+        script = STARTUP_SCRIPT.format(modules=modules)
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', script],
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+        )
+        if result.returncode:
+            raise CommandError(f"The import failed:\n{result.stderr[-2000:]}")
+        return parse_importtime(result.stderr)
+
+    def handle(self, *args, **options):
+        modules = options['modules'] or [settings.ROOT_URLCONF]
+
+        runs = [self.measure(modules) for _ in range(max(options['runs'], 1))]
+        totals = [sum(row[1] for row in rows) for rows in runs]
+        rows = runs[totals.index(min(totals))]
+
+        self.stdout.write(
+            f"Startup imports: {len(rows)} modules, {min(totals) / 1000:.1f} ms "
+            f"(median {statistics.median(totals) / 1000:.1f} ms over {len(runs)} runs)"
+        )
+
+        self.stdout.write("\nSlowest imports (cumulative ms, self ms):")
+        for module, self_us, cumulative_us, depth in sorted(rows, key=lambda row: -row[2])[:options['top']]:
+            self.stdout.write(f"  {cumulative_us / 1000:8.1f} {self_us / 1000:8.1f}  {module}")
+
+        packages = defaultdict(lambda: [0, 0])
+        for module, self_us, _, _ in rows:
+            package = packages[module.split('.')[0]]
+            package[0] += self_us
+            package[1] += 1
+        self.stdout.write("\nBy top-level package (ms, modules):")
+        for package, (self_us, count) in sorted(packages.items(), key=lambda item: -item[1][0])[:options['top']]:
+            self.stdout.write(f"  {self_us / 1000:8.1f} {count:6d}  {package}")
+
+        loaded = [package for package in options['forbid'] if package in packages]
+        if loaded:
+            raise CommandError(f"Imported at startup: {', '.join(loaded)}")
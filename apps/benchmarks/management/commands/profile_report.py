@@ -0,0 +1,82 @@
+import io
+import pstats
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+def aggregate_folded(paths) -> tuple:
+    """
+    Sums collapsed-stack files. Returns (samples, self counts, inclusive
+    counts) per frame; a frame counts once per stack even when recursive.
+    """
+    total, own, inclusive = 0, Counter(), Counter()
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                stack, _, count = line.rstrip('\n').rpartition(' ')
+                if not stack:
+                    continue
+                count = int(count)
+                frames = stack.split(';')
+                total += count
+                own[frames[-1]] += count
+                for frame in set(frames):
+                    inclusive[frame] += count
+    return total, own, inclusive
+
+
+class Command(BaseCommand):
+    help = "Aggregates the request profiles in REQUEST_PROFILE_DIR into a top-N hot function report per URL name."
+
+    def add_arguments(self, parser):
+        parser.add_argument('views', nargs='*', help="URL names to report on (default: every profiled view).")
+        parser.add_argument('--top', type=int, default=20, help="Functions to list per view (default: 20).")
+        parser.add_argument(
+            '--sort', choices=['cumulative', 'tottime'], default='cumulative',
+            help="Order of the report: time including callees, or own time only (default: cumulative).",
+        )
+
+    def handle(self, *args, **options):
+        root = Path(settings.REQUEST_PROFILE_DIR)
+        if not root.is_dir():
+            raise CommandError(f"No profiles in {root}. Enable REQUEST_PROFILING first.")
+        directories = sorted(p for p in root.iterdir() if p.is_dir())
+        if options['views']:
+            directories = [d for d in directories if d.name in options['views']]
+        if not directories:
+            raise CommandError("No profiles for the requested views.")
+
+        for directory in directories:
+            cprofiles = sorted(directory.glob('*.prof'))
+            folded = sorted(directory.glob('*.folded'))
+            if cprofiles:
+                self.stdout.write(self.style.MIGRATE_HEADING(f"\n{directory.name}: {len(cprofiles)} cProfile dumps"))
+                report = io.StringIO()
+                stats = pstats.Stats(*map(str, cprofiles), stream=report)
+                stats.strip_dirs().sort_stats(options['sort']).print_stats(options['top'])
+                self.stdout.write(report.getvalue())
+            if folded:
+                self.write_folded(directory.name, folded, options)
+
+    def write_folded(self, name, paths, options):
+        total, own, inclusive = aggregate_folded(paths)
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n{name}: {len(paths)} sampled requests, {total} samples"))
+        if not total:
+            return
+        self.stdout.write(f"{'self %':>7} {'total %':>8}  function")
+        ranking = inclusive if options['sort'] == 'cumulative' else own
+        for frame, _ in ranking.most_common(options['top']):
+            self.stdout.write(f"{own[frame] / total:>7.1%} {inclusive[frame] / total:>8.1%}  {_short_frame(frame)}")
+
+
+def _short_frame(frame: str) -> str:
+    """Trims a 'path:function:line' frame to the path below site-packages or the project."""
+    path, _, rest = frame.partition(':')
+    for marker in ('site-packages/', str(settings.BASE_DIR) + '/'):
+        if marker in path:
+            path = path.split(marker, 1)[1]
+            break
+    return f"{path}:{rest}"
@@ -0,0 +1,12 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from common.profiling import make_profile_token
+
+
+class Command(BaseCommand):
+    help = "Prints a signed token that profiles any request sent with ?__profile=<token>."
+
+    def handle(self, *args, **options):
+        self.stdout.write(make_profile_token())
+        self.stderr.write(f"Valid for {settings.REQUEST_PROFILE_TOKEN_MAX_AGE} seconds.")
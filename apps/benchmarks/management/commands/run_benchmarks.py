@@ -0,0 +1,91 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.benchmarks.runner import HotPaths, data_counts, run_benchmarks
+from apps.benchmarks.seed import seed_benchmark_data
+
+
+class Command(BaseCommand):
+    help = (
+        "Times the hot paths (dashboard, invoice pages, PDF, payments, items, cloning and "
+        "reports) and reports p50/p95 latency and query counts. With --scale, seeds the "
+        "database up to each invoice count in turn and benchmarks at every size."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20, help="Timed calls per hot path (default: 20).")
+        parser.add_argument(
+            '--scale', type=int, nargs='+', metavar='INVOICES',
+            help="Invoice counts to benchmark at, e.g. --scale 10000 100000 1000000. "
+                 "Missing invoices are generated with seed_benchmark_data.",
+        )
+        parser.add_argument('--only', nargs='+', metavar='NAME', help="Only run these hot paths.")
+        parser.add_argument('--seed', type=int, help="Random seed for data generation and sampling.")
+        parser.add_argument('--output', help="Write the results as JSON to this file.")
+        parser.add_argument('--compare', help="A previous --output file to compare against.")
+
+    def handle(self, *args, **options):
+        known = HotPaths(None, None).names()
+        unknown = set(options['only'] or []) - set(known)
+        if unknown:
+            raise CommandError(f"Unknown hot paths: {', '.join(sorted(unknown))}. Choose from: {', '.join(known)}.")
+
+        runs = []
+        for scale in sorted(options['scale'] or [None]):
+            if scale is not None:
+                missing = scale - data_counts()['invoices']
+                if missing > 0:
+                    self.stdout.write(f"Seeding {missing} invoices...")
+                    seed_benchmark_data(missing, seed=options['seed'])
+            try:
+                run = run_benchmarks(options['iterations'], options['only'], options['seed'])
+            except LookupError as e:
+                raise CommandError(f"{e} Run seed_benchmark_data first.")
+            runs.append(run)
+            self.write_run(run)
+
+        if options['compare']:
+            with open(options['compare']) as f:
+                self.write_comparison(json.load(f)['runs'], runs)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump({'runs': runs}, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}."))
+
+    def write_run(self, run):
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"\n{run['counts']['invoices']} invoices, {run['counts']['items']} items, "
+            f"{run['counts']['payments']} payments ({run['database']}, commit {run['commit'] or 'unknown'})"
+        ))
+        self.stdout.write(f"{'hot path':<28} {'p50 ms':>10} {'p95 ms':>10} {'mean ms':>10} {'queries':>8}")
+        for name, result in run['results'].items():
+            self.stdout.write(
+                f"{name:<28} {result['p50_ms']:>10.2f} {result['p95_ms']:>10.2f} "
+                f"{result['mean_ms']:>10.2f} {result['queries_p50']:>8}"
+            )
+
+    def write_comparison(self, before_runs, after_runs):
+        """Prints the p50/p95 change per hot path for runs at the same invoice count."""
+        before = {run['counts']['invoices']: run for run in before_runs}
+        for run in after_runs:
+            previous = before.get(run['counts']['invoices'])
+            if previous is None:
+                continue
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"\nCompared with commit {previous['commit'] or 'unknown'} at {run['counts']['invoices']} invoices"
+            ))
+            for name, result in run['results'].items():
+                old = previous['results'].get(name)
+                if old is None:
+                    continue
+                changes = [
+                    f"{key[:-3]} {old[key]:.2f} -> {result[key]:.2f} ms ({_change(old[key], result[key])})"
+                    for key in ('p50_ms', 'p95_ms')
+                ]
+                queries = f"queries {old['queries_p50']} -> {result['queries_p50']}"
+                self.stdout.write(f"{name:<28} " + ", ".join(changes) + f", {queries}")
+
+
+def _change(old, new) -> str:
+    return f"{(new - old) / old:+.0%}" if old else "n/a"
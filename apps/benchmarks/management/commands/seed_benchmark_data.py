@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.benchmarks.seed import seed_benchmark_data
+
+
+class Command(BaseCommand):
+    help = "Appends synthetic customers, products, invoices, items and payments for benchmarking."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--invoices', type=int, default=10000, help="Invoices to create (default: 10000).")
+        parser.add_argument(
+            '--customers', type=int,
+            help="Customers to create (default: one per ten invoices).",
+        )
+        parser.add_argument('--products', type=int, default=500, help="Products to create (default: 500).")
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help="Invoices written per transaction (default: 5000).",
+        )
+        parser.add_argument('--seed', type=int, help="Random seed, for a reproducible data set.")
+
+    def handle(self, *args, **options):
+        if options['invoices'] < 1 or options['products'] < 1:
+            raise CommandError("--invoices and --products must be positive.")
+        counts = seed_benchmark_data(
+            invoices=options['invoices'],
+            customers=options['customers'],
+            products=options['products'],
+            batch_size=options['batch_size'],
+            seed=options['seed'],
+            progress=lambda done: self.stdout.write(f"  {done} / {options['invoices']} invoices"),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            "Created " + ", ".join(f"{count} {name}" for name, count in counts.items()) + "."
+        ))
@@ -0,0 +1,191 @@
+# benchmarks/runner.py
+import datetime
+import random
+import statistics
+import subprocess
+from decimal import Decimal
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max, Min
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.billing.models import Invoice, InvoiceItem
+from apps.billing.services import add_invoice_item, clone_invoice
+from apps.billing.utils import generate_invoice_pdf
+from apps.catalog.models import Product
+from apps.customers.models import Customer
+from apps.payments.models import Payment
+from apps.payments.services import record_payment
+from apps.reports import services as reports
+from common.instrumentation import record_queries
+
+OPEN_STATUSES = [Invoice.Status.SENT, Invoice.Status.OVERDUE]
+
+
+def _random_pk(rng, queryset):
+    """A roughly uniform random pk from ``queryset`` without loading every id."""
+    bounds = queryset.aggregate(low=Min('pk'), high=Max('pk'))
+    if bounds['low'] is None:
+        raise LookupError(f"No {queryset.model._meta.verbose_name} to benchmark against.")
+    start = rng.randint(bounds['low'], bounds['high'])
+    return queryset.filter(pk__gte=start).order_by('pk').values_list('pk', flat=True).first()
+
+
+class HotPaths:
+    """
+    The benchmarked operations. Each ``bench_<name>`` method prepares its
+    arguments (untimed) and returns the call to time.
+    """
+
+    def __init__(self, rng, client):
+        self.rng = rng
+        self.client = client
+        self.today = timezone.localdate()
+
+    def names(self) -> list:
+        return [name[len('bench_'):] for name in dir(self) if name.startswith('bench_')]
+
+    def _get(self, url):
+        def call():
+            response = self.client.get(url)
+            if response.status_code != 200:
+                raise RuntimeError(f"GET {url} returned {response.status_code}")
+        return call
+
+    # --- Pages ---
+
+    def bench_dashboard(self):
+        return self._get(reverse('dashboard'))
+
+    def bench_invoice_list(self):
+        return self._get(reverse('invoice-list'))
+
+    def bench_invoice_detail(self):
+        return self._get(reverse('invoice-detail', args=[_random_pk(self.rng, Invoice.objects.all())]))
+
+    # --- Billing and payment services ---
+
+    def bench_generate_invoice_pdf(self):
+        pk = _random_pk(self.rng, Invoice.objects.all())
+        return lambda: generate_invoice_pdf(Invoice.objects.get(pk=pk))
+
+    def bench_record_payment(self):
+        pk = _random_pk(self.rng, Invoice.objects.filter(status__in=OPEN_STATUSES))
+        return lambda: record_payment(pk, Decimal('0.01'), 'card', notes='')
+
+    def bench_add_invoice_item(self):
+        invoice = Invoice.objects.get(pk=_random_pk(self.rng, Invoice.objects.filter(status=Invoice.Status.DRAFT)))
+        product_id = _random_pk(self.rng, Product.active.all())
+        return lambda: add_invoice_item(invoice, product_id, 1)
+
+    def bench_clone_invoice(self):
+        pk = _random_pk(self.rng, Invoice.objects.all())
+        return lambda: clone_invoice(pk, self.today + datetime.timedelta(days=30))
+
+    # --- Reports ---
+
+    def bench_monthly_revenue(self):
+        return reports.get_monthly_revenue
+
+    def bench_total_due(self):
+        return reports.get_total_due
+
+    def bench_invoice_status_counts(self):
+        return reports.get_invoice_status_counts
+
+    def bench_top_customers(self):
+        return lambda: list(reports.get_top_customers())
+
+    def bench_statement_opening_balance(self):
+        customer_id = _random_pk(self.rng, Customer.objects.all())
+        return lambda: reports.get_statement_opening_balance(customer_id, self.today - datetime.timedelta(days=365))
+
+    def bench_customer_statement(self):
+        customer_id = _random_pk(self.rng, Customer.objects.all())
+        start = self.today - datetime.timedelta(days=365)
+        return lambda: sum(1 for _ in reports.iter_customer_statement(customer_id, start, self.today))
+
+    def bench_statement_customer_ids(self):
+        return lambda: reports.get_statement_customer_ids(self.today)
+
+
+def percentile(values: list, fraction: float):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered) + 0.5) - 1))]
+
+
+def data_counts() -> dict:
+    return {
+        'customers': Customer.objects.count(),
+        'products': Product.objects.count(),
+        'invoices': Invoice.objects.count(),
+        'items': InvoiceItem.objects.count(),
+        'payments': Payment.objects.count(),
+    }
+
+
+def current_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def _measure(prepare):
+    """Runs one prepared call in a rolled-back savepoint; returns (milliseconds, queries)."""
+    with transaction.atomic():
+        call = prepare()
+        with record_queries() as queries:
+            started = perf_counter()
+            call()
+            elapsed = (perf_counter() - started) * 1000
+        transaction.set_rollback(True)
+    return elapsed, queries.count
+
+
+def run_benchmarks(iterations: int = 20, only=None, seed: int = None) -> dict:
+    """
+    Times each hot path ``iterations`` times against the current database
+    and returns p50/p95/mean latency in milliseconds with the median and
+    maximum query count.
+
+    Every call runs in a savepoint that is rolled back, and the benchmark
+    user is removed at the end, so the data set is left exactly as it was.
+    Raises LookupError when the database has nothing to benchmark against.
+    """
+    rng = random.Random(seed)
+    results = {}
+    with transaction.atomic(), override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+        client = Client()
+        client.force_login(User.objects.create_user('benchmark@example.invalid', None, is_staff=True))
+        paths = HotPaths(rng, client)
+        for name in only or paths.names():
+            prepare = getattr(paths, f'bench_{name}')
+            _measure(prepare)  # Warm up templates, caches and imports
+            timings, query_counts = zip(*(_measure(prepare) for _ in range(iterations)))
+            results[name] = {
+                'p50_ms': round(percentile(timings, 0.50), 3),
+                'p95_ms': round(percentile(timings, 0.95), 3),
+                'mean_ms': round(statistics.fmean(timings), 3),
+                'queries_p50': percentile(query_counts, 0.50),
+                'queries_max': max(query_counts),
+            }
+        transaction.set_rollback(True)
+
+    return {
+        'commit': current_commit(),
+        'created_at': timezone.now().isoformat(),
+        'database': connection.vendor,
+        'iterations': iterations,
+        'counts': data_counts(),
+        'results': results,
+    }
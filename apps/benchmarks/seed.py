@@ -0,0 +1,181 @@
+# benchmarks/seed.py
+import datetime
+import random
+import time
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.billing.models import Invoice, InvoiceItem
+from apps.billing.services import TAX_RATE
+from apps.catalog.services import bulk_create_products
+from apps.customers.models import Customer
+from apps.customers.services import refresh_customer_stats
+from apps.payments.models import Payment
+
+CENT = Decimal('0.01')
+
+# Rough shape of a live ledger: most invoices are paid, a few are still open
+STATUS_WEIGHTS = {
+    Invoice.Status.PAID: 60,
+    Invoice.Status.SENT: 15,
+    Invoice.Status.OVERDUE: 10,
+    Invoice.Status.DRAFT: 10,
+    Invoice.Status.CANCELLED: 5,
+}
+METHOD_WEIGHTS = {'bank_transfer': 45, 'card': 35, 'cash': 10, 'mobile_payment': 8, 'other': 2}
+DUE_DAYS = (14, 30, 30, 30, 60)
+HISTORY_DAYS = 2 * 365
+TRACKED_SHARE = 0.2
+
+
+def _zipf_weights(count: int, exponent: float = 0.9) -> list:
+    """Cumulative weights giving a few entries most of the picks, like real customers and best sellers."""
+    total, cumulative = 0.0, []
+    for rank in range(1, count + 1):
+        total += 1 / rank ** exponent
+        cumulative.append(total)
+    return cumulative
+
+
+def _create_customers(rng, tag: str, count: int, batch_size: int) -> list:
+    customers = [
+        Customer(
+            name=f"Bench Customer {tag}-{n}",
+            email=f"bench-{tag}-{n}@bench.example.com",
+            phone=f"+1555{rng.randrange(10 ** 7):07d}",
+            address=f"{rng.randint(1, 9999)} Benchmark Street",
+        )
+        for n in range(count)
+    ]
+    return Customer.objects.bulk_create(customers, batch_size=batch_size)
+
+
+def _create_products(rng, tag: str, count: int) -> list:
+    rows = []
+    for n in range(count):
+        tracked = rng.random() < TRACKED_SHARE
+        rows.append({
+            'sku': f"BENCH-{tag}-{n}",
+            'name': f"Bench {'Item' if tracked else 'Service'} {tag}-{n}",
+            'description': f"Benchmark product {n}",
+            'unit_price': max(Decimal(str(round(rng.lognormvariate(3.5, 1.0), 2))), Decimal('0.50')),
+            'track_inventory': tracked,
+            'stock_quantity': 10 ** 6 if tracked else None,
+        })
+    return bulk_create_products(rows)
+
+
+def _invoice_payments(rng, invoice, today) -> list:
+    """The payments a settled or part-paid invoice would have received."""
+    if invoice.status == Invoice.Status.PAID:
+        if rng.random() < 0.3 and invoice.total_amount >= 1:
+            first = (invoice.total_amount * Decimal(rng.uniform(0.3, 0.7))).quantize(CENT)
+            amounts = [first, invoice.total_amount - first]
+        else:
+            amounts = [invoice.total_amount]
+    elif invoice.status in (Invoice.Status.SENT, Invoice.Status.OVERDUE) and rng.random() < 0.4:
+        amounts = [(invoice.total_amount * Decimal(rng.uniform(0.2, 0.8))).quantize(CENT)]
+    else:
+        return []
+
+    payments = []
+    for amount in amounts:
+        paid_on = min(invoice.issued_at + datetime.timedelta(days=rng.randint(0, 45)), today)
+        payments.append(Payment(
+            invoice_id=invoice.pk,
+            amount=amount,
+            method=rng.choices(list(METHOD_WEIGHTS), weights=list(METHOD_WEIGHTS.values()))[0],
+            paid_at=timezone.make_aware(datetime.datetime.combine(paid_on, datetime.time(rng.randint(8, 18)))),
+            notes='',
+        ))
+    return payments
+
+
+def seed_benchmark_data(
+    invoices: int,
+    customers: int = None,
+    products: int = 500,
+    batch_size: int = 5000,
+    seed: int = None,
+    progress=None,
+) -> dict:
+    """
+    Appends a synthetic but realistically shaped data set: customers and
+    products picked with a long-tail distribution, one to a dozen items per
+    invoice, a spread of statuses over two years of history, and full,
+    split or partial payments to match each status.
+
+    Everything is written with bulk INSERTs, one transaction per batch of
+    invoices, and customer statistics are rebuilt at the end. Only
+    untracked products go on the seeded invoices, so the stock ledger stays
+    consistent; the tracked ones are there for add_invoice_item to reserve.
+    ``progress`` is called with the number of invoices written so far.
+    Returns the number of rows created per model.
+    """
+    rng = random.Random(seed)
+    tag = f"{int(time.time() * 1000):x}"  # Keeps emails, SKUs and invoice numbers unique across runs
+    customers = customers or max(1, invoices // 10)
+    today = timezone.localdate()
+    status_choices, status_weights = list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values())
+
+    with transaction.atomic():
+        customer_ids = [c.pk for c in _create_customers(rng, tag, customers, batch_size)]
+        catalog = _create_products(rng, tag, products)
+    services = [p for p in catalog if not p.track_inventory] or catalog
+    customer_weights = _zipf_weights(len(customer_ids))
+    product_weights = _zipf_weights(len(services))
+
+    counts = {'customers': len(customer_ids), 'products': len(catalog), 'invoices': 0, 'items': 0, 'payments': 0}
+    while counts['invoices'] < invoices:
+        size = min(batch_size, invoices - counts['invoices'])
+        with transaction.atomic():
+            lines, batch = [], []
+            for n, customer_id in enumerate(rng.choices(customer_ids, cum_weights=customer_weights, k=size)):
+                issued_at = today - datetime.timedelta(days=rng.randint(0, HISTORY_DAYS))
+                due_at = issued_at + datetime.timedelta(days=rng.choice(DUE_DAYS))
+                status = rng.choices(status_choices, weights=status_weights)[0]
+                if status == Invoice.Status.OVERDUE and due_at >= today:
+                    status = Invoice.Status.SENT
+
+                picked = rng.choices(services, cum_weights=product_weights, k=min(1 + int(rng.expovariate(0.5)), 12))
+                items = [(product, 1 + int(rng.expovariate(0.7))) for product in picked]
+                subtotal = sum((product.unit_price * quantity for product, quantity in items), Decimal('0.00'))
+                tax_amount = (subtotal * TAX_RATE).quantize(CENT)
+                lines.append(items)
+                batch.append(Invoice(
+                    customer_id=customer_id,
+                    invoice_number=f"BENCH-{tag}-{counts['invoices'] + n:07d}",
+                    status=status,
+                    issued_at=issued_at,
+                    due_at=due_at,
+                    subtotal=subtotal,
+                    tax_amount=tax_amount,
+                    total_amount=subtotal + tax_amount,
+                ))
+            Invoice.objects.bulk_create(batch, batch_size=batch_size)
+
+            items, payments = [], []
+            for invoice, invoice_lines in zip(batch, lines):
+                for product, quantity in invoice_lines:
+                    items.append(InvoiceItem(
+                        invoice_id=invoice.pk,
+                        product_id=product.pk,
+                        description=product.description,
+                        quantity=quantity,
+                        unit_price=product.unit_price,
+                        total=product.unit_price * quantity,
+                    ))
+                payments.extend(_invoice_payments(rng, invoice, today))
+            InvoiceItem.objects.bulk_create(items, batch_size=batch_size)
+            Payment.objects.bulk_create(payments, batch_size=batch_size)
+
+        counts['invoices'] += size
+        counts['items'] += len(items)
+        counts['payments'] += len(payments)
+        if progress:
+            progress(counts['invoices'])
+
+    refresh_customer_stats(customer_ids)
+    return counts
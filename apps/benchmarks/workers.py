@@ -0,0 +1,123 @@
+# benchmarks/workers.py
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import urllib.request
+from pathlib import Path
+from time import perf_counter, sleep
+
+from django.conf import settings
+from django.urls import reverse
+
+GUNICORN_CONFIG = Path(settings.BASE_DIR) / 'config' / 'gunicorn.py'
+STARTUP_TIMEOUT = 60  # seconds
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _children(pid: int) -> list:
+    try:
+        return [int(child) for child in Path(f'/proc/{pid}/task/{pid}/children').read_text().split()]
+    except FileNotFoundError:
+        return []
+
+
+def process_memory(pid: int) -> dict:
+    """
+    Resident memory of a process in kB: rss counts shared pages in full, pss
+    divides them between the processes sharing them, and uss is what only this
+    process holds (what killing it would give back).
+    """
+    fields = {}
+    for line in Path(f'/proc/{pid}/smaps_rollup').read_text().splitlines()[1:]:
+        name, value = line.split(':', 1)
+        fields[name] = int(value.split()[0])
+    return {
+        'rss': fields['Rss'],
+        'pss': fields['Pss'],
+        'uss': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0),
+    }
+
+
+def _get(url) -> bool:
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            response.read()
+            return response.status == 200
+    except OSError:
+        return False
+
+
+def measure_gunicorn(preload: bool, workers: int, requests: int, gc_freeze: bool = False) -> dict:
+    """
+    Starts gunicorn with config/gunicorn.py, times how long until it serves
+    the login page, sends ``requests`` more requests so every worker has done
+    real work, and reads the memory of the master and each worker.
+    """
+    port = _free_port()
+    env = {
+        **os.environ,
+        'GUNICORN_BIND': f'127.0.0.1:{port}',
+        'GUNICORN_WORKERS': str(workers),
+        'GUNICORN_WORKER_CLASS': 'sync',
+        'GUNICORN_PRELOAD': '1' if preload else '0',
+        'GUNICORN_GC_FREEZE': '1' if gc_freeze else '',
+        'GUNICORN_ACCESSLOG': '',
+        'GUNICORN_MAX_REQUESTS': '0',
+    }
+    url = f'http://127.0.0.1:{port}{reverse("login")}'
+
+    with tempfile.TemporaryFile() as log:
+        started = perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', str(GUNICORN_CONFIG)],
+            cwd=settings.BASE_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+        try:
+            while not _get(url):
+                if server.poll() is not None or perf_counter() - started > STARTUP_TIMEOUT:
+                    log.seek(0)
+                    raise ValueError(f"gunicorn did not start:\n{log.read().decode()[-2000:]}")
+                sleep(0.01)
+            first_response = perf_counter() - started
+
+            while len(_children(server.pid)) < workers:
+                sleep(0.01)
+            for _ in range(requests):
+                _get(url)
+
+            worker_memory = [process_memory(pid) for pid in _children(server.pid)]
+            master_memory = process_memory(server.pid)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+
+    count = len(worker_memory)
+    return {
+        'preload': preload,
+        'gc_freeze': gc_freeze,
+        'workers': count,
+        'first_response_ms': round(first_response * 1000, 1),
+        'master_rss_kb': master_memory['rss'],
+        'worker_rss_kb': round(sum(m['rss'] for m in worker_memory) / count),
+        'worker_pss_kb': round(sum(m['pss'] for m in worker_memory) / count),
+        'worker_uss_kb': round(sum(m['uss'] for m in worker_memory) / count),
+        'total_pss_kb': master_memory['pss'] + sum(m['pss'] for m in worker_memory),
+    }
+
+
+def run_preload_benchmark(workers: int = 4, requests: int = 50, gc_freeze: bool = True) -> list:
+    """Measures gunicorn without preload, with preload and, optionally, with preload plus gc.freeze()."""
+    if not Path('/proc/self/smaps_rollup').exists():
+        raise ValueError("Measuring worker memory needs Linux's /proc/<pid>/smaps_rollup.")
+    profiles = [(False, False), (True, False)]
+    if gc_freeze:
+        profiles.append((True, True))
+    return [measure_gunicorn(preload, workers, requests, freeze) for preload, freeze in profiles]
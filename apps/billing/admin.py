@@ -1,12 +1,13 @@
 # billing/admin.py
 
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
 from .models import Invoice, InvoiceItem
-from .services import recalculate_invoice_total
+from .services import recalculate_invoice_total, release_invoice_reservations, cancel_invoice, mark_invoice_paid
+from apps.customers.services import record_invoice_issued, refresh_customer_stats
 
 
 class InvoiceItemInline(admin.TabularInline):
@@ -86,11 +87,31 @@ class InvoiceAdmin(admin.ModelAdmin):
     balance_due_display.short_description = _('Balance Due')
 
     def save_model(self, request, obj, form, change):
-        """Automatically set the created_by field on creation."""
+        """Sets created_by on creation and routes status changes through the billing services."""
         if not obj.pk:
             obj.created_by = request.user
+        # Paying goes through mark_invoice_paid, which flips the status and
+        # turns the invoice's reserved stock into sales
+        paying = change and 'status' in form.changed_data and obj.status == Invoice.Status.PAID
+        if paying:
+            obj.status = form.initial['status']
         super().save_model(request, obj, form, change)
 
+        if paying:
+            try:
+                mark_invoice_paid(obj)
+            except ValueError as e:
+                self.message_user(request, str(e), messages.ERROR)
+        # A cancelled invoice no longer holds stock
+        if change and 'status' in form.changed_data and obj.status == Invoice.Status.CANCELLED:
+            release_invoice_reservations(obj)
+
+        # Keep the customer's statistics in line with the edit
+        if not change:
+            record_invoice_issued(obj)
+        elif {'customer', 'status', 'issued_at'} & set(form.changed_data):
+            refresh_customer_stats({obj.customer_id, form.initial.get('customer', obj.customer_id)})
+
     def save_formset(self, request, form, formset, change):
         """Recalculate invoice total after items are saved."""
         formset.save()
@@ -112,4 +133,12 @@ class InvoiceAdmin(admin.ModelAdmin):
         updated = queryset.filter(status=Invoice.Status.DRAFT).update(status=Invoice.Status.SENT)
         self.message_user(request, _('%(count)d invoices were successfully marked as sent.') % {'count': updated})
     
-    actions = [mark_as_sent]
\ No newline at end of file
+    @admin.action(description=_('Cancel selected invoices and release their stock'))
+    def cancel_invoices(self, request, queryset):
+        cancelled = 0
+        for invoice in queryset.exclude(status__in=[Invoice.Status.PAID, Invoice.Status.CANCELLED]):
+            cancel_invoice(invoice)
+            cancelled += 1
+        self.message_user(request, _('%(count)d invoices were cancelled.') % {'count': cancelled})
+
+    actions = [mark_as_sent, cancel_invoices]
\ No newline at end of file
@@ -0,0 +1,46 @@
+# billing/async_views.py
+"""
+Async version of the PDF view, used instead of the one in billing.views
+when ASYNC_VIEWS is set (serve config.asgi with it). Invoice emails need no
+async version: the view only queues a job (billing.tasks.email_invoice).
+
+The invoice is loaded with the async ORM and the PDF is rendered in a
+process pool (billing.rendering), so the event loop stays free for the rest
+of the site while it is in progress. The pool is bounded: once it is full,
+further requests are turned away straight away instead of queueing.
+"""
+import logging
+
+from django.http import HttpResponse
+from django.shortcuts import aget_object_or_404
+
+from common.concurrency import Overloaded
+
+from .models import Invoice
+from .rendering import render_invoice_pdf
+
+logger = logging.getLogger(__name__)
+
+# Seconds a client is asked to wait before retrying a shed request
+RETRY_AFTER = 5
+
+
+def _pdf_invoices():
+    # Everything the PDF template reads, so the renderer needs no queries
+    return Invoice.objects.select_related('customer').prefetch_related('items__product')
+
+
+async def download_invoice_pdf(request, pk):
+    """Generates and returns an invoice as a PDF download."""
+    invoice = await aget_object_or_404(_pdf_invoices(), pk=pk)
+    try:
+        pdf = await render_invoice_pdf(invoice)
+    except (Overloaded, TimeoutError) as e:
+        logger.warning("Shed PDF download of invoice %s: %s", invoice.pk, e)
+        response = HttpResponse("PDF rendering is busy, please try again shortly.", status=503)
+        response['Retry-After'] = str(RETRY_AFTER)
+        return response
+
+    response = HttpResponse(pdf, content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="Invoice_{invoice.invoice_number}.pdf"'
+    return response
@@ -1,21 +1,38 @@
 # billing/forms.py
 from django import forms
+from django.db.models import Q
 from .models import Invoice
+from apps.customers.models import Customer
 from apps.catalog.models import Product
+from common.widgets import AutocompleteSelect
 
 class InvoiceForm(forms.ModelForm):
     class Meta:
         model = Invoice
         fields = ['customer', 'issued_at', 'due_at', 'notes']
         widgets = {
+            # Options are searched on demand instead of rendering every customer
+            'customer': AutocompleteSelect('customer-autocomplete'),
             'issued_at': forms.DateInput(attrs={'type': 'date'}),
             'due_at': forms.DateInput(attrs={'type': 'date'}),
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Only live customers can be invoiced, but keep the current one selectable
+        if self.instance.pk:
+            self.fields['customer'].queryset = Customer.objects.filter(Q(is_active=True) | Q(pk=self.instance.customer_id))
+        else:
+            self.fields['customer'].queryset = Customer.active.all()
+
 class AddItemForm(forms.Form):
-    product = forms.ModelChoiceField(queryset=None, label="Product/Service")
+    product = forms.ModelChoiceField(
+        queryset=None,
+        label="Product/Service",
+        widget=AutocompleteSelect('product-autocomplete'),
+    )
     quantity = forms.IntegerField(min_value=1, initial=1)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.fields['product'].queryset = Product.objects.filter(is_active=True)
\ No newline at end of file
+        self.fields['product'].queryset = Product.active.all()
\ No newline at end of file
@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.billing.services import purge_stale_drafts, stale_drafts
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes draft invoices older than STALE_DRAFT_AGE_DAYS days that have no items and no payments, "
+        "in small batches. Safe to interrupt and run again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.STALE_DRAFT_AGE_DAYS,
+            help=f"Only drafts created more than this many days ago (default: {settings.STALE_DRAFT_AGE_DAYS}).",
+        )
+        parser.add_argument(
+            '--include-items', action='store_true',
+            help="Also delete stale drafts that still have items, releasing the stock they reserve.",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.DRAFT_PURGE_BATCH_SIZE,
+            help=f"Drafts deleted per transaction (default: {settings.DRAFT_PURGE_BATCH_SIZE}).",
+        )
+        parser.add_argument(
+            '--pause', type=float, default=settings.DRAFT_PURGE_PAUSE,
+            help=f"Seconds to sleep between batches (default: {settings.DRAFT_PURGE_PAUSE}).",
+        )
+        parser.add_argument('--dry-run', action='store_true', help="Only count the drafts that would be deleted.")
+
+    def handle(self, *args, **options):
+        if options['days'] < 0 or options['batch_size'] < 1:
+            raise CommandError("--days must not be negative and --batch-size must be at least 1.")
+
+        if options['dry_run']:
+            count = stale_drafts(options['days'], options['include_items']).count()
+            self.stdout.write(f"{count} stale drafts would be deleted.")
+            return
+
+        def progress(purged):
+            self.stderr.write(f"  {purged} drafts deleted", ending='\r')
+
+        purged = purge_stale_drafts(
+            days=options['days'],
+            include_items=options['include_items'],
+            batch_size=options['batch_size'],
+            pause=options['pause'],
+            progress=progress if options['verbosity'] > 1 else None,
+        )
+        if options['verbosity'] > 1:
+            self.stderr.write('')
+        self.stdout.write(self.style.SUCCESS(f"Deleted {purged} stale drafts."))
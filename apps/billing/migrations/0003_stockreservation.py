@@ -0,0 +1,93 @@
+# Generated by Django 6.0.1 on 2026-10-19 02:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("billing", "0002_alter_invoice_invoice_number"),
+        ("catalog", "0004_stocklevel"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StockReservation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("quantity", models.PositiveIntegerField(verbose_name="quantity")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("ACTIVE", "Active"),
+                            ("RELEASED", "Released"),
+                            ("CONSUMED", "Consumed"),
+                        ],
+                        default="ACTIVE",
+                        max_length=10,
+                        verbose_name="status",
+                    ),
+                ),
+                (
+                    "expires_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="When a reservation on a draft invoice may be released by the reaper.",
+                        null=True,
+                        verbose_name="expires at",
+                    ),
+                ),
+                (
+                    "invoice",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_reservations",
+                        to="billing.invoice",
+                        verbose_name="Invoice",
+                    ),
+                ),
+                (
+                    "invoice_item",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="stock_reservations",
+                        to="billing.invoiceitem",
+                        verbose_name="Invoice item",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="stock_reservations",
+                        to="catalog.product",
+                        verbose_name="Product",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "stock reservation",
+                "verbose_name_plural": "stock reservations",
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("status", "ACTIVE")),
+                        fields=["expires_at"],
+                        name="reservation_active_expiry_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -204,4 +204,75 @@ class InvoiceItem(TimeStampedModel):
         # calculate total price
         self.total = self.quantity * self.unit_price
 
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+
+class StockReservation(TimeStampedModel):
+    """
+    Ledger entry holding stock of a tracked product for an invoice line.
+
+    Stock is reserved when the item is added, released when the item is
+    removed or the invoice cancelled (or the draft expires), and consumed
+    into a real deduction when the invoice is paid.
+    """
+
+    class Status(models.TextChoices):
+        ACTIVE = 'ACTIVE', _('Active')
+        RELEASED = 'RELEASED', _('Released')
+        CONSUMED = 'CONSUMED', _('Consumed')
+    # --- Relationship Fields ---
+    product = models.ForeignKey(
+        'catalog.Product',
+        on_delete=models.PROTECT,
+        related_name='stock_reservations',
+        verbose_name=_("Product"),
+    )
+
+    invoice = models.ForeignKey(
+        Invoice,
+        on_delete=models.CASCADE,
+        related_name='stock_reservations',
+        verbose_name=_("Invoice"),
+    )
+
+    invoice_item = models.ForeignKey(
+        InvoiceItem,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='stock_reservations',
+        verbose_name=_("Invoice item"),
+    )
+    # --- Reservation Fields ---
+    quantity = models.PositiveIntegerField(
+        _("quantity"),
+    )
+
+    status = models.CharField(
+        _("status"),
+        max_length=10,
+        choices=Status.choices,
+        default=Status.ACTIVE,
+    )
+
+    expires_at = models.DateTimeField(
+        _("expires at"),
+        null=True,
+        blank=True,
+        help_text=_("When a reservation on a draft invoice may be released by the reaper."),
+    )
+
+    class Meta:
+        verbose_name = _("stock reservation")
+        verbose_name_plural = _("stock reservations")
+        indexes = [
+            # The reaper only ever scans active reservations by expiry
+            models.Index(
+                fields=['expires_at'],
+                condition=models.Q(status='ACTIVE'),
+                name='reservation_active_expiry_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} x {self.product_id} for invoice {self.invoice_id} ({self.status})"
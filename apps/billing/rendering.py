@@ -0,0 +1,66 @@
+# billing/rendering.py
+"""
+Invoice PDFs rendered in a pool of worker processes, for the async views.
+
+ReportLab holds the GIL for the whole render, so rendering inside an ASGI
+worker would stall its event loop and every other request it is serving.
+The pool's processes are spawned rather than forked (the server may run
+threads) and set Django up themselves. This module must therefore not import
+any model at the top level: it is the first thing a new process imports.
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+
+from common.concurrency import ConcurrencyLimit
+
+
+def _start_renderer():
+    import django
+
+    django.setup()
+    from .utils import warm_up_pdf_rendering
+
+    warm_up_pdf_rendering()
+
+
+def _render_invoice_pdf(invoice) -> bytes:
+    from .utils import generate_invoice_pdf
+
+    return generate_invoice_pdf(invoice).getvalue()
+
+
+@lru_cache(maxsize=None)
+def pdf_pool() -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=settings.PDF_RENDER_PROCESSES,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_start_renderer,
+    )
+
+
+@lru_cache(maxsize=None)
+def pdf_render_limit() -> ConcurrencyLimit:
+    return ConcurrencyLimit(settings.PDF_RENDER_MAX_PENDING)
+
+
+async def render_invoice_pdf(invoice) -> bytes:
+    """
+    Renders the invoice in the process pool and returns the PDF.
+
+    ``invoice`` is pickled into the pool together with its cached relations,
+    so it must come with ``customer`` and ``items__product`` already loaded;
+    the renderer never touches the database.
+    Raises common.concurrency.Overloaded when PDF_RENDER_MAX_PENDING renders
+    are already running or queued, and TimeoutError after PDF_RENDER_TIMEOUT.
+    """
+    with pdf_render_limit().slot():
+        future = pdf_pool().submit(_render_invoice_pdf, invoice)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), settings.PDF_RENDER_TIMEOUT)
+        except asyncio.TimeoutError:
+            future.cancel()  # Only drops it if still queued; a running render finishes unseen
+            raise TimeoutError(f"Rendering took longer than {settings.PDF_RENDER_TIMEOUT}s")
@@ -1,11 +1,21 @@
-from .models import Invoice, InvoiceItem
+from .models import Invoice, InvoiceItem, StockReservation
 from django.db import transaction
 from django.db import models
 from decimal import Decimal
 import uuid
+from datetime import timedelta
+from time import sleep
+from django.conf import settings
+from django.core.mail import EmailMessage
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
-from apps.catalog.models import Product
+from collections import defaultdict
+from apps.catalog.cache import get_product_snapshot, get_product_snapshots
+from apps.catalog.services import commit_sales, get_available_stock, release_stock, reserve_stock
+from apps.customers.services import apply_customer_stats_delta, record_invoice_issued
+from common.services import apply_bulk_updates, raw_delete
+
+TAX_RATE = Decimal('0.10')  # Assume a fixed tax rate of 10% for simplicity
 
 
 # --- Core Calculation Service ---
@@ -19,14 +29,17 @@ def recalculate_invoice_total(invoice: Invoice):
     # Use aggregate to get the sum of all item totals for this invoice
     items_total = invoice.items.aggregate(
         total_sum=models.Sum('total')
-    )['total_sum'] or 0.0
+    )['total_sum'] or Decimal('0.00')
 
     invoice.subtotal = items_total
 
-    tax_rate = 0.1  # Assume a fixed tax rate of 10% for simplicity
-    invoice.tax_amount = invoice.subtotal * tax_rate
+    invoice.tax_amount = (invoice.subtotal * TAX_RATE).quantize(Decimal('0.01'))
     invoice.total_amount = invoice.subtotal + invoice.tax_amount
 
+    # Read the persisted total so the customer's lifetime billed can be
+    # adjusted by the difference rather than re-aggregated.
+    previous = Invoice.objects.filter(pk=invoice.pk).values('total_amount', 'status', 'customer_id').first()
+
     # We use save() without calling the full save() method to avoid
     # triggering the clean() validation if the invoice is locked.
     # This is safe because this is an internal calculation.
@@ -37,6 +50,11 @@ def recalculate_invoice_total(invoice: Invoice):
         total_amount=invoice.total_amount
     )
 
+    if previous and previous['status'] != Invoice.Status.CANCELLED:
+        billed_delta = invoice.total_amount - previous['total_amount']
+        if billed_delta:
+            apply_customer_stats_delta(previous['customer_id'], billed=billed_delta)
+
 
 
 
@@ -54,9 +72,9 @@ def create_invoice(customer_id: int, created_by_user, due_date: timezone.datetim
     """
     Creates a new draft invoice for a given customer.
     """
-    from customers.models import Customer # Avoid circular import
+    from apps.customers.models import Customer # Avoid circular import
     try:
-        customer = Customer.objects.get(pk=customer_id, is_active=True)
+        customer = Customer.active.get(pk=customer_id)
     except Customer.DoesNotExist:
         raise ValueError(_("Customer with ID %(id)s does not exist or is inactive.") % {'id': customer_id})
 
@@ -68,6 +86,7 @@ def create_invoice(customer_id: int, created_by_user, due_date: timezone.datetim
         due_at=due_date,
         # Subtotal, tax, and total will be 0 by default
     )
+    record_invoice_issued(invoice)
     return invoice
 
 
@@ -80,24 +99,34 @@ def add_invoice_item(invoice: Invoice, product_id: int, quantity: int) -> Invoic
     if invoice.status in [Invoice.Status.PAID, Invoice.Status.CANCELLED]:
         raise ValueError(_("Cannot add items to a %(status)s invoice.") % {'status': invoice.status})
 
-    try:
-        product = Product.objects.get(pk=product_id, is_active=True)
-    except Product.DoesNotExist:
+    # Name, price and flags come from the process-local catalog cache
+    product = get_product_snapshot(product_id)
+    if product is None or not product.is_active:
         raise ValueError(_("Product with ID %(id)s does not exist or is inactive.") % {'id': product_id})
 
-    # Check inventory if applicable
-    if product.track_inventory and product.stock_quantity < quantity:
+    # Reserve inventory if applicable; the check and the hold are one conditional UPDATE
+    if product.track_inventory and not reserve_stock(product_id, quantity):
         raise ValueError(_("Not enough stock for '%(product)s'. Available: %(stock)s, Requested: %(qty)s.") % 
-                         {'product': product.name, 'stock': product.stock_quantity, 'qty': quantity})
+                         {'product': product.name, 'stock': get_available_stock(product_id), 'qty': quantity})
 
     # Create the invoice item with a price snapshot
     item = InvoiceItem.objects.create(
         invoice=invoice,
-        product=product,
+        product_id=product.id,
+        description=product.description or product.name,
         quantity=quantity,
         unit_price=product.unit_price, # Price is captured here
     )
 
+    if product.track_inventory:
+        StockReservation.objects.create(
+            product_id=product.id,
+            invoice=invoice,
+            invoice_item=item,
+            quantity=quantity,
+            expires_at=_reservation_expiry(invoice),
+        )
+
     # The post_save signal will automatically trigger recalculate_invoice_total
     return item
 
@@ -113,7 +142,8 @@ def remove_invoice_item(invoice_item_id: int) -> None:
         if invoice.status in [Invoice.Status.PAID, Invoice.Status.CANCELLED]:
             raise ValueError(_("Cannot remove items from a %(status)s invoice.") % {'status': invoice.status})
         item.delete()
-        # The post_delete signal will automatically trigger recalculate_invoice_total
+        # The pre_delete signal releases the item's stock reservation and the
+        # post_delete signal will automatically trigger recalculate_invoice_total
     except InvoiceItem.DoesNotExist:
         raise ValueError(_("Invoice item with ID %(id)s does not exist.") % {'id': invoice_item_id})
 
@@ -123,27 +153,387 @@ def mark_invoice_paid(invoice: Invoice) -> Invoice:
     """
     Marks an invoice as paid and updates inventory for tracked products.
     """
-    if invoice.status == Invoice.Status.PAID:
+    # Checked against the database, not ``invoice``: another request may have
+    # paid or cancelled it since it was loaded
+    if not settle_invoices([invoice.pk]):
+        status = Invoice.objects.filter(pk=invoice.pk).values_list('status', flat=True).get()
+        if status == Invoice.Status.CANCELLED:
+            raise ValueError(_("Cannot mark a cancelled invoice as paid."))
         raise ValueError(_("Invoice %(number)s is already marked as paid.") % {'number': invoice.invoice_number})
-    
-    if invoice.status == Invoice.Status.CANCELLED:
-        raise ValueError(_("Cannot mark a cancelled invoice as paid."))
-
-    # Update inventory for each item on the invoice
-    for item in invoice.items.all():
-        if item.product.track_inventory:
-            # Use F() expressions to prevent race conditions
-            Product.objects.filter(pk=item.product.pk).update(
-                stock_quantity=models.F('stock_quantity') - item.quantity
-            )
-
-    # Update the invoice status
     invoice.status = Invoice.Status.PAID
-    invoice.save() # Use save() to trigger any potential post_save logic for the invoice itself
+    return invoice
+
+
+# --- Bulk Invoice Services ---
+
+@transaction.atomic
+def bulk_create_invoices(entries: list, created_by_id: int = None) -> list:
+    """
+    Creates draft invoices together with their items in a fixed number of
+    statements, whatever the batch size. Each entry is a dict with
+    'customer_id', 'due_at', optional 'issued_at' and 'notes', and a list of
+    'items' ({'product_id', 'quantity'}).
+
+    Prices are captured from the catalog cache as in add_invoice_item and
+    totals are computed up front, so no per-item signal or recalculation runs.
+    Stock is reserved with one conditional UPDATE per distinct tracked product.
+    Raises ValueError (rolling everything back) on an unknown customer or
+    product, or insufficient stock.
+    """
+    from apps.customers.models import Customer  # Avoid circular import
+
+    customer_ids = {entry['customer_id'] for entry in entries}
+    missing = customer_ids - set(Customer.active.filter(pk__in=customer_ids).values_list('pk', flat=True))
+    if missing:
+        raise ValueError(_("Customers do not exist or are inactive: %(ids)s.") % {
+            'ids': ', '.join(map(str, sorted(missing)))})
+
+    wanted = defaultdict(int)
+    for entry in entries:
+        for line in entry.get('items', []):
+            wanted[line['product_id']] += line['quantity']
+    products = get_product_snapshots(wanted)
+    missing = {pk for pk in wanted if pk not in products or not products[pk].is_active}
+    if missing:
+        raise ValueError(_("Products do not exist or are inactive: %(ids)s.") % {
+            'ids': ', '.join(map(str, sorted(missing)))})
+
+    for product_id, quantity in wanted.items():
+        product = products[product_id]
+        if product.track_inventory and not reserve_stock(product_id, quantity):
+            raise ValueError(_("Not enough stock for '%(product)s'. Available: %(stock)s, Requested: %(qty)s.") %
+                             {'product': product.name, 'stock': get_available_stock(product_id), 'qty': quantity})
+
+    invoices = []
+    for entry in entries:
+        subtotal = sum(
+            (products[line['product_id']].unit_price * line['quantity'] for line in entry.get('items', [])),
+            Decimal('0.00'),
+        )
+        tax_amount = (subtotal * TAX_RATE).quantize(Decimal('0.01'))
+        invoices.append(Invoice(
+            customer_id=entry['customer_id'],
+            created_by_id=created_by_id,
+            invoice_number=_generate_unique_invoice_number(),
+            status=Invoice.Status.DRAFT,
+            issued_at=entry.get('issued_at') or timezone.localdate(),
+            due_at=entry['due_at'],
+            notes=entry.get('notes'),
+            subtotal=subtotal,
+            tax_amount=tax_amount,
+            total_amount=subtotal + tax_amount,
+        ))
+    Invoice.objects.bulk_create(invoices)
+
+    items = []
+    for invoice, entry in zip(invoices, entries):
+        for line in entry.get('items', []):
+            product = products[line['product_id']]
+            items.append(InvoiceItem(
+                invoice=invoice,
+                product_id=product.id,
+                description=product.description or product.name,
+                quantity=line['quantity'],
+                unit_price=product.unit_price,
+                total=product.unit_price * line['quantity'],
+            ))
+    InvoiceItem.objects.bulk_create(items)
+    StockReservation.objects.bulk_create([
+        StockReservation(
+            product_id=item.product_id,
+            invoice=item.invoice,
+            invoice_item=item,
+            quantity=item.quantity,
+            expires_at=_reservation_expiry(item.invoice),
+        )
+        for item in items if products[item.product_id].track_inventory
+    ])
+
+    # One statistics UPDATE per customer rather than per invoice
+    per_customer = {}
+    for invoice in invoices:
+        count, billed, last = per_customer.get(invoice.customer_id, (0, Decimal('0.00'), invoice.issued_at))
+        per_customer[invoice.customer_id] = (count + 1, billed + invoice.total_amount, max(last, invoice.issued_at))
+    for customer_id, (count, billed, last) in per_customer.items():
+        apply_customer_stats_delta(customer_id, invoices=count, billed=billed, invoice_date=last)
+
+    return invoices
+
+
+@transaction.atomic
+def bulk_update_invoices(rows: list, batch_size: int = 500) -> list:
+    """
+    Changes the due date and/or notes of many invoices (dicts with an 'id'
+    key) with one read and batched UPDATEs. Paid and cancelled invoices are
+    locked, as in Invoice.clean.
+    """
+    locked = list(
+        Invoice.objects
+        .filter(pk__in=[row['id'] for row in rows], status__in=[Invoice.Status.PAID, Invoice.Status.CANCELLED])
+        .values_list('invoice_number', flat=True)
+    )
+    if locked:
+        raise ValueError(_("Paid or cancelled invoices cannot be modified: %(numbers)s.") % {
+            'numbers': ', '.join(locked)})
+    return apply_bulk_updates(Invoice.objects.all(), rows, ('due_at', 'notes'), batch_size)
+
+
+# --- Stock Reservation Services ---
+
+def _reservation_expiry(invoice: Invoice):
+    """Reservations on drafts lapse after STOCK_RESERVATION_TTL; issued invoices hold stock until paid."""
+    if invoice.status != Invoice.Status.DRAFT:
+        return None
+    return timezone.now() + timedelta(seconds=getattr(settings, 'STOCK_RESERVATION_TTL', 24 * 60 * 60))
+
+
+def _release_reservations(reservations) -> int:
+    """
+    Releases the given reservations, returning their units to available stock.
+    Each reservation is flipped with a conditional UPDATE so that a reservation
+    that is concurrently consumed or reaped is never released twice.
+    """
+    released = 0
+    for pk, product_id, quantity in reservations.values_list('pk', 'product_id', 'quantity'):
+        flipped = StockReservation.objects.filter(
+            pk=pk, status=StockReservation.Status.ACTIVE
+        ).update(status=StockReservation.Status.RELEASED, updated_at=timezone.now())
+        if flipped:
+            release_stock(product_id, quantity)
+            released += 1
+    return released
+
+
+@transaction.atomic
+def release_item_reservations(item: InvoiceItem) -> int:
+    """Releases the stock held for an invoice line, e.g. when it is removed."""
+    return _release_reservations(item.stock_reservations.filter(status=StockReservation.Status.ACTIVE))
+
+
+@transaction.atomic
+def release_invoice_reservations(invoice: Invoice) -> int:
+    """Releases all stock held for an invoice, e.g. when it is cancelled."""
+    return _release_reservations(invoice.stock_reservations.filter(status=StockReservation.Status.ACTIVE))
+
+
+@transaction.atomic
+def release_draft_reservations(product_ids) -> int:
+    """Releases the stock that draft invoices hold for the given products, e.g. when they are deactivated."""
+    return _release_reservations(StockReservation.objects.filter(
+        product_id__in=product_ids, status=StockReservation.Status.ACTIVE, invoice__status=Invoice.Status.DRAFT,
+    ))
+
 
+@transaction.atomic
+def consume_reservations(invoice_ids: list) -> None:
+    """
+    Converts the reservations of invoices that have just been paid into
+    stock deductions.
+
+    Every tracked line is deducted from stock on hand. Units that were
+    reserved already left available stock when the item was added; any line
+    without an active reservation (reaped, or added outside add_invoice_item)
+    is taken out of available stock now, and units reserved for a line that
+    no longer exists go back. However many invoices there are, this costs
+    one read of the items, one of the reservations, one UPDATE consuming
+    them, one ledger insert and one stock UPDATE per product.
+    """
+    sold = defaultdict(int)
+    for invoice_id, product_id, quantity in (
+        InvoiceItem.objects
+        .filter(invoice_id__in=invoice_ids, product__track_inventory=True)
+        .values_list('invoice_id', 'product_id', 'quantity')
+    ):
+        sold[product_id, invoice_id] += quantity
+
+    # Locked, so the expired reservation reaper cannot release them meanwhile
+    active = StockReservation.objects.filter(invoice_id__in=invoice_ids, status=StockReservation.Status.ACTIVE)
+    reserved = defaultdict(int)
+    consumed = []
+    for pk, product_id, quantity in active.select_for_update().values_list('pk', 'product_id', 'quantity'):
+        reserved[product_id] += quantity
+        consumed.append(pk)
+    StockReservation.objects.filter(pk__in=consumed).update(
+        status=StockReservation.Status.CONSUMED, updated_at=timezone.now(),
+    )
+    commit_sales(sold, reserved)
+
+
+# Invoices that can still be paid or cancelled
+OPEN_STATUSES = [Invoice.Status.DRAFT, Invoice.Status.SENT, Invoice.Status.OVERDUE]
+
+
+def settle_invoices(invoice_ids: list) -> bool:
+    """
+    Marks open invoices as paid and consumes their stock reservations. Call
+    it inside a transaction.
+
+    The status is flipped first with one conditional UPDATE, and stock is only
+    touched when that changed every invoice, so an invoice settled twice at
+    once is deducted once. Returns False, having changed nothing, when none of
+    the invoices is open any more; raises ValueError when only some are, so
+    the caller's transaction rolls back.
+    """
+    invoice_ids = set(invoice_ids)
+    flipped = Invoice.objects.filter(pk__in=invoice_ids, status__in=OPEN_STATUSES).update(status=Invoice.Status.PAID)
+    if not flipped:
+        return False
+    if flipped != len(invoice_ids):
+        raise ValueError(_("Some of these invoices were paid or cancelled by another request."))
+    consume_reservations(list(invoice_ids))
+    return True
+
+
+@transaction.atomic
+def cancel_invoice(invoice: Invoice) -> Invoice:
+    """Cancels an unpaid invoice and releases the stock reserved for it."""
+    total_amount = Invoice.objects.filter(pk=invoice.pk).values_list('total_amount', flat=True).get()
+    # Conditional, like settle_invoices(): the invoice may have been paid since it was loaded
+    if not Invoice.objects.filter(pk=invoice.pk, status__in=OPEN_STATUSES).update(status=Invoice.Status.CANCELLED):
+        status = Invoice.objects.filter(pk=invoice.pk).values_list('status', flat=True).get()
+        if status == Invoice.Status.PAID:
+            raise ValueError(_("Cannot cancel a paid invoice."))
+        raise ValueError(_("Invoice %(number)s is already cancelled.") % {'number': invoice.invoice_number})
+    invoice.status = Invoice.Status.CANCELLED
+    release_invoice_reservations(invoice)
+    # Cancelled invoices no longer count towards the customer's lifetime billed
+    apply_customer_stats_delta(invoice.customer_id, billed=-total_amount)
     return invoice
 
 
+@transaction.atomic
+def cancel_customer_drafts(customer_ids) -> int:
+    """Cancels the draft invoices of the given customers, e.g. when they are deactivated. Returns how many."""
+    drafts = Invoice.objects.filter(customer_id__in=customer_ids, status=Invoice.Status.DRAFT)
+    count = 0
+    for invoice in drafts.select_for_update():
+        cancel_invoice(invoice)
+        count += 1
+    return count
+
+
+def release_expired_reservations(batch_size: int = 500) -> int:
+    """
+    Reaper for abandoned drafts: releases active reservations whose expiry has
+    passed while their invoice is still a draft. Works in small batches so no
+    single transaction holds the write lock for long. Returns the number released.
+    """
+    released = 0
+    while True:
+        with transaction.atomic():
+            batch = StockReservation.objects.filter(
+                pk__in=list(
+                    StockReservation.objects
+                    .filter(
+                        status=StockReservation.Status.ACTIVE,
+                        expires_at__lt=timezone.now(),
+                        invoice__status=Invoice.Status.DRAFT,
+                    )
+                    .values_list('pk', flat=True)[:batch_size]
+                )
+            )
+            count = _release_reservations(batch)
+        released += count
+        if count < batch_size:
+            return released
+
+
+
+# --- Draft Purge Services ---
+
+def stale_drafts(days: int = None, include_items: bool = False):
+    """
+    Draft invoices created more than ``days`` (STALE_DRAFT_AGE_DAYS) days ago
+    that never got a payment and, unless ``include_items``, have no items.
+    """
+    from apps.payments.models import Payment  # Avoid circular import
+
+    days = settings.STALE_DRAFT_AGE_DAYS if days is None else days
+    drafts = Invoice.objects.filter(
+        status=Invoice.Status.DRAFT, created_at__lt=timezone.now() - timedelta(days=days),
+    ).exclude(models.Exists(Payment.objects.filter(invoice=models.OuterRef('pk'))))
+    if not include_items:
+        drafts = drafts.exclude(models.Exists(InvoiceItem.objects.filter(invoice=models.OuterRef('pk'))))
+    return drafts
+
+
+@transaction.atomic
+def discard_invoice_items(invoice_ids: list) -> int:
+    """
+    Deletes every item on the given invoices with one DELETE instead of one
+    pre_delete and post_delete signal per item. Stock still reserved for
+    them is released with one UPDATE per product; totals are not
+    recalculated, so only use this on invoices that are being deleted too.
+    Returns the number of items deleted.
+    """
+    active = StockReservation.objects.filter(invoice_id__in=invoice_ids, status=StockReservation.Status.ACTIVE)
+    reserved = defaultdict(int)
+    for product_id, quantity in active.select_for_update().values_list('product_id', 'quantity'):
+        reserved[product_id] += quantity
+    active.update(status=StockReservation.Status.RELEASED, updated_at=timezone.now())
+    for product_id, quantity in reserved.items():
+        release_stock(product_id, quantity)
+    return raw_delete(InvoiceItem.objects.filter(invoice_id__in=invoice_ids))
+
+
+@transaction.atomic
+def _purge_drafts(drafts) -> int:
+    """Deletes the given (locked) drafts and takes them off their customers' stats."""
+    from apps.catalog.models import StockMovement  # Avoid circular import
+
+    rows = list(drafts.select_for_update().values_list('pk', 'customer_id', 'total_amount'))
+    if not rows:
+        return 0
+    invoice_ids = [pk for pk, customer_id, total in rows]
+    discard_invoice_items(invoice_ids)
+    raw_delete(StockReservation.objects.filter(invoice_id__in=invoice_ids))
+    StockMovement.objects.filter(invoice_id__in=invoice_ids).update(invoice=None)
+    raw_delete(Invoice.objects.filter(pk__in=invoice_ids))
+
+    # Drafts count towards invoice_count and lifetime billed (see record_invoice_issued)
+    removed = defaultdict(lambda: [0, Decimal('0.00')])
+    for pk, customer_id, total in rows:
+        removed[customer_id][0] += 1
+        removed[customer_id][1] += total
+    for customer_id, (count, billed) in removed.items():
+        apply_customer_stats_delta(customer_id, invoices=-count, billed=-billed)
+    return len(rows)
+
+
+def purge_stale_drafts(
+    days: int = None,
+    include_items: bool = False,
+    batch_size: int = None,
+    pause: float = None,
+    progress=None,
+) -> int:
+    """
+    Deletes stale drafts (see stale_drafts) in primary key order, one
+    transaction per ``batch_size`` (DRAFT_PURGE_BATCH_SIZE) invoices, and
+    sleeps ``pause`` (DRAFT_PURGE_PAUSE) seconds between batches so that no
+    one waits long for the write lock. Nothing is loaded into models and no
+    delete signals run. Returns the number of drafts deleted.
+    """
+    batch_size = batch_size or settings.DRAFT_PURGE_BATCH_SIZE
+    pause = settings.DRAFT_PURGE_PAUSE if pause is None else pause
+    drafts = stale_drafts(days, include_items)
+    purged = 0
+    last_pk = 0
+    while True:
+        # The pk range (last_pk, upper] holds the next batch_size stale drafts;
+        # they are selected again, and locked, inside the deleting transaction
+        upper = drafts.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[batch_size - 1:batch_size]
+        upper = next(iter(upper), None)
+        if upper is None:  # Fewer than batch_size left
+            return purged + _purge_drafts(drafts.filter(pk__gt=last_pk))
+        purged += _purge_drafts(drafts.filter(pk__gt=last_pk, pk__lte=upper))
+        last_pk = upper
+        if progress:
+            progress(purged)
+        if pause:
+            sleep(pause)
+
+
 # =======================================================
 
 @transaction.atomic
@@ -166,6 +556,7 @@ def clone_invoice(original_invoice_id: int, new_due_date: timezone.datetime.date
         due_at=new_due_date,
         notes=original_invoice.notes,
     )
+    record_invoice_issued(new_invoice)
 
     # Copy all items from the original invoice
     new_items = []
@@ -176,6 +567,7 @@ def clone_invoice(original_invoice_id: int, new_due_date: timezone.datetime.date
             description=item.description,
             quantity=item.quantity,
             unit_price=item.unit_price, # Snapshot the price again
+            total=item.total, # bulk_create bypasses save(), so copy the line total
         ))
     
     InvoiceItem.objects.bulk_create(new_items)
@@ -183,4 +575,16 @@ def clone_invoice(original_invoice_id: int, new_due_date: timezone.datetime.date
     # Recalculate the total for the new invoice
     recalculate_invoice_total(new_invoice)
     
-    return new_invoice
\ No newline at end of file
+    return new_invoice
+
+
+def build_invoice_email(invoice: Invoice, pdf: bytes) -> EmailMessage:
+    """The message that sends an invoice PDF to its customer."""
+    email = EmailMessage(
+        subject=f"Invoice {invoice.invoice_number} from Your Company",
+        body=f"Dear {invoice.customer.name},\n\nPlease find your attached invoice.\n\nThank you for your business.",
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[invoice.customer.email],
+    )
+    email.attach(f'Invoice_{invoice.invoice_number}.pdf', pdf, 'application/pdf')
+    return email
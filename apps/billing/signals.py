@@ -1,9 +1,12 @@
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save, post_delete, pre_delete
 from django.dispatch import receiver
-from .models import Invoice, InvoiceItem
-from .services import recalculate_invoice_total
 from apps.catalog.models import Product
-from django.db import models
+from apps.customers.models import Customer
+from common.models import deactivated
+from .models import InvoiceItem
+from .services import (
+    cancel_customer_drafts, recalculate_invoice_total, release_draft_reservations, release_item_reservations,
+)
 
 @receiver(post_save, sender=InvoiceItem)
 @receiver(post_delete, sender=InvoiceItem)
@@ -14,26 +17,27 @@ def update_invoice_on_item_change(sender, instance, **kwargs):
     if instance.invoice:
         recalculate_invoice_total(instance.invoice)
 
-@receiver(post_save, sender=InvoiceItem)
-def handle_invoice_status_change(sender, instance, created, **kwargs):
+@receiver(pre_delete, sender=InvoiceItem)
+def release_stock_on_item_delete(sender, instance, **kwargs):
     """
-    Handles logic when an invoice's status changes, like updating inventory.
+    When an invoice item is deleted (service, admin inline or cascade), give
+    any stock still reserved for it back to the product.
     """
-    # We only care about updates, not new creations
-    if not created:
-        try:
-            # Get the old status from the database before the save
-            old_instance = Invoice.objects.get(pk=instance.pk)
-            old_status = old_instance.status
-            new_status = instance.status
+    release_item_reservations(instance)
+
+
+# Soft-delete cascades (see common.models.deactivated)
+
+@receiver(deactivated, sender=Product)
+def release_stock_of_deactivated_products(sender, pks, **kwargs):
+    """
+    Drafts stop holding stock for a product that is deactivated. Issued
+    invoices keep theirs: those sales still go ahead.
+    """
+    release_draft_reservations(pks)
+
 
-            # Get the old status from the database before the save
-            if old_status != Invoice.Status.PAID and new_status == Invoice.Status.PAID:
-                for item in instance.items.all():
-                    if item.product.track_inventory:
-                        Product.objects.filter(pk=item.product.pk).update(
-                            stock_quantity=models.F('stock_quantity') - item.quantity
-                        )
-        except Invoice.DoesNotExist:
-            # Handle cases where the invoice might have been deleted
-            pass  # Invoice was just created, no old status to compare
\ No newline at end of file
+@receiver(deactivated, sender=Customer)
+def cancel_drafts_of_deactivated_customers(sender, pks, **kwargs):
+    """A deactivated customer's drafts will never be issued, so they are cancelled and their stock released."""
+    cancel_customer_drafts(pks)
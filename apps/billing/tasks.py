@@ -0,0 +1,21 @@
+# billing/tasks.py
+"""Background jobs for billing work that should not hold up a request (see common.jobs)."""
+from django.db.models import Prefetch
+
+from common.jobs.services import job
+
+from .models import Invoice, InvoiceItem
+from .services import build_invoice_email
+
+
+@job('billing.email_invoice', max_attempts=5)
+def email_invoice(invoice_id: int):
+    """Renders the invoice PDF and emails it to the customer; SMTP errors are retried."""
+    from .utils import generate_invoice_pdf  # Only job workers need ReportLab
+
+    invoice = (
+        Invoice.objects.select_related('customer')
+        .prefetch_related(Prefetch('items', queryset=InvoiceItem.objects.select_related('product')))
+        .get(pk=invoice_id)
+    )
+    build_invoice_email(invoice, generate_invoice_pdf(invoice).getvalue()).send()
@@ -1,3 +1,296 @@
-from django.test import TestCase
+import datetime
+from contextlib import ExitStack
+from decimal import Decimal
+from types import SimpleNamespace
 
-# Create your tests here.
+from django.contrib.admin.sites import site
+from django.core import mail
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.accounts.models import User
+from apps.billing import async_views
+from apps.billing.models import Invoice, StockReservation
+from apps.billing.rendering import pdf_pool, pdf_render_limit
+from apps.billing.services import (
+    add_invoice_item, bulk_create_invoices, cancel_invoice, mark_invoice_paid, purge_stale_drafts,
+    release_expired_reservations, remove_invoice_item, stale_drafts,
+)
+from apps.catalog.services import check_stock_consistency, get_available_stock, get_current_stock, reserve_stock
+from apps.catalog.models import Product, StockMovement
+from apps.customers.models import Customer, CustomerStats
+from apps.payments.models import Payment
+from apps.payments.services import record_payment
+from common.instrumentation import record_queries
+from common.jobs.services import claim_job, run_job
+from common.testing import QueryBudgetTestMixin
+
+
+@override_settings(CATALOG_CACHE_ALIAS='default', CATALOG_CACHE_VERSION_CHECK=0)
+class InvoiceViewQueryBudgetTests(QueryBudgetTestMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('staff@example.com', 'secret', is_staff=True)
+        products = [Product.objects.create(name=f'Product {i}', unit_price=Decimal('5.00')) for i in range(3)]
+        customers = Customer.objects.bulk_create([
+            Customer(name=f'Customer {i}', email=f'c{i}@example.com') for i in range(25)
+        ])
+        cls.invoices = bulk_create_invoices([
+            {
+                'customer_id': customer.pk,
+                'due_at': datetime.date(2030, 1, 1),
+                'items': [{'product_id': product.pk, 'quantity': 1} for product in products],
+            }
+            for customer in customers
+        ])
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_invoice_list(self):
+        self.assertWithinQueryBudget(reverse('invoice-list'))
+
+    def test_invoice_detail(self):
+        self.assertWithinQueryBudget(reverse('invoice-detail', args=[self.invoices[0].pk]))
+
+    def test_over_budget_fails(self):
+        with override_settings(QUERY_BUDGETS={'invoice-list': 1}):
+            with self.assertRaisesMessage(AssertionError, 'budget is 1'):
+                self.assertWithinQueryBudget(reverse('invoice-list'))
+
+    def test_repeated_statement_is_reported(self):
+        with record_queries() as queries:
+            for invoice in Invoice.objects.order_by('pk')[:6]:
+                invoice.customer.name  # One customer query per invoice
+        self.assertEqual(queries.count, 7)
+        [(sql, count)] = queries.repeated()
+        self.assertEqual(count, 6)
+        self.assertIn('FROM "customers_customer"', sql)
+
+
+@override_settings(CATALOG_CACHE_ALIAS='default', CATALOG_CACHE_VERSION_CHECK=0)
+class DeactivatedProductTests(TestCase):
+
+    def test_deactivated_product_is_refused_although_cached(self):
+        product = Product.objects.create(name='Widget', unit_price=Decimal('5.00'))
+        customer = Customer.objects.create(name='Customer', email='customer@example.com')
+        [invoice] = bulk_create_invoices([{
+            'customer_id': customer.pk,
+            'due_at': datetime.date(2030, 1, 1),
+            'items': [{'product_id': product.pk, 'quantity': 1}],  # Caches the snapshot
+        }])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.filter(pk=product.pk).deactivate()
+
+        with self.assertRaisesMessage(ValueError, 'inactive'):
+            add_invoice_item(invoice, product.pk, 1)
+
+
+@override_settings(CATALOG_CACHE_ALIAS='default', CATALOG_CACHE_VERSION_CHECK=0)
+class StockReservationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('staff@example.com', 'secret', is_staff=True)
+        cls.product = Product.objects.create(
+            name='Widget', unit_price=Decimal('5.00'), track_inventory=True, stock_quantity=10,
+        )
+        cls.customer = Customer.objects.create(name='Customer', email='customer@example.com')
+
+    def draft(self, quantity=None):
+        [invoice] = bulk_create_invoices([{'customer_id': self.customer.pk, 'due_at': datetime.date(2030, 1, 1)}])
+        if quantity:
+            add_invoice_item(invoice, self.product.pk, quantity)
+            invoice.refresh_from_db()
+        return invoice
+
+    def sales(self):
+        return list(StockMovement.objects.filter(reason=StockMovement.Reason.SALE).values_list('delta', flat=True))
+
+    def test_stock_is_never_overbooked(self):
+        invoice = self.draft(6)
+        with self.assertRaisesMessage(ValueError, 'Not enough stock'):
+            add_invoice_item(invoice, self.product.pk, 5)
+        self.assertFalse(reserve_stock(self.product.pk, 5))
+        self.assertTrue(reserve_stock(self.product.pk, 4))
+        self.assertEqual(get_available_stock(self.product.pk), 0)
+
+    def test_removing_an_item_or_cancelling_releases_its_stock(self):
+        invoice = self.draft(3)
+        remove_invoice_item(invoice.items.get().pk)
+        self.assertEqual(get_available_stock(self.product.pk), 10)
+
+        add_invoice_item(invoice, self.product.pk, 4)
+        cancel_invoice(invoice)
+        self.assertEqual(get_available_stock(self.product.pk), 10)
+        self.assertEqual(StockReservation.objects.filter(status=StockReservation.Status.RELEASED).count(), 2)
+        self.assertEqual(get_current_stock(self.product.pk), 10)
+
+    def test_paying_turns_the_reservation_into_a_sale(self):
+        invoice = self.draft(3)
+        mark_invoice_paid(invoice)
+
+        self.assertEqual(StockReservation.objects.get().status, StockReservation.Status.CONSUMED)
+        self.assertEqual(self.sales(), [-3])
+        self.assertEqual(get_current_stock(self.product.pk), 7)
+        self.assertEqual(get_available_stock(self.product.pk), 7)
+        self.assertEqual(check_stock_consistency(), [])
+
+    def test_paying_twice_deducts_stock_once(self):
+        invoice = self.draft(3)
+        stale = Invoice.objects.get(pk=invoice.pk)  # Loaded by a second request at the same time
+        mark_invoice_paid(invoice)
+
+        with self.assertRaisesMessage(ValueError, 'already marked as paid'):
+            mark_invoice_paid(stale)
+        record_payment(invoice.pk, invoice.total_amount, 'cash', notes='')
+
+        self.assertEqual(self.sales(), [-3])
+        self.assertEqual(get_current_stock(self.product.pk), 7)
+        self.assertEqual(get_available_stock(self.product.pk), 7)
+
+    def test_paying_in_the_admin_turns_the_reservation_into_a_sale(self):
+        invoice = self.draft(3)
+        invoice.status = Invoice.Status.PAID
+        form = SimpleNamespace(changed_data=['status'], initial={'status': Invoice.Status.DRAFT})
+        request = RequestFactory().post('/')
+        request.user = self.user
+
+        site._registry[Invoice].save_model(request, invoice, form, change=True)
+
+        self.assertEqual(Invoice.objects.get(pk=invoice.pk).status, Invoice.Status.PAID)
+        self.assertEqual(StockReservation.objects.get().status, StockReservation.Status.CONSUMED)
+        self.assertEqual(self.sales(), [-3])
+
+    def test_deactivating_a_product_releases_what_drafts_hold(self):
+        draft, sent = self.draft(3), self.draft(2)
+        Invoice.objects.filter(pk=sent.pk).update(status=Invoice.Status.SENT)
+
+        self.product.deactivate()
+
+        self.assertEqual(StockReservation.objects.get(invoice=draft).status, StockReservation.Status.RELEASED)
+        self.assertEqual(StockReservation.objects.get(invoice=sent).status, StockReservation.Status.ACTIVE)
+        self.assertEqual(get_available_stock(self.product.pk), 8)
+
+    def test_deactivating_a_customer_cancels_their_drafts(self):
+        draft, sent = self.draft(3), self.draft(2)
+        Invoice.objects.filter(pk=sent.pk).update(status=Invoice.Status.SENT)
+        billed = CustomerStats.objects.get(customer=self.customer).lifetime_billed
+
+        self.customer.deactivate()
+
+        self.assertEqual(Invoice.objects.get(pk=draft.pk).status, Invoice.Status.CANCELLED)
+        self.assertEqual(Invoice.objects.get(pk=sent.pk).status, Invoice.Status.SENT)
+        self.assertEqual(get_available_stock(self.product.pk), 8)
+        self.assertEqual(CustomerStats.objects.get(customer=self.customer).lifetime_billed, billed - draft.total_amount)
+
+    def test_reaper_releases_only_expired_drafts(self):
+        expired, sent = self.draft(2), self.draft(3)
+        Invoice.objects.filter(pk=sent.pk).update(status=Invoice.Status.SENT)
+        StockReservation.objects.update(expires_at=timezone.now() - datetime.timedelta(minutes=1))
+
+        self.assertEqual(release_expired_reservations(batch_size=1), 1)
+        self.assertEqual(
+            StockReservation.objects.get(status=StockReservation.Status.RELEASED).invoice_id, expired.pk,
+        )
+        self.assertEqual(get_available_stock(self.product.pk), 7)
+
+
+@override_settings(CATALOG_CACHE_ALIAS='default', CATALOG_CACHE_VERSION_CHECK=0)
+class AsyncPdfViewTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        product = Product.objects.create(name='Widget', unit_price=Decimal('5.00'))
+        customer = Customer.objects.create(name='Customer', email='customer@example.com')
+        [cls.invoice] = bulk_create_invoices([{
+            'customer_id': customer.pk,
+            'due_at': datetime.date(2030, 1, 1),
+            'items': [{'product_id': product.pk, 'quantity': 2}],
+        }])
+
+    @classmethod
+    def tearDownClass(cls):
+        pdf_pool().shutdown()
+        pdf_pool.cache_clear()
+        super().tearDownClass()
+
+    async def test_download_renders_in_process_pool(self):
+        request = RequestFactory().get('/')
+        response = await async_views.download_invoice_pdf(request, self.invoice.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content.startswith(b'%PDF'))
+
+    async def test_download_is_shed_when_pool_is_full(self):
+        with ExitStack() as stack:
+            limit = pdf_render_limit()
+            for _ in range(limit.limit):
+                stack.enter_context(limit.slot())
+            response = await async_views.download_invoice_pdf(RequestFactory().get('/'), self.invoice.pk)
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(limit.in_flight, 0)
+
+
+
+@override_settings(CATALOG_CACHE_ALIAS='default', CATALOG_CACHE_VERSION_CHECK=0)
+class InvoiceEmailTests(TestCase):
+
+    def test_send_email_queues_a_job_that_attaches_the_pdf(self):
+        product = Product.objects.create(name='Widget', unit_price=Decimal('5.00'))
+        customer = Customer.objects.create(name='Customer', email='customer@example.com')
+        [invoice] = bulk_create_invoices([{
+            'customer_id': customer.pk,
+            'due_at': datetime.date(2030, 1, 1),
+            'items': [{'product_id': product.pk, 'quantity': 2}],
+        }])
+        url = reverse('invoice-send-email', args=[invoice.pk])
+        self.assertRedirects(self.client.post(url), reverse('invoice-detail', args=[invoice.pk]), fetch_redirect_response=False)
+        self.client.post(url)  # Clicked twice before a worker got to it
+        self.assertEqual(mail.outbox, [])
+
+        self.assertTrue(run_job(claim_job('w1')))
+        self.assertIsNone(claim_job('w1'))
+        [email] = mail.outbox
+        self.assertEqual(email.to, ['customer@example.com'])
+        self.assertEqual(email.attachments[0][2], 'application/pdf')
+
+
+@override_settings(CATALOG_CACHE_ALIAS='default', CATALOG_CACHE_VERSION_CHECK=0)
+class PurgeStaleDraftsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = Product.objects.create(
+            name='Widget', unit_price=Decimal('5.00'), track_inventory=True, stock_quantity=100,
+        )
+        cls.customer = Customer.objects.create(name='Customer', email='customer@example.com')
+        entries = [
+            {'customer_id': cls.customer.pk, 'due_at': datetime.date(2030, 1, 1), 'items': items}
+            for items in ([], [], [], [{'product_id': cls.product.pk, 'quantity': 4}])
+        ]
+        cls.empty, cls.paid_towards, cls.recent, cls.with_items = bulk_create_invoices(entries)
+        Payment.objects.create(invoice=cls.paid_towards, amount=Decimal('1.00'))
+        old = timezone.now() - datetime.timedelta(days=90)
+        Invoice.objects.exclude(pk=cls.recent.pk).update(created_at=old)
+
+    def test_only_old_empty_unpaid_drafts_are_purged(self):
+        self.assertEqual(list(stale_drafts(days=30)), [self.empty])
+        self.assertEqual(purge_stale_drafts(days=30, pause=0), 1)
+        self.assertFalse(Invoice.objects.filter(pk=self.empty.pk).exists())
+        self.assertEqual(Invoice.objects.count(), 3)
+
+    def test_drafts_with_items_release_their_stock(self):
+        self.assertEqual(get_available_stock(self.product.pk), 96)
+        stats_before = CustomerStats.objects.get(customer=self.customer)
+
+        self.assertEqual(purge_stale_drafts(days=30, include_items=True, batch_size=1, pause=0), 2)
+
+        self.assertEqual(get_available_stock(self.product.pk), 100)
+        self.assertFalse(StockReservation.objects.exists())
+        stats = CustomerStats.objects.get(customer=self.customer)
+        self.assertEqual(stats.invoice_count, stats_before.invoice_count - 2)
+        self.assertEqual(stats.lifetime_billed, stats_before.lifetime_billed - self.with_items.total_amount)
@@ -1,6 +1,12 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# Under ASGI the PDF view runs async, off the event loop
+pdf_views = views
+if settings.ASYNC_VIEWS:
+    from . import async_views as pdf_views
+
 urlpatterns = [
     path('', views.InvoiceListView.as_view(), name='invoice-list'),
     path('<int:pk>/', views.InvoiceDetailView.as_view(), name='invoice-detail'),
@@ -9,6 +15,6 @@ urlpatterns = [
     path('<int:pk>/add-item/', views.add_item_to_invoice, name='invoice-add-item'),
     path('<int:pk>/mark-paid/', views.mark_invoice_as_paid, name='invoice-mark-paid'),
     path('<int:pk>/clone/', views.clone_invoice_view, name='invoice-clone'),
-    path('<int:pk>/download-pdf/', views.download_invoice_pdf, name='invoice-download-pdf'),
+    path('<int:pk>/download-pdf/', pdf_views.download_invoice_pdf, name='invoice-download-pdf'),
     path('<int:pk>/send-email/', views.send_invoice_email, name='invoice-send-email'),
 ]
\ No newline at end of file
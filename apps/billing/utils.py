@@ -1,3 +1,4 @@
+from functools import lru_cache
 from io import BytesIO
 from django.conf import settings
 
@@ -7,17 +8,41 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib.units import inch
 
+# Page setup shared by every PDF we produce
+PAGE_SIZE = letter
+PAGE_MARGIN = 0.75 * inch
+
+
+@lru_cache(maxsize=None)
+def get_stylesheet():
+    """
+    ReportLab's sample stylesheet, built once per process. The styles are only
+    read while rendering, so every PDF can share them.
+    """
+    return getSampleStyleSheet()
+
+
+def warm_up_pdf_rendering():
+    """
+    Builds the stylesheet and the PDF template ahead of the first download, so
+    a freshly forked worker does not pay for it inside a request.
+    """
+    from django.template.loader import get_template
+
+    get_stylesheet()
+    get_template('billing/invoice_pdf_simple.html')
+
 
 def generate_invoice_pdf(invoice):
     """
     Generates a PDF from a simple HTML template using ReportLab's Paragraph parser.
     """
     buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, leftMargin=0.75*inch, rightMargin=0.75*inch, topMargin=0.75*inch, bottomMargin=0.75*inch)
+    doc = SimpleDocTemplate(buffer, pagesize=PAGE_SIZE, leftMargin=PAGE_MARGIN, rightMargin=PAGE_MARGIN, topMargin=PAGE_MARGIN, bottomMargin=PAGE_MARGIN)
     
     # Container for the 'Flowable' objects
     story = []
-    styles = getSampleStyleSheet()
+    styles = get_stylesheet()
 
     # Get the custom HTML template
     from django.template.loader import render_to_string
@@ -32,4 +57,121 @@ def generate_invoice_pdf(invoice):
 
     # Rewind and return the buffer
     buffer.seek(0)
-    return buffer
\ No newline at end of file
+    return buffer
+
+
+# --- Customer Statement ---
+
+STATEMENT_FONT = 'Helvetica'
+STATEMENT_BOLD_FONT = 'Helvetica-Bold'
+STATEMENT_ROW_HEIGHT = 14
+# (heading, x offset from the left margin, right aligned)
+STATEMENT_COLUMNS = (
+    ('Date', 0, False),
+    ('Type', 0.95 * inch, False),
+    ('Reference', 1.75 * inch, False),
+    ('Details', 3.2 * inch, False),
+    ('Charges', 5.0 * inch, True),
+    ('Payments', 5.95 * inch, True),
+    ('Balance', 7.0 * inch, True),
+)
+
+
+class _StatementCanvas:
+    """
+    Draws statement rows straight onto a ReportLab canvas, starting a new page
+    whenever the current one is full.
+
+    Unlike platypus, no story is kept: each row is written to the page as it
+    arrives and every finished page is closed with showPage(), so memory use
+    is bounded by the compressed PDF rather than by the number of rows.
+    """
+
+    def __init__(self, output, customer, start_date, end_date):
+        self.canvas = canvas.Canvas(output, pagesize=PAGE_SIZE, pageCompression=1)
+        self.customer = customer
+        self.period = f"{start_date:%Y-%m-%d} to {end_date:%Y-%m-%d}"
+        self.width, self.height = PAGE_SIZE
+        self.page_number = 0
+        self.y = 0
+
+    def start_page(self):
+        self.page_number += 1
+        c = self.canvas
+        top = self.height - PAGE_MARGIN
+
+        c.setFont(STATEMENT_BOLD_FONT, 16)
+        c.drawString(PAGE_MARGIN, top, "STATEMENT OF ACCOUNT")
+        c.setFont(STATEMENT_FONT, 9)
+        c.drawRightString(self.width - PAGE_MARGIN, top, f"Page {self.page_number}")
+        c.drawString(PAGE_MARGIN, top - 18, f"Customer: {self.customer.name} <{self.customer.email}>")
+        c.drawString(PAGE_MARGIN, top - 30, f"Period: {self.period}")
+
+        self.y = top - 54
+        c.setFont(STATEMENT_BOLD_FONT, 9)
+        self._draw_cells([heading for heading, _, _ in STATEMENT_COLUMNS])
+        c.line(PAGE_MARGIN, self.y - 4, self.width - PAGE_MARGIN, self.y - 4)
+        c.setFont(STATEMENT_FONT, 9)
+        self.y -= STATEMENT_ROW_HEIGHT + 2
+
+    def _draw_cells(self, values):
+        for (heading, offset, right), value in zip(STATEMENT_COLUMNS, values):
+            if right:
+                self.canvas.drawRightString(PAGE_MARGIN + offset, self.y, value)
+            else:
+                self.canvas.drawString(PAGE_MARGIN + offset, self.y, value)
+
+    def row(self, values):
+        if self.page_number == 0 or self.y < PAGE_MARGIN:
+            if self.page_number:
+                self.canvas.showPage()
+            self.start_page()
+        self._draw_cells(values)
+        self.y -= STATEMENT_ROW_HEIGHT
+
+    def finish(self):
+        if self.page_number == 0:
+            self.start_page()
+        self.canvas.showPage()
+        self.canvas.save()
+
+
+def _money(value):
+    return f"{value:,.2f}" if value is not None else ""
+
+
+def generate_customer_statement_pdf(customer, start_date, end_date, output=None):
+    """
+    Generates a statement PDF listing every invoice and payment for a customer
+    in a date range, with a running balance.
+
+    ``output`` may be a path or a binary file object; when omitted a BytesIO
+    buffer is returned, rewound and ready to read.
+    """
+    from apps.reports.services import get_statement_opening_balance, iter_customer_statement
+
+    buffer = output if output is not None else BytesIO()
+    page = _StatementCanvas(buffer, customer, start_date, end_date)
+
+    opening_balance = get_statement_opening_balance(customer.pk, start_date)
+    page.row([f"{start_date:%Y-%m-%d}", "", "", "Opening balance", "", "", _money(opening_balance)])
+
+    balance = opening_balance
+    for line in iter_customer_statement(customer.pk, start_date, end_date, opening_balance):
+        balance = line['balance']
+        page.row([
+            f"{line['date']:%Y-%m-%d}",
+            line['kind'].title(),
+            line['reference'],
+            line['description'][:30],
+            _money(line['debit']),
+            _money(line['credit']),
+            _money(balance),
+        ])
+
+    page.row([f"{end_date:%Y-%m-%d}", "", "", "Closing balance", "", "", _money(balance)])
+    page.finish()
+
+    if output is None:
+        buffer.seek(0)
+    return buffer
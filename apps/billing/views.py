@@ -10,14 +10,13 @@ from django.utils import timezone
 from .models import Invoice, InvoiceItem
 from .forms import InvoiceForm, AddItemForm
 from .services import mark_invoice_paid, add_invoice_item
+from apps.customers.services import record_invoice_issued, refresh_customer_stats
 from django.shortcuts import render
 
 from django.http import HttpResponse, FileResponse, HttpResponseServerError
-from django.core.mail import EmailMessage
-from django.conf import settings
 
 from .services import clone_invoice
-from .utils import generate_invoice_pdf
+from .tasks import email_invoice
 import traceback
 
 class InvoiceListView(LoginRequiredMixin, ListView):
@@ -46,7 +45,9 @@ class InvoiceCreateView(LoginRequiredMixin, CreateView):
         # The services.py file handles creating the invoice number
         # For simplicity here, we let the model's default handle it
         messages.success(self.request, "Invoice created successfully. You can now add items.")
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        record_invoice_issued(self.object)
+        return response
 
 class InvoiceUpdateView(LoginRequiredMixin, UpdateView):
     model = Invoice
@@ -62,7 +63,10 @@ class InvoiceUpdateView(LoginRequiredMixin, UpdateView):
 
     def form_valid(self, form):
         messages.success(self.request, "Invoice updated successfully.")
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        if {'customer', 'issued_at'} & set(form.changed_data):
+            refresh_customer_stats({self.object.customer_id, form.initial.get('customer', self.object.customer_id)})
+        return response
 
 # --- Custom Action Views ---
 
@@ -121,6 +125,9 @@ def clone_invoice_view(request, pk):
 
 def download_invoice_pdf(request, pk):
     """Generates and returns an invoice as a PDF download."""
+    # ReportLab is only imported by the workers that actually render PDFs
+    from .utils import generate_invoice_pdf
+
     try:
         invoice = get_object_or_404(Invoice, pk=pk)
         
@@ -143,25 +150,13 @@ def download_invoice_pdf(request, pk):
 
 
 def send_invoice_email(request, pk):
-    """Emails the invoice PDF to the customer."""
-    invoice = get_object_or_404(Invoice, pk=pk)
+    """Queues the email of the invoice PDF to the customer (billing.tasks.email_invoice)."""
+    invoice = get_object_or_404(Invoice.objects.select_related('customer'), pk=pk)
     if request.method == 'POST':
-        try:
-            pdf = generate_invoice_pdf(invoice)
-
-            email = EmailMessage(
-                subject=f"Invoice {invoice.invoice_number} from Your Company",
-                body=f"Dear {invoice.customer.name},\n\nPlease find your attached invoice.\n\nThank you for your business.",
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                to=[invoice.customer.email],
-            )
-            email.attach(f'Invoice_{invoice.invoice_number}.pdf', pdf, 'application/pdf')
-            email.send()
+        # A second click while the first email is still queued does not send it twice
+        email_invoice.enqueue(invoice_id=invoice.pk, unique_key=f'email-invoice-{invoice.pk}')
+        messages.success(request, f"Invoice {invoice.invoice_number} will be sent to {invoice.customer.email} shortly.")
 
-            messages.success(request, f"Invoice {invoice.invoice_number} has been sent to {invoice.customer.email}.")
-        except Exception as e:
-            messages.error(request, f"Failed to send email. Error: {e}")
-
-        return redirect('invoice-detail', pk=invoice.pk)
+    return redirect('invoice-detail', pk=invoice.pk)
 
     return redirect('invoice-detail', pk=invoice.pk)
\ No newline at end of file
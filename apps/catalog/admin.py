@@ -1,18 +1,44 @@
 # catalog/admin.py
 
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
 from django.utils.translation import gettext_lazy as _
 
-from .models import Product
+from .forms import ProductForm
+from .models import Product, ProductPriceHistory, StockMovement
+from .services import reprice_products, with_current_stock
+
+
+class RepriceForm(forms.Form):
+    percent = forms.DecimalField(label=_("Change %"), required=False)
+    amount = forms.DecimalField(label=_("or amount"), required=False, decimal_places=2)
+
+
+class RepriceActionForm(ActionForm, RepriceForm):
+    """Adds the repricing inputs next to the admin action dropdown."""
+
+
+class ProductPriceHistoryInline(admin.TabularInline):
+    model = ProductPriceHistory
+    fields = ('changed_at', 'old_price', 'new_price')
+    readonly_fields = fields
+    extra = 0
+    max_num = 0
+    can_delete = False
 
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
     """Admin configuration for the Product model."""
     
-    list_display = ('name', 'unit_price', 'is_active', 'get_stock_status')
+    form = ProductForm
+    action_form = RepriceActionForm
+    actions = ['reprice_selected']
+    inlines = [ProductPriceHistoryInline]
+    list_display = ('name', 'sku', 'unit_price', 'is_active', 'get_stock_status')
     list_filter = ('is_active', 'track_inventory')
-    search_fields = ('name', 'description')
+    search_fields = ('name', 'sku', 'description')
     ordering = ('name',)
     
     # Use readonly fields for calculated or context-dependent fields
@@ -20,7 +46,7 @@ class ProductAdmin(admin.ModelAdmin):
 
     fieldsets = (
         (None, {
-            'fields': ('name', 'description', 'unit_price', 'is_active')
+            'fields': ('name', 'sku', 'description', 'unit_price', 'is_active')
         }),
         (_('Inventory Control'), {
             'fields': ('track_inventory', 'stock_quantity'),
@@ -28,9 +54,49 @@ class ProductAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_queryset(self, request):
+        # Live stock from the ledger; stock_quantity only catches up on compaction
+        return with_current_stock(super().get_queryset(request))
+
     def get_stock_status(self, obj):
         """Displays stock only if inventory is being tracked."""
         if obj.track_inventory:
-            return f"{obj.stock_quantity} units"
+            return f"{obj.current_stock} units"
         return "N/A (Service)"
-    get_stock_status.short_description = _('Stock Status')
\ No newline at end of file
+    get_stock_status.short_description = _('Stock Status')
+    get_stock_status.admin_order_field = 'current_stock'
+
+    @admin.action(description=_('Reprice selected products'))
+    def reprice_selected(self, request, queryset):
+        form = RepriceForm(request.POST)
+        if not form.is_valid():
+            self.message_user(request, _('Enter a valid percentage or amount.'), messages.ERROR)
+            return
+        try:
+            result = reprice_products(
+                queryset, percent=form.cleaned_data['percent'], amount=form.cleaned_data['amount'],
+            )
+        except ValueError as e:
+            self.message_user(request, str(e), messages.ERROR)
+            return
+        self.message_user(request, _('%(count)d product prices were changed.') % {'count': result['changed']})
+
+
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+    """Read-only view of the stock ledger; movements are never edited."""
+
+    list_display = ('created_at', 'product', 'delta', 'reason', 'invoice', 'note')
+    list_filter = ('reason',)
+    search_fields = ('product__name', 'note')
+    list_select_related = ('product', 'invoice')
+    date_hierarchy = 'created_at'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
\ No newline at end of file
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CatalogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = "apps.catalog"
+
+    def ready(self):
+        # Register the catalog cache invalidation signal handlers
+        from . import signals  # noqa: F401
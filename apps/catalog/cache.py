@@ -0,0 +1,137 @@
+# catalog/cache.py
+"""
+Process-local cache of product snapshots for invoice line entry.
+
+Each worker process keeps the products it has looked up in memory. A version
+stamp kept in a cache shared by all processes (``CATALOG_CACHE_ALIAS``) is
+bumped whenever a product changes; workers compare it with the version their
+entries were loaded under and drop everything when it moves on. The stamp is
+re-read at most every ``CATALOG_CACHE_VERSION_CHECK`` seconds, so a hit
+normally costs no I/O at all.
+
+Stock quantity is deliberately not part of the snapshot: it changes on every
+sale and must always be read fresh for tracked products.
+"""
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+VERSION_KEY = 'catalog:version'
+
+ProductSnapshot = namedtuple(
+    'ProductSnapshot',
+    ['id', 'name', 'description', 'unit_price', 'track_inventory', 'is_active'],
+)
+
+_lock = threading.Lock()
+_entries = OrderedDict()
+_state = {'version': None, 'checked_at': 0.0}
+_counters = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+
+def _shared_cache():
+    return caches[getattr(settings, 'CATALOG_CACHE_ALIAS', 'default')]
+
+
+def _max_entries():
+    return getattr(settings, 'CATALOG_CACHE_MAX_ENTRIES', 10000)
+
+
+def _sync_version():
+    """Drops local entries if another process has bumped the catalog version."""
+    now = time.monotonic()
+    if now - _state['checked_at'] < getattr(settings, 'CATALOG_CACHE_VERSION_CHECK', 1.0):
+        return
+    version = _shared_cache().get_or_set(VERSION_KEY, 1, timeout=None)
+    with _lock:
+        if version != _state['version']:
+            if _entries:
+                _counters['invalidations'] += 1
+            _entries.clear()
+            _state['version'] = version
+        _state['checked_at'] = now
+
+
+def _store(snapshots, version):
+    with _lock:
+        if version != _state['version']:
+            return  # Invalidated while loading; these rows may already be stale
+        for snapshot in snapshots:
+            _entries[snapshot.id] = snapshot
+            _entries.move_to_end(snapshot.id)
+        while len(_entries) > _max_entries():
+            _entries.popitem(last=False)
+
+
+def _load(product_ids):
+    from .models import Product  # Avoid import at app loading time
+
+    rows = Product.objects.filter(pk__in=product_ids).values_list(*ProductSnapshot._fields)
+    return [ProductSnapshot(*row) for row in rows]
+
+
+def get_product_snapshots(product_ids) -> dict:
+    """
+    Returns a {product_id: ProductSnapshot} dict for the given ids. Products
+    not in the local cache are loaded together with a single query; ids that
+    do not exist are left out.
+    """
+    _sync_version()
+    found, missing = {}, []
+    with _lock:
+        version = _state['version']
+        for product_id in product_ids:
+            snapshot = _entries.get(product_id)
+            if snapshot is None:
+                missing.append(product_id)
+            else:
+                _entries.move_to_end(product_id)
+                found[product_id] = snapshot
+        _counters['hits'] += len(found)
+        _counters['misses'] += len(missing)
+
+    if missing:
+        loaded = _load(missing)
+        _store(loaded, version)
+        found.update((snapshot.id, snapshot) for snapshot in loaded)
+    return found
+
+
+def get_product_snapshot(product_id):
+    """Returns the ProductSnapshot for one product, or None if it does not exist."""
+    return get_product_snapshots([product_id]).get(product_id)
+
+
+def invalidate_catalog_cache():
+    """
+    Bumps the shared catalog version so every process reloads its snapshots.
+    Call this after any bulk write that bypasses Product.save(), through
+    transaction.on_commit(): a process that picks up the new version while
+    the write is uncommitted would cache the old rows under it.
+    """
+    cache = _shared_cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        # The stamp expired or was never set; any new value invalidates
+        cache.set(VERSION_KEY, int(time.time() * 1000), timeout=None)
+    with _lock:
+        _entries.clear()
+        _state['version'] = None
+        _state['checked_at'] = 0.0  # Pick up the new version on the next lookup
+        _counters['invalidations'] += 1
+
+
+def catalog_cache_stats() -> dict:
+    """Returns this process's hit/miss counters and current size."""
+    with _lock:
+        lookups = _counters['hits'] + _counters['misses']
+        return {
+            **_counters,
+            'entries': len(_entries),
+            'version': _state['version'],
+            'hit_rate': round(_counters['hits'] / lookups, 4) if lookups else None,
+        }
@@ -1,8 +1,28 @@
 # catalog/forms.py
 from django import forms
-from .models import Product
+from django.utils.translation import gettext_lazy as _
+from .models import Product, StockSnapshot
+from .services import adjust_stock, get_current_stock
 
 class ProductForm(forms.ModelForm):
     class Meta:
         model = Product
-        fields = ['name', 'description', 'unit_price', 'track_inventory', 'stock_quantity', 'is_active']
\ No newline at end of file
+        fields = ['sku', 'name', 'description', 'unit_price', 'track_inventory', 'stock_quantity', 'is_active']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # The stock_quantity column only catches up when the ledger is compacted,
+        # so edit against the live figure rather than a possibly stale copy.
+        self.has_stock_ledger = bool(
+            self.instance.pk and self.instance.track_inventory
+            and StockSnapshot.objects.filter(product_id=self.instance.pk).exists()
+        )
+        if self.has_stock_ledger:
+            self.initial['stock_quantity'] = get_current_stock(self.instance.pk)
+
+    def save(self, commit=True):
+        # A changed quantity becomes a ledger adjustment; the product row only
+        # keeps a copy. Recorded even with commit=False (the admin saves right after).
+        if self.has_stock_ledger and self.instance.track_inventory and 'stock_quantity' in self.changed_data:
+            adjust_stock(self.instance.pk, self.cleaned_data['stock_quantity'], note=_("Edited by hand"))
+        return super().save(commit)
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.catalog.services import check_stock_consistency
+
+
+class Command(BaseCommand):
+    help = "Verifies stock snapshots, stock quantities and available stock against the movement ledger."
+
+    def handle(self, *args, **options):
+        problems = check_stock_consistency()
+        for product_id, problem in problems:
+            self.stderr.write(f"Product {product_id}: {problem}")
+        if problems:
+            raise CommandError(f"Found {len(problems)} stock inconsistencies.")
+        self.stdout.write(self.style.SUCCESS("Stock ledger is consistent."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from apps.catalog.services import compact_stock_movements
+
+
+class Command(BaseCommand):
+    help = "Folds recorded stock movements into per-product snapshots and refreshes stock quantities."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--settle-seconds', type=int, default=5,
+            help="Leave movements younger than this for the next run (default: 5).",
+        )
+
+    def handle(self, *args, **options):
+        compacted = compact_stock_movements(settle_seconds=options['settle_seconds'])
+        self.stdout.write(self.style.SUCCESS(f"Compacted stock ledger for {compacted} products."))
@@ -0,0 +1,49 @@
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.catalog.services import filter_products, reprice_products
+
+
+class Command(BaseCommand):
+    help = "Raises or lowers product prices in bulk and records the price history."
+
+    def add_arguments(self, parser):
+        change = parser.add_mutually_exclusive_group(required=True)
+        change.add_argument('--percent', type=Decimal, help="Percentage change, e.g. 5 or -2.5.")
+        change.add_argument('--amount', type=Decimal, help="Absolute change per unit, e.g. 1.50 or -0.25.")
+
+        parser.add_argument('--name', help="Only products whose name contains this text (case-insensitive).")
+        active = parser.add_mutually_exclusive_group()
+        active.add_argument('--active', dest='is_active', action='store_true', default=None,
+                            help="Only active products.")
+        active.add_argument('--inactive', dest='is_active', action='store_false',
+                            help="Only inactive products.")
+        parser.add_argument('--ids', nargs='+', type=int, help="Only these product IDs.")
+
+        parser.add_argument('--dry-run', action='store_true', help="Report the impact without changing anything.")
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Products updated per statement (default: 1000).")
+
+    def handle(self, *args, **options):
+        queryset = filter_products(name=options['name'], is_active=options['is_active'], ids=options['ids'])
+        try:
+            result = reprice_products(
+                queryset,
+                percent=options['percent'],
+                amount=options['amount'],
+                dry_run=options['dry_run'],
+                batch_size=options['batch_size'],
+            )
+        except ValueError as e:
+            raise CommandError(e)
+
+        impact = result['new_total'] - result['old_total']
+        summary = (
+            f"{result['products']} products, catalogue value "
+            f"{result['old_total']} -> {result['new_total']} ({impact:+})"
+        )
+        if options['dry_run']:
+            self.stdout.write(f"Dry run: would reprice {summary}.")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Repriced {summary}; {result['changed']} prices changed."))
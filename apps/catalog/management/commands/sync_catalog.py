@@ -0,0 +1,76 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.catalog.services import export_catalog, import_catalog
+from common.db_routers import reporting_reads
+
+
+class Command(BaseCommand):
+    help = "Imports or exports the product catalog as CSV or JSON lines, keyed on SKU."
+
+    def add_arguments(self, parser):
+        parser.add_argument('direction', choices=['import', 'export'])
+        parser.add_argument('path', help="File to read or write; '-' for stdin/stdout.")
+        parser.add_argument(
+            '--format', choices=['csv', 'ndjson'],
+            help="File format (default: guessed from the file extension, csv for '-').",
+        )
+        parser.add_argument(
+            '--rejects',
+            help="Import only: write rejected rows and the reason to this CSV file "
+                 "(default: <path>.rejects.csv).",
+        )
+        parser.add_argument(
+            '--keep-missing', action='store_true',
+            help="Import only: do not deactivate products missing from the feed.",
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--dry-run', action='store_true', help="Import only: validate; write nothing.")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('ndjson' if path.lower().endswith(('.ndjson', '.jsonl')) else 'csv')
+        if options['direction'] == 'export':
+            self._export(path, fmt)
+        else:
+            self._import(path, fmt, options)
+
+    @reporting_reads()
+    def _export(self, path, fmt):
+        if path == '-':
+            written = export_catalog(self.stdout, fmt=fmt)
+            self.stderr.write(f"Exported {written} products.")
+            return
+        with open(path, 'w', newline='', encoding='utf-8') as target:
+            written = export_catalog(target, fmt=fmt)
+        self.stdout.write(self.style.SUCCESS(f"Exported {written} products to {path}."))
+
+    def _import(self, path, fmt, options):
+        if path != '-' and not Path(path).exists():
+            raise CommandError(f"File not found: {path}")
+        reject_path = Path(options['rejects'] or ('rejects.csv' if path == '-' else f"{path}.rejects.csv"))
+
+        source = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        try:
+            with open(reject_path, 'w', newline='', encoding='utf-8') as rejects:
+                counts = import_catalog(
+                    source,
+                    fmt=fmt,
+                    reject_stream=rejects,
+                    deactivate_missing=not options['keep_missing'],
+                    chunk_size=options['chunk_size'],
+                    dry_run=options['dry_run'],
+                )
+        finally:
+            if source is not sys.stdin:
+                source.close()
+
+        prefix = "[dry run] " if options['dry_run'] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}Created {counts['created']}, updated {counts['updated']}, "
+            f"rejected {counts['rejected']}, deactivated {counts['deactivated']} products."
+        ))
+        if counts['rejected']:
+            self.stdout.write(f"Rejected rows written to {reject_path}")
@@ -0,0 +1,20 @@
+# Generated by Django 6.0.1 on 2026-10-19 02:09
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("catalog", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                django.db.models.functions.text.Lower("name"),
+                name="product_name_lower_idx",
+            ),
+        ),
+    ]
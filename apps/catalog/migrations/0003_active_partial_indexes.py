@@ -0,0 +1,25 @@
+# Generated by Django 6.0.1 on 2026-10-19 02:13
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("catalog", "0002_name_lower_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="product",
+            name="product_name_lower_idx",
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                django.db.models.functions.text.Lower("name"),
+                condition=models.Q(("is_active", True)),
+                name="product_active_name_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 6.0.1 on 2026-10-19 02:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_stock_levels(apps, schema_editor):
+    """Nothing is reserved yet, so every tracked product starts fully available."""
+    Product = apps.get_model("catalog", "Product")
+    StockLevel = apps.get_model("catalog", "StockLevel")
+    StockLevel.objects.bulk_create(
+        [
+            StockLevel(product_id=pk, available=stock or 0)
+            for pk, stock in Product.objects.filter(track_inventory=True).values_list(
+                "pk", "stock_quantity"
+            )
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("catalog", "0003_active_partial_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StockLevel",
+            fields=[
+                (
+                    "product",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stock_level",
+                        serialize=False,
+                        to="catalog.product",
+                        verbose_name="Product",
+                    ),
+                ),
+                (
+                    "available",
+                    models.IntegerField(
+                        default=0,
+                        help_text="Stock quantity minus units held by active reservations.",
+                        verbose_name="available",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "stock level",
+                "verbose_name_plural": "stock levels",
+            },
+        ),
+        migrations.RunPython(create_stock_levels, migrations.RunPython.noop),
+    ]
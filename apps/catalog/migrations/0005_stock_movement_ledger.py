@@ -0,0 +1,132 @@
+# Generated by Django 6.0.1 on 2026-10-19 02:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_stock_snapshots(apps, schema_editor):
+    """Open the ledger for every tracked product at its current stock."""
+    Product = apps.get_model("catalog", "Product")
+    StockSnapshot = apps.get_model("catalog", "StockSnapshot")
+    StockSnapshot.objects.bulk_create(
+        [
+            StockSnapshot(
+                product_id=pk, opening_quantity=stock or 0, quantity=stock or 0
+            )
+            for pk, stock in Product.objects.filter(track_inventory=True).values_list(
+                "pk", "stock_quantity"
+            )
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("billing", "0003_stockreservation"),
+        ("catalog", "0004_stocklevel"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StockSnapshot",
+            fields=[
+                (
+                    "product",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stock_snapshot",
+                        serialize=False,
+                        to="catalog.product",
+                        verbose_name="Product",
+                    ),
+                ),
+                (
+                    "opening_quantity",
+                    models.IntegerField(default=0, verbose_name="opening quantity"),
+                ),
+                ("quantity", models.IntegerField(default=0, verbose_name="quantity")),
+                (
+                    "last_movement_id",
+                    models.BigIntegerField(
+                        default=0, verbose_name="last folded movement"
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "stock snapshot",
+                "verbose_name_plural": "stock snapshots",
+            },
+        ),
+        migrations.CreateModel(
+            name="StockMovement",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "delta",
+                    models.IntegerField(
+                        help_text="Units added (positive) or removed (negative).",
+                        verbose_name="change",
+                    ),
+                ),
+                (
+                    "reason",
+                    models.CharField(
+                        choices=[
+                            ("SALE", "Sale"),
+                            ("RESTOCK", "Restock"),
+                            ("RETURN", "Return"),
+                            ("ADJUSTMENT", "Manual adjustment"),
+                        ],
+                        max_length=20,
+                        verbose_name="reason",
+                    ),
+                ),
+                (
+                    "note",
+                    models.CharField(blank=True, max_length=255, verbose_name="note"),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "invoice",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="stock_movements",
+                        to="billing.invoice",
+                        verbose_name="Invoice",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="stock_movements",
+                        to="catalog.product",
+                        verbose_name="Product",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "stock movement",
+                "verbose_name_plural": "stock movements",
+                "indexes": [
+                    models.Index(
+                        fields=["product", "id"], name="stock_movement_product_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(create_stock_snapshots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 6.0.1 on 2026-10-19 02:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("catalog", "0005_stock_movement_ledger"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductPriceHistory",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "old_price",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=10, verbose_name="old price"
+                    ),
+                ),
+                (
+                    "new_price",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=10, verbose_name="new price"
+                    ),
+                ),
+                (
+                    "changed_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="changed at"),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="price_history",
+                        to="catalog.product",
+                        verbose_name="Product",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "price change",
+                "verbose_name_plural": "price history",
+                "ordering": ["-changed_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["product", "-changed_at"],
+                        name="price_history_product_idx",
+                    )
+                ],
+            },
+        ),
+    ]
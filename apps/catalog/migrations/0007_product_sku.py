@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-19 02:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("catalog", "0006_productpricehistory"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="sku",
+            field=models.CharField(
+                blank=True,
+                help_text="External stock keeping unit; the key used by catalog imports.",
+                max_length=64,
+                null=True,
+                unique=True,
+                verbose_name="SKU",
+            ),
+        ),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import Q
+from django.db.models.functions import Lower
 from common.models import TimeStampedModel, SoftDeleteModel
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
@@ -7,12 +9,47 @@ from django.core.validators import MinValueValidator
 # Create your models here.
 
 
+def validate_inventory_fields(track_inventory: bool, stock_quantity) -> None:
+    """
+    Stock quantity must be set exactly when inventory is tracked. Shared by
+    Product.clean and the catalog import, which checks rows without building
+    model instances.
+    """
+    # if we are not tracking inventory, stock_quantity must be empty
+    if not track_inventory and stock_quantity is not None:
+        raise ValidationError(
+            {
+                'stock_quantity': _(
+                    'Stock quantity should not be set when "Track inventory" is disabled.'
+                )
+            }
+        )
+    # if we are tracking inventory, stock_quantity must be set
+    if track_inventory and stock_quantity is None:
+        raise ValidationError(
+            {
+                'stock_quantity': _(
+                    'Stock quantity is required when "Track inventory" is enabled.'
+                )
+            }
+        )
+
+
 class Product(TimeStampedModel, SoftDeleteModel):
     """
     Represents a product or a service that can be billed on an invoice.
     Can optionally track inventory for physical products.
     """
     # --- Core Product Fields ---
+    sku = models.CharField(
+        _("SKU"),
+        max_length=64,
+        unique=True,
+        null=True,
+        blank=True,
+        help_text=_("External stock keeping unit; the key used by catalog imports."),
+    )
+
     name = models.CharField(
         _("name"),
         max_length=255,
@@ -53,19 +90,22 @@ class Product(TimeStampedModel, SoftDeleteModel):
         ),
     )
 
-    is_active = models.BooleanField(
-        _("active"),
-        default=True,
-        help_text=_(
-            "Designates whether this product/service is available for invoicing. "
-            "Unselect this instead of deleting products to preserve data integrity."
-        ),
+    # --- Status Field (is_active, from SoftDeleteModel) ---
+    is_active_verbose_name = _("active")
+    is_active_help_text = _(
+        "Designates whether this product/service is available for invoicing. "
+        "Unselect this instead of deleting products to preserve data integrity."
     )
 
     class Meta:
         verbose_name = _("product")
         verbose_name_plural = _("products")
         ordering = ['name']
+        indexes = [
+            # Case-insensitive prefix search over live products only
+            # (see common.services.prefix_search)
+            models.Index(Lower('name'), condition=Q(is_active=True), name='product_active_name_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -74,21 +114,168 @@ class Product(TimeStampedModel, SoftDeleteModel):
         """
         Custom validation to ensure data consistency between inventory tracking and stock quantity.
         """
-        # if we are not tracking inventory, stock_quantity must be empty
-        if not self.track_inventory and self.stock_quantity is not None:
-            raise ValidationError(
-                {
-                    'stock_quantity': _(
-                        'Stock quantity should not be set when "Track inventory" is disabled.'
-                    )
-                }
-            )
-        # if we are tracking inventory, stock_quantity must be set
-        if self.track_inventory and self.stock_quantity is None:
-            raise ValidationError(
-                {
-                    'stock_quantity': _(
-                        'Stock quantity is required when "Track inventory" is enabled.'
-                    )
-                }
-            )
\ No newline at end of file
+        validate_inventory_fields(self.track_inventory, self.stock_quantity)
+
+
+class StockLevel(models.Model):
+    """
+    Units of a tracked product that are still free to reserve.
+
+    Kept out of the Product row so that form and admin saves of a product can
+    never overwrite it. Reservations and releases change it with a single
+    conditional UPDATE each (see catalog.services.reserve_stock).
+    """
+    product = models.OneToOneField(
+        Product,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stock_level',
+        verbose_name=_("Product"),
+    )
+
+    available = models.IntegerField(
+        _("available"),
+        default=0,
+        help_text=_("Stock quantity minus units held by active reservations."),
+    )
+
+    class Meta:
+        verbose_name = _("stock level")
+        verbose_name_plural = _("stock levels")
+
+    def __str__(self):
+        return f"{self.product}: {self.available} available"
+
+
+class StockMovement(models.Model):
+    """
+    Append-only ledger of every change to a tracked product's stock on hand.
+
+    Writers only ever INSERT here, so busy products scale on inserts rather
+    than on contended updates of one row. Current stock is the product's
+    StockSnapshot plus the movements recorded after it.
+    """
+
+    class Reason(models.TextChoices):
+        SALE = 'SALE', _('Sale')
+        RESTOCK = 'RESTOCK', _('Restock')
+        RETURN = 'RETURN', _('Return')
+        ADJUSTMENT = 'ADJUSTMENT', _('Manual adjustment')
+    # --- Relationship Fields ---
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.PROTECT,
+        related_name='stock_movements',
+        verbose_name=_("Product"),
+    )
+
+    # No database constraint: archived invoices leave their id behind, which
+    # apps.archive.services.find_invoice(pk=...) still resolves
+    invoice = models.ForeignKey(
+        'billing.Invoice',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        db_constraint=False,
+        related_name='stock_movements',
+        verbose_name=_("Invoice"),
+    )
+    # --- Movement Fields ---
+    delta = models.IntegerField(
+        _("change"),
+        help_text=_("Units added (positive) or removed (negative)."),
+    )
+
+    reason = models.CharField(
+        _("reason"),
+        max_length=20,
+        choices=Reason.choices,
+    )
+
+    note = models.CharField(
+        _("note"),
+        max_length=255,
+        blank=True,
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("stock movement")
+        verbose_name_plural = _("stock movements")
+        indexes = [
+            # "Movements since the snapshot" for one product
+            models.Index(fields=['product', 'id'], name='stock_movement_product_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.delta:+d} {self.product_id} ({self.reason})"
+
+
+class StockSnapshot(models.Model):
+    """
+    Stock on hand for a tracked product as of ``last_movement_id``.
+
+    The compaction job (catalog.services.compact_stock_movements) periodically
+    folds newer movements into ``quantity``. ``opening_quantity`` is the stock
+    the ledger started from, which lets the consistency checker re-derive
+    ``quantity`` from the full history.
+    """
+    product = models.OneToOneField(
+        Product,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stock_snapshot',
+        verbose_name=_("Product"),
+    )
+
+    opening_quantity = models.IntegerField(
+        _("opening quantity"),
+        default=0,
+    )
+
+    quantity = models.IntegerField(
+        _("quantity"),
+        default=0,
+    )
+
+    last_movement_id = models.BigIntegerField(
+        _("last folded movement"),
+        default=0,
+    )
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("stock snapshot")
+        verbose_name_plural = _("stock snapshots")
+
+    def __str__(self):
+        return f"{self.product}: {self.quantity} as of movement {self.last_movement_id}"
+
+
+class ProductPriceHistory(models.Model):
+    """One row per price change made by a bulk repricing run."""
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='price_history',
+        verbose_name=_("Product"),
+    )
+
+    old_price = models.DecimalField(_("old price"), max_digits=10, decimal_places=2)
+
+    new_price = models.DecimalField(_("new price"), max_digits=10, decimal_places=2)
+
+    changed_at = models.DateTimeField(_("changed at"), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("price change")
+        verbose_name_plural = _("price history")
+        ordering = ['-changed_at']
+        indexes = [
+            models.Index(fields=['product', '-changed_at'], name='price_history_product_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id}: {self.old_price} -> {self.new_price}"
@@ -1,36 +1,645 @@
+import csv
+import json
+from datetime import timedelta
+from decimal import Decimal
+from django.core.exceptions import ValidationError
 from django.db import transaction
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
-from django.db.models import F
-from .models import Product
+from django.db.models import Count, DecimalField, F, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, Round
+from .cache import invalidate_catalog_cache
+from common.services import apply_bulk_updates, find_duplicates, iter_import_rows
+from .models import Product, ProductPriceHistory, StockLevel, StockMovement, StockSnapshot, validate_inventory_fields
 
 @transaction.atomic
-def decrease_stock(product_id: int, quantity: int) -> Product:
+def decrease_stock(product_id: int, quantity: int, invoice=None) -> int:
     """
     Atomically decreases the stock quantity for a given product.
     Raises an error if the product is not found or if there is insufficient stock.
+
+    The units come out of available stock with one conditional UPDATE and the
+    sale is recorded as a ledger insert, so the product row is never locked.
+    Returns the product's stock on hand afterwards.
     """
     if quantity <= 0:
         raise ValueError(_("Quantity to decrease must be a positive number."))
 
+    product = Product.objects.filter(pk=product_id).only('name', 'track_inventory').first()
+    if product is None:
+        raise ValueError(_("Product with ID %(id)s does not exist.") % {'id': product_id})
+
+    if not product.track_inventory:
+        raise ValueError(_("Product '%(name)s' does not track inventory.") % {'name': product.name})
+
+    if not reserve_stock(product_id, quantity):
+        raise ValueError(
+            _("Insufficient stock for '%(name)s'. Available: %(available)s, Required: %(required)s.") %
+            {'name': product.name, 'available': get_available_stock(product_id), 'required': quantity}
+        )
+
+    record_stock_movement(product_id, -quantity, StockMovement.Reason.SALE, invoice=invoice)
+    return get_current_stock(product_id)
+
+# --- Stock Reservation Primitives ---
+# Each of these is one conditional UPDATE on the StockLevel counter, so
+# concurrent invoices never need to lock the product row.
+
+def reserve_stock(product_id: int, quantity: int) -> bool:
+    """
+    Takes ``quantity`` units out of the product's available stock if, and only
+    if, that many are available. Returns whether the reservation succeeded.
+    """
+    return bool(
+        StockLevel.objects
+        .filter(product_id=product_id, available__gte=quantity)
+        .update(available=F('available') - quantity)
+    )
+
+
+def release_stock(product_id: int, quantity: int) -> None:
+    """Returns previously reserved units to the product's available stock."""
+    StockLevel.objects.filter(product_id=product_id).update(available=F('available') + quantity)
+
+
+def commit_sales(sold: dict, reserved: dict) -> None:
+    """
+    Records sold units in the stock ledger. ``sold`` maps (product_id,
+    invoice_id) to the units sold on that invoice; ``reserved`` maps
+    product_id to the units that reservations for these sales already took
+    out of available stock. Available stock then moves by the difference per
+    product: units sold beyond the reservations come out now, reserved units
+    that were not sold go back. One ledger insert in all, and one UPDATE per
+    product whose counters differ.
+    """
+    StockMovement.objects.bulk_create([
+        StockMovement(product_id=product_id, invoice_id=invoice_id, delta=-quantity, reason=StockMovement.Reason.SALE)
+        for (product_id, invoice_id), quantity in sold.items()
+    ])
+    change = dict(reserved)
+    for (product_id, invoice_id), quantity in sold.items():
+        change[product_id] = change.get(product_id, 0) - quantity
+    for product_id, quantity in change.items():
+        if quantity:
+            StockLevel.objects.filter(product_id=product_id).update(available=F('available') + quantity)
+
+
+def get_available_stock(product_id: int) -> int:
+    """Returns how many units of a tracked product can still be reserved."""
+    return StockLevel.objects.filter(product_id=product_id).values_list('available', flat=True).first() or 0
+
+
+def sync_stock_level(product_id: int) -> None:
+    """
+    Recomputes a tracked product's available stock as stock on hand minus
+    active reservations. Used after the stock quantity is edited by hand
+    (product form or admin).
+    """
+    from apps.billing.models import StockReservation  # Avoid circular import
+
+    reserved = (
+        StockReservation.objects
+        .filter(product_id=product_id, status=StockReservation.Status.ACTIVE)
+        .values('product_id')
+        .annotate(total=Sum('quantity'))
+        .values('total')
+    )
+    available = get_current_stock(product_id) - Coalesce(Subquery(reserved), 0)
+
+    if not StockLevel.objects.filter(product_id=product_id).update(available=available):
+        StockLevel.objects.get_or_create(product_id=product_id)
+        StockLevel.objects.filter(product_id=product_id).update(available=available)
+
+# --- Stock Ledger ---
+# Stock on hand is never updated in place: every change is a StockMovement
+# insert, and compact_stock_movements() periodically folds the ledger into
+# each product's StockSnapshot (and the cached Product.stock_quantity column).
+
+def record_stock_movement(product_id: int, delta: int, reason: str, invoice=None, note: str = '') -> StockMovement:
+    """Appends one movement to a tracked product's stock ledger."""
+    return StockMovement.objects.create(
+        product_id=product_id, delta=delta, reason=reason, invoice=invoice, note=note,
+    )
+
+
+def open_stock_ledger(product: Product) -> None:
+    """
+    Starts the ledger for a product that has just begun tracking inventory,
+    using its current stock quantity as the opening balance.
+    """
+    StockSnapshot.objects.get_or_create(
+        product_id=product.pk,
+        defaults={'opening_quantity': product.stock_quantity or 0, 'quantity': product.stock_quantity or 0},
+    )
+
+
+def with_current_stock(queryset):
+    """
+    Annotates ``current_stock`` (snapshot plus movements since) on a product
+    queryset. NULL for products whose ledger has not been opened.
+    """
+    since = (
+        StockMovement.objects
+        .filter(product_id=OuterRef('pk'), id__gt=OuterRef('stock_snapshot__last_movement_id'))
+        .values('product_id')
+        .annotate(total=Sum('delta'))
+        .values('total')
+    )
+    return queryset.annotate(current_stock=F('stock_snapshot__quantity') + Coalesce(Subquery(since), 0))
+
+
+def get_current_stock(product_id: int) -> int:
+    """Returns stock on hand: the product's snapshot plus every movement recorded since."""
+    snapshot = StockSnapshot.objects.filter(product_id=product_id).values('quantity', 'last_movement_id').first()
+    if snapshot is None:
+        return 0
+    since = (
+        StockMovement.objects
+        .filter(product_id=product_id, id__gt=snapshot['last_movement_id'])
+        .aggregate(total=Sum('delta'))['total']
+    )
+    return snapshot['quantity'] + (since or 0)
+
+
+def adjust_stock(product_id: int, quantity: int, note: str = '') -> int:
+    """
+    Sets a product's stock on hand to ``quantity`` by recording the difference
+    as an adjustment. Returns the recorded change.
+    """
+    delta = quantity - get_current_stock(product_id)
+    if delta:
+        record_stock_movement(product_id, delta, StockMovement.Reason.ADJUSTMENT, note=note)
+    return delta
+
+
+@transaction.atomic
+def compact_stock_movements(settle_seconds: int = 5) -> int:
+    """
+    Folds ledger movements into the per-product snapshots and refreshes the
+    cached Product.stock_quantity column. Returns the number of products updated.
+
+    Only movements older than ``settle_seconds`` are folded so a movement whose
+    transaction commits late is never skipped. One grouped read, then one
+    UPDATE per changed product plus a single UPDATE advancing every snapshot.
+    """
+    cutoff = (
+        StockMovement.objects
+        .filter(created_at__lte=timezone.now() - timedelta(seconds=settle_seconds))
+        .aggregate(last=Max('id'))['last']
+    )
+    if cutoff is None:
+        return 0
+
+    pending = (
+        StockMovement.objects
+        .filter(id__lte=cutoff, id__gt=F('product__stock_snapshot__last_movement_id'))
+        .values('product_id')
+        .annotate(total=Sum('delta'))
+        .values_list('product_id', 'total')
+    )
+    changed = []
+    for product_id, total in pending:
+        StockSnapshot.objects.filter(product_id=product_id).update(quantity=F('quantity') + total)
+        changed.append(product_id)
+
+    StockSnapshot.objects.filter(last_movement_id__lt=cutoff).update(
+        last_movement_id=cutoff, updated_at=timezone.now()
+    )
+    if changed:
+        # stock_quantity is a display copy; it cannot go below zero
+        quantity = StockSnapshot.objects.filter(product_id=OuterRef('pk')).values('quantity')
+        # Stock is not part of the catalog snapshots, so their cache stays valid
+        Product.objects.filter(pk__in=changed).update(stock_quantity=Greatest(Subquery(quantity), 0))
+    return len(changed)
+
+
+def check_stock_consistency() -> list:
+    """
+    Re-derives every tracked product's stock from its full ledger and compares
+    it with the snapshot, the cached stock_quantity column and the available
+    counter. Returns a list of (product_id, problem) tuples; empty when consistent.
+    """
+    from apps.billing.models import StockReservation  # Avoid circular import
+
+    folded = (
+        StockMovement.objects
+        .filter(product_id=OuterRef('product_id'), id__lte=OuterRef('last_movement_id'))
+        .values('product_id').annotate(total=Sum('delta')).values('total')
+    )
+    since = (
+        StockMovement.objects
+        .filter(product_id=OuterRef('product_id'), id__gt=OuterRef('last_movement_id'))
+        .values('product_id').annotate(total=Sum('delta')).values('total')
+    )
+    reserved = (
+        StockReservation.objects
+        .filter(product_id=OuterRef('product_id'), status=StockReservation.Status.ACTIVE)
+        .values('product_id').annotate(total=Sum('quantity')).values('total')
+    )
+    snapshots = (
+        StockSnapshot.objects
+        .filter(product__track_inventory=True)
+        .annotate(
+            folded=Coalesce(Subquery(folded), 0),
+            since=Coalesce(Subquery(since), 0),
+            reserved=Coalesce(Subquery(reserved), 0),
+        )
+        .values_list(
+            'product_id', 'opening_quantity', 'quantity', 'folded', 'since', 'reserved',
+            'product__stock_quantity', 'product__stock_level__available',
+        )
+    )
+
+    problems = []
+    for product_id, opening, quantity, folded, since, reserved, cached, available in snapshots.iterator():
+        if opening + folded != quantity:
+            problems.append((product_id, _("snapshot is %(snapshot)s but the ledger sums to %(ledger)s") % {
+                'snapshot': quantity, 'ledger': opening + folded}))
+        if since == 0 and cached != max(quantity, 0):
+            problems.append((product_id, _("stock quantity is %(cached)s but the snapshot is %(snapshot)s") % {
+                'cached': cached, 'snapshot': quantity}))
+        if available is not None and available != quantity + since - reserved:
+            problems.append((product_id, _("available stock is %(available)s but should be %(expected)s") % {
+                'available': available, 'expected': quantity + since - reserved}))
+
+    missing = Product.objects.filter(track_inventory=True, stock_snapshot__isnull=True).values_list('pk', flat=True)
+    problems.extend((product_id, _("no stock ledger")) for product_id in missing)
+    return problems
+
+# --- Bulk Product Services ---
+
+def _check_skus_available(pairs: list) -> None:
+    """
+    Takes (sku, product_id or None) pairs and raises ValueError if a SKU is
+    repeated or already belongs to another product. One query.
+    """
+    owners = dict(pairs)
+    taken = find_duplicates(sku for sku, _pk in pairs) | {
+        sku for sku, pk in Product.objects.filter(sku__in=[sku for sku in owners if sku]).values_list('sku', 'pk')
+        if owners[sku] != pk
+    }
+    if taken:
+        raise ValueError(_("SKUs already in use: %(skus)s.") % {'skus': ', '.join(sorted(taken))})
+
+
+@transaction.atomic
+def bulk_create_products(rows: list, batch_size: int = 500) -> list:
+    """
+    Creates products from a list of validated field dicts with batched
+    INSERTs and opens the stock ledger of tracked ones in bulk.
+    Raises ValueError if a SKU is repeated or taken.
+    """
+    _check_skus_available([(row.get('sku'), None) for row in rows])
+    products = Product.objects.bulk_create([Product(**row) for row in rows], batch_size=batch_size)
+    _open_stock_ledgers([(p.pk, p.stock_quantity or 0) for p in products if p.track_inventory])
+    transaction.on_commit(invalidate_catalog_cache)
+    return products
+
+
+@transaction.atomic
+def bulk_update_products(rows: list, batch_size: int = 500) -> list:
+    """
+    Applies partial updates (dicts with an 'id' key) to many products with one
+    read and batched UPDATEs. Stock is not updated here; it changes through
+    the stock ledger.
+    """
+    _check_skus_available([(row['sku'], row['id']) for row in rows if row.get('sku')])
+    products = apply_bulk_updates(
+        Product.objects.all(), rows, ('sku', 'name', 'description', 'unit_price', 'is_active'), batch_size,
+    )
+    transaction.on_commit(invalidate_catalog_cache)
+    return products
+
+# --- Bulk Repricing ---
+
+def filter_products(name: str = None, is_active: bool = None, ids=None):
+    """Products whose name contains ``name``, with the given active flag and/or primary keys."""
+    queryset = Product.objects.all()
+    if name:
+        queryset = queryset.filter(name__icontains=name)
+    if is_active is not None:
+        queryset = queryset.filter(is_active=is_active)
+    if ids:
+        queryset = queryset.filter(pk__in=ids)
+    return queryset
+
+
+def _repriced(percent=None, amount=None):
+    """The new unit price as a database expression, rounded to cents and never below zero."""
+    if (percent is None) == (amount is None):
+        raise ValueError(_("Give either a percentage or an absolute price change."))
+    if percent is not None:
+        new_price = F('unit_price') * Value(1 + Decimal(percent) / 100)
+    else:
+        new_price = F('unit_price') + Value(Decimal(amount))
+    return Greatest(
+        Round(new_price, 2), Value(Decimal('0.00')),
+        output_field=DecimalField(max_digits=10, decimal_places=2),
+    )
+
+
+def reprice_products(queryset, percent=None, amount=None, dry_run: bool = False, batch_size: int = 1000) -> dict:
+    """
+    Changes the price of every product in ``queryset`` by ``percent`` or by a
+    fixed ``amount``. Runs one UPDATE per batch of primary keys and records a
+    ProductPriceHistory row for every price that actually changed.
+
+    With ``dry_run`` nothing is written; the number of products and the old and
+    new catalogue value come from a single aggregate query.
+    Returns a dict with 'products', 'changed', 'old_total' and 'new_total'.
+    """
+    new_price = _repriced(percent, amount)
+
+    if dry_run:
+        totals = queryset.order_by().aggregate(
+            products=Count('pk'), old_total=Sum('unit_price'), new_total=Sum(new_price),
+        )
+        cents = Decimal('0.01')
+        return {
+            'products': totals['products'],
+            'changed': None,
+            'old_total': (totals['old_total'] or Decimal('0.00')).quantize(cents),
+            'new_total': (totals['new_total'] or Decimal('0.00')).quantize(cents),
+        }
+
+    result = {'products': 0, 'changed': 0, 'old_total': Decimal('0.00'), 'new_total': Decimal('0.00')}
+    queryset = queryset.order_by('pk')
+    last_pk = 0
     try:
-        # Use select_for_update to lock the row and prevent race conditions
-        product = Product.objects.select_for_update().get(pk=product_id)
-
-        if not product.track_inventory:
-            raise ValueError(_("Product '%(name)s' does not track inventory.") % {'name': product.name})
-
-        if product.stock_quantity < quantity:
-            raise ValueError(
-                _("Insufficient stock for '%(name)s'. Available: %(available)s, Required: %(required)s.") % 
-                {'name': product.name, 'available': product.stock_quantity, 'required': quantity}
-            )
-        
-        # Use F() expression for an atomic database-level update
-        Product.objects.filter(pk=product_id).update(stock_quantity=F('stock_quantity') - quantity)
-        
-        # Refresh the instance to get the new value
-        product.refresh_from_db()
-        return product
-
-    except Product.DoesNotExist:
-        raise ValueError(_("Product with ID %(id)s does not exist.") % {'id': product_id})
\ No newline at end of file
+        while True:
+            with transaction.atomic():
+                old_prices = dict(queryset.filter(pk__gt=last_pk).values_list('pk', 'unit_price')[:batch_size])
+                if not old_prices:
+                    break
+                Product.objects.filter(pk__in=old_prices).update(unit_price=new_price, updated_at=timezone.now())
+
+                history = []
+                for pk, price in Product.objects.filter(pk__in=old_prices).values_list('pk', 'unit_price'):
+                    result['old_total'] += old_prices[pk]
+                    result['new_total'] += price
+                    if price != old_prices[pk]:
+                        history.append(ProductPriceHistory(product_id=pk, old_price=old_prices[pk], new_price=price))
+                ProductPriceHistory.objects.bulk_create(history)
+
+            result['products'] += len(old_prices)
+            result['changed'] += len(history)
+            last_pk = max(old_prices)
+    finally:
+        # Queryset updates bypass the Product signals
+        if result['products']:
+            transaction.on_commit(invalidate_catalog_cache)
+    return result
+
+# --- Catalog Import / Export ---
+
+CATALOG_FIELDS = ('sku', 'name', 'description', 'unit_price', 'track_inventory', 'stock_quantity', 'is_active')
+
+_TRUE_VALUES = {'1', 'true', 'yes', 'y', 't'}
+_FALSE_VALUES = {'0', 'false', 'no', 'n', 'f'}
+
+
+def _parse_bool(value, default: bool) -> bool:
+    if value is None or value == '':
+        return default
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in _TRUE_VALUES:
+        return True
+    if text in _FALSE_VALUES:
+        return False
+    raise ValidationError(_("'%(value)s' is not a valid yes/no value.") % {'value': value})
+
+
+def _clean_catalog_row(row: dict) -> dict:
+    """
+    Validates and normalises a single catalog row without touching the
+    database, using the Product field validators and the same inventory rule
+    as Product.clean. Raises ValidationError on bad input.
+    """
+    if '_error' in row:
+        raise ValidationError(row['_error'])
+
+    field = Product._meta.get_field
+    sku = str(row.get('sku') or '').strip()
+    name = str(row.get('name') or '').strip()
+    price = str(row.get('unit_price') if row.get('unit_price') is not None else '').strip()
+    stock = str(row.get('stock_quantity') if row.get('stock_quantity') is not None else '').strip()
+
+    if not sku:
+        raise ValidationError(_("SKU is required."))
+    if not name:
+        raise ValidationError(_("Name is required."))
+    if not price:
+        raise ValidationError(_("Unit price is required."))
+
+    data = {
+        'sku': field('sku').clean(sku, None),
+        'name': field('name').clean(name, None),
+        'description': str(row.get('description') or '').strip() or None,
+        'unit_price': field('unit_price').clean(price, None),
+        'track_inventory': _parse_bool(row.get('track_inventory'), False),
+        'stock_quantity': field('stock_quantity').clean(stock, None) if stock else None,
+        'is_active': _parse_bool(row.get('is_active'), True),
+    }
+    validate_inventory_fields(data['track_inventory'], data['stock_quantity'])
+    return data
+
+
+def _open_stock_ledgers(opened: list) -> None:
+    """
+    Bulk counterpart of open_stock_ledger for products created without
+    signals: takes (product_id, quantity) pairs and opens the stock snapshot
+    and available counter of each at that quantity.
+    """
+    if not opened:
+        return
+    StockSnapshot.objects.bulk_create(
+        [StockSnapshot(product_id=pk, opening_quantity=q, quantity=q) for pk, q in opened],
+        ignore_conflicts=True,
+    )
+    StockLevel.objects.bulk_create(
+        [StockLevel(product_id=pk, available=q) for pk, q in opened],
+        update_conflicts=True, unique_fields=['product'], update_fields=['available'],
+    )
+
+
+def _sync_imported_stock(chunk: list) -> None:
+    """
+    Brings the stock ledger of a just-imported chunk in line with the feed:
+    products tracked for the first time get their ledger opened at the feed
+    quantity, others get an adjustment movement for the difference.
+    """
+    feed_stock = {product.sku: product.stock_quantity for product in chunk if product.track_inventory}
+    if not feed_stock:
+        return
+
+    opened, movements = [], []
+    rows = with_current_stock(Product.objects.filter(sku__in=feed_stock)).values_list('pk', 'sku', 'current_stock')
+    for pk, sku, current in rows:
+        quantity = feed_stock[sku]
+        if current is None:
+            opened.append((pk, quantity))
+        elif current != quantity:
+            movements.append(StockMovement(
+                product_id=pk, delta=quantity - current,
+                reason=StockMovement.Reason.ADJUSTMENT, note=_("Catalog import"),
+            ))
+
+    _open_stock_ledgers(opened)
+    if movements:
+        StockMovement.objects.bulk_create(movements)
+        for movement in movements:
+            StockLevel.objects.filter(product_id=movement.product_id).update(available=F('available') + movement.delta)
+
+
+def _flush_product_chunk(chunk: list) -> None:
+    """Upserts one chunk of validated products keyed on the unique SKU."""
+    with transaction.atomic():
+        Product.objects.bulk_create(
+            chunk,
+            update_conflicts=True,
+            unique_fields=['sku'],
+            update_fields=[f for f in CATALOG_FIELDS if f != 'sku'] + ['updated_at'],
+        )
+        _sync_imported_stock(chunk)
+
+
+def _deactivate_missing_products(started_at, keep_skus: set, batch_size: int = 500) -> int:
+    """
+    Deactivates active products with a SKU that an import starting at
+    ``started_at`` did not upsert (every upserted row has updated_at >=
+    started_at), except those in ``keep_skus``. Without exceptions this is a
+    single UPDATE; otherwise the candidates are walked in primary key batches
+    and filtered in Python, so no statement carries more than ``batch_size``
+    parameters however many rows the feed rejected.
+    """
+    missing = Product.objects.filter(is_active=True, sku__isnull=False, updated_at__lt=started_at)
+    if not keep_skus:
+        return missing.update(is_active=False, updated_at=timezone.now())
+
+    deactivated = 0
+    last_pk = 0
+    while True:
+        batch = list(missing.filter(pk__gt=last_pk).order_by('pk').values_list('pk', 'sku')[:batch_size])
+        if not batch:
+            return deactivated
+        pks = [pk for pk, sku in batch if sku not in keep_skus]
+        if pks:
+            deactivated += Product.objects.filter(pk__in=pks).update(is_active=False, updated_at=timezone.now())
+        last_pk = batch[-1][0]
+
+
+def import_catalog(
+    stream,
+    fmt: str = 'csv',
+    reject_stream=None,
+    deactivate_missing: bool = True,
+    chunk_size: int = 2000,
+    dry_run: bool = False,
+) -> dict:
+    """
+    Streams products from a CSV or JSON-lines feed into the catalog, upserting
+    on SKU.
+
+    Rows are validated one at a time without queries and written in chunks
+    with bulk_create(update_conflicts=True). Stock quantities in the feed are
+    authoritative: differences are recorded in the stock ledger. Afterwards,
+    active products with a SKU that the feed did not mention are deactivated
+    (skipped when no row was accepted); products whose row was rejected keep
+    their state. Rejected rows are written to ``reject_stream`` as CSV
+    together with the reason, if given.
+
+    Returns:
+        A dict with 'created', 'updated', 'rejected' and 'deactivated' counts.
+    """
+    started_at = timezone.now()
+    existing_skus = set(
+        Product.objects.filter(sku__isnull=False).values_list('sku', flat=True).iterator(chunk_size=10000)
+    )
+    seen_skus = set()
+    rejected_skus = set()
+
+    reject_writer = None
+    if reject_stream is not None:
+        reject_writer = csv.writer(reject_stream)
+        reject_writer.writerow(['line', 'error', *CATALOG_FIELDS])
+
+    counts = {'created': 0, 'updated': 0, 'rejected': 0, 'deactivated': 0}
+    chunk = []
+
+    def reject(line_number, row, message):
+        counts['rejected'] += 1
+        if row.get('sku'):
+            rejected_skus.add(str(row['sku']).strip())
+        if reject_writer is not None:
+            reject_writer.writerow([line_number, message, *(row.get(f, '') for f in CATALOG_FIELDS)])
+
+    for line_number, row in iter_import_rows(stream, fmt):
+        try:
+            data = _clean_catalog_row(row)
+        except ValidationError as e:
+            reject(line_number, row, '; '.join(e.messages))
+            continue
+
+        sku = data['sku']
+        if sku in seen_skus:
+            reject(line_number, row, _("Duplicate SKU in import file."))
+            continue
+        seen_skus.add(sku)
+        counts['updated' if sku in existing_skus else 'created'] += 1
+
+        chunk.append(Product(**data))
+        if len(chunk) >= chunk_size:
+            if not dry_run:
+                _flush_product_chunk(chunk)
+            chunk = []
+
+    if chunk and not dry_run:
+        _flush_product_chunk(chunk)
+
+    if dry_run:
+        return counts
+
+    if deactivate_missing and seen_skus:
+        counts['deactivated'] = _deactivate_missing_products(started_at, rejected_skus - seen_skus)
+    # bulk_create and update() bypass the Product signals
+    transaction.on_commit(invalidate_catalog_cache)
+    return counts
+
+
+def export_catalog(stream, fmt: str = 'csv', queryset=None) -> int:
+    """
+    Streams products to ``stream`` as CSV or JSON lines with the same columns
+    the import reads, reporting live stock from the ledger. Rows are fetched
+    with a server-side iterator, so memory stays flat. Returns the row count.
+    """
+    if fmt not in ('csv', 'ndjson'):
+        raise ValueError(_("Unsupported export format: %(format)s") % {'format': fmt})
+
+    queryset = with_current_stock(queryset if queryset is not None else Product.objects.all())
+    rows = queryset.order_by('pk').values_list(
+        'sku', 'name', 'description', 'unit_price', 'track_inventory',
+        'current_stock', 'stock_quantity', 'is_active',
+    )
+
+    writer = csv.writer(stream) if fmt == 'csv' else None
+    if writer is not None:
+        writer.writerow(CATALOG_FIELDS)
+
+    written = 0
+    for sku, name, description, price, tracked, current, cached, active in rows.iterator(chunk_size=2000):
+        stock = (current if current is not None else cached) if tracked else None
+        if writer is not None:
+            writer.writerow([
+                sku or '', name, description or '', price,
+                'true' if tracked else 'false', '' if stock is None else stock,
+                'true' if active else 'false',
+            ])
+        else:
+            stream.write(json.dumps({
+                'sku': sku, 'name': name, 'description': description, 'unit_price': str(price),
+                'track_inventory': tracked, 'stock_quantity': stock, 'is_active': active,
+            }) + '\n')
+        written += 1
+    return written
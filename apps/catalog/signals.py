@@ -0,0 +1,47 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.test.signals import setting_changed
+from common.models import deactivated
+from .models import Product
+from .cache import invalidate_catalog_cache
+from .services import open_stock_ledger, sync_stock_level
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_catalog_on_product_change(sender, instance, **kwargs):
+    """
+    When a product is saved (ProductUpdateView, the admin, ...) or deleted,
+    tell every worker to drop its cached product snapshots once the change
+    is committed; before that they would only reload the old row.
+    """
+    transaction.on_commit(invalidate_catalog_cache)
+
+
+@receiver(deactivated, sender=Product)
+def invalidate_catalog_on_product_deactivation(sender, pks, **kwargs):
+    """Deactivation is a bulk UPDATE without post_save; cached snapshots still say is_active."""
+    transaction.on_commit(invalidate_catalog_cache)
+
+
+@receiver(setting_changed)
+def invalidate_catalog_on_setting_change(setting, **kwargs):
+    """
+    Tests switch the shared cache with override_settings. Product writes
+    inside a TestCase never commit, so this is also what stops one test's
+    snapshots from being served to the next.
+    """
+    if setting.startswith('CATALOG_CACHE_'):
+        invalidate_catalog_cache()
+
+
+@receiver(post_save, sender=Product)
+def sync_stock_level_on_product_save(sender, instance, **kwargs):
+    """
+    Stock quantity may have been edited by hand, so recompute how much of it
+    is still free to reserve. A product that has just started tracking
+    inventory gets its stock ledger opened at the entered quantity.
+    """
+    if instance.track_inventory:
+        open_stock_ledger(instance)
+        sync_stock_level(instance.pk)
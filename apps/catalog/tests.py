@@ -1,3 +1,192 @@
-from django.test import TestCase
+import io
+import threading
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.admin.sites import site
+from django.db import connection, transaction
+from django.db.models import F
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from apps.accounts.models import User
+
+from .cache import get_product_snapshot
+from .forms import ProductForm
+from .models import Product, ProductPriceHistory, StockMovement, StockSnapshot
+from .services import (
+    check_stock_consistency, compact_stock_movements, decrease_stock, export_catalog, get_available_stock,
+    get_current_stock, import_catalog, reprice_products, with_current_stock,
+)
+
+
+@override_settings(CATALOG_CACHE_ALIAS='default', CATALOG_CACHE_VERSION_CHECK=0)
+class StockLedgerTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('staff@example.com', 'secret', is_staff=True, is_superuser=True)
+        cls.product = Product.objects.create(
+            name='Widget', unit_price=Decimal('5.00'), track_inventory=True, stock_quantity=10,
+        )
+        decrease_stock(cls.product.pk, 3)
+
+    def test_current_stock_is_the_snapshot_plus_later_movements(self):
+        self.assertEqual(get_current_stock(self.product.pk), 7)
+        self.assertEqual(with_current_stock(Product.objects.all()).get().current_stock, 7)
+        self.assertEqual(Product.objects.get().stock_quantity, 10)  # Only a copy until compaction
+
+    def test_compaction_folds_the_ledger_into_the_snapshot(self):
+        self.assertEqual(compact_stock_movements(settle_seconds=0), 1)
+
+        self.assertEqual(StockSnapshot.objects.get().quantity, 7)
+        self.assertEqual(Product.objects.get().stock_quantity, 7)
+        self.assertEqual(get_current_stock(self.product.pk), 7)
+        self.assertEqual(compact_stock_movements(settle_seconds=0), 0)
+
+    def test_editing_stock_in_the_form_records_an_adjustment(self):
+        form = ProductForm(instance=self.product)
+        self.assertEqual(form.initial['stock_quantity'], 7)
+
+        data = {**form.initial, 'description': '', 'sku': '', 'stock_quantity': 4}
+        form = ProductForm(data, instance=self.product)
+        self.assertTrue(form.is_valid(), form.errors)
+        form.save()
+
+        adjustment = StockMovement.objects.get(reason=StockMovement.Reason.ADJUSTMENT)
+        self.assertEqual(adjustment.delta, -3)
+        self.assertEqual(get_current_stock(self.product.pk), 4)
+        self.assertEqual(get_available_stock(self.product.pk), 4)
+        self.assertEqual(check_stock_consistency(), [])
+
+    def test_consistency_check_reports_drift(self):
+        compact_stock_movements(settle_seconds=0)
+        self.assertEqual(check_stock_consistency(), [])
+
+        StockSnapshot.objects.update(quantity=F('quantity') + 1)
+        [(product_id, problem)] = [row for row in check_stock_consistency() if 'ledger' in row[1]]
+        self.assertEqual(product_id, self.product.pk)
+
+    @override_settings(REPORTING_DATABASE=None)
+    def test_admin_and_dashboard_show_live_stock(self):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        admin = site._registry[Product]
+        self.assertEqual(admin.get_stock_status(admin.get_queryset(request).get()), '7 units')
+
+        # stock_quantity still says 10, which would not count as low
+        self.client.force_login(self.user)
+        [product] = self.client.get(reverse('dashboard')).context['low_stock_products']
+        self.assertEqual(product.current_stock, 7)
+
+
+@override_settings(CATALOG_CACHE_ALIAS='default', CATALOG_CACHE_VERSION_CHECK=0)
+class RepriceProductsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.widget = Product.objects.create(name='Widget', unit_price=Decimal('10.00'))
+        cls.gadget = Product.objects.create(name='Gadget', unit_price=Decimal('2.50'))
+        cls.freebie = Product.objects.create(name='Freebie', unit_price=Decimal('0.00'))
+
+    def test_dry_run_reports_totals_without_writing(self):
+        result = reprice_products(Product.objects.all(), percent=10, dry_run=True)
+
+        self.assertEqual(result['products'], 3)
+        self.assertEqual(result['new_total'], Decimal('13.75'))
+        self.assertEqual(Product.objects.get(pk=self.widget.pk).unit_price, Decimal('10.00'))
+        self.assertFalse(ProductPriceHistory.objects.exists())
+
+    def test_only_changed_prices_get_a_history_row(self):
+        get_product_snapshot(self.widget.pk)  # Cached at the old price
+        with self.captureOnCommitCallbacks(execute=True):
+            result = reprice_products(Product.objects.all(), percent=10, batch_size=2)
+
+        self.assertEqual(result, {
+            'products': 3, 'changed': 2, 'old_total': Decimal('12.50'), 'new_total': Decimal('13.75'),
+        })
+        self.assertEqual(
+            set(ProductPriceHistory.objects.values_list('product_id', 'old_price', 'new_price')),
+            {(self.widget.pk, Decimal('10.00'), Decimal('11.00')), (self.gadget.pk, Decimal('2.50'), Decimal('2.75'))},
+        )
+        self.assertEqual(get_product_snapshot(self.widget.pk).unit_price, Decimal('11.00'))
+
+    def test_prices_never_go_below_zero(self):
+        reprice_products(Product.objects.filter(pk=self.gadget.pk), amount='-5.00')
+        self.assertEqual(Product.objects.get(pk=self.gadget.pk).unit_price, Decimal('0.00'))
+        self.assertEqual(ProductPriceHistory.objects.get().new_price, Decimal('0.00'))
+
+
+@override_settings(CATALOG_CACHE_ALIAS='default', CATALOG_CACHE_VERSION_CHECK=0)
+class CatalogImportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.kept = Product.objects.create(
+            sku='KEPT', name='Kept', unit_price=Decimal('1.00'), track_inventory=True, stock_quantity=5,
+        )
+        cls.dropped = Product.objects.create(sku='DROPPED', name='Dropped', unit_price=Decimal('2.00'))
+        cls.broken = Product.objects.create(sku='BROKEN', name='Broken', unit_price=Decimal('3.00'))
+        cls.unsynced = Product.objects.create(name='No SKU', unit_price=Decimal('4.00'))
+
+    def is_active(self, product):
+        return Product.objects.get(pk=product.pk).is_active
+
+    def test_sync_deactivates_products_missing_from_the_feed(self):
+        feed = io.StringIO(
+            "sku,name,unit_price,track_inventory,stock_quantity\n"
+            "KEPT,Kept,1.50,true,8\n"
+            "BROKEN,Broken,not-a-price,,\n"
+            "NEW,New,9.00,,\n"
+        )
+        counts = import_catalog(feed)
+
+        self.assertEqual(counts, {'created': 1, 'updated': 1, 'rejected': 1, 'deactivated': 1})
+        self.assertFalse(self.is_active(self.dropped))
+        # A rejected row still counts as mentioned; products without a SKU are not synced
+        self.assertTrue(self.is_active(self.broken))
+        self.assertTrue(self.is_active(self.unsynced))
+        self.assertEqual(Product.objects.get(pk=self.kept.pk).unit_price, Decimal('1.50'))
+        self.assertEqual(get_current_stock(self.kept.pk), 8)
+
+    def test_exported_catalog_reimports_unchanged(self):
+        decrease_stock(self.kept.pk, 2)
+        exported = io.StringIO()
+        self.assertEqual(export_catalog(exported, queryset=Product.objects.filter(sku__isnull=False)), 3)
+        exported.seek(0)
+
+        counts = import_catalog(exported)
+
+        self.assertEqual(counts, {'created': 0, 'updated': 3, 'rejected': 0, 'deactivated': 0})
+        self.assertEqual(get_current_stock(self.kept.pk), 3)
+        self.assertFalse(StockMovement.objects.filter(reason=StockMovement.Reason.ADJUSTMENT).exists())
+
+
+@override_settings(CATALOG_CACHE_ALIAS='default', CATALOG_CACHE_VERSION_CHECK=0)
+class CatalogCacheCommitTests(TransactionTestCase):
+    # Needs real commits: the invalidation only runs once the write commits
+
+    def read_from_another_connection(self, product_id):
+        """Looks the product up on a new thread, which has its own connection, like another worker."""
+        seen = []
+
+        def read():
+            try:
+                seen.append(get_product_snapshot(product_id).unit_price)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=read)
+        thread.start()
+        thread.join()
+        return seen[0]
+
+    def test_snapshot_read_during_a_write_is_dropped_when_it_commits(self):
+        product = Product.objects.create(name='Widget', unit_price=Decimal('5.00'))
+
+        with transaction.atomic():
+            product.unit_price = Decimal('7.00')
+            product.save()
+            # Another worker still sees, and caches, the committed price
+            self.assertEqual(self.read_from_another_connection(product.pk), Decimal('5.00'))
+
+        self.assertEqual(self.read_from_another_connection(product.pk), Decimal('7.00'))
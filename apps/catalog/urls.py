@@ -4,6 +4,8 @@ from . import views
 
 urlpatterns = [
     path('', views.ProductListView.as_view(), name='product-list'),
+    path('autocomplete/', views.product_autocomplete, name='product-autocomplete'),
+    path('cache-stats/', views.catalog_cache_stats_view, name='product-cache-stats'),
     path('new/', views.ProductCreateView.as_view(), name='product-create'),
     path('<int:pk>/edit/', views.ProductUpdateView.as_view(), name='product-update'),
 ]
\ No newline at end of file
@@ -1,11 +1,16 @@
 # catalog/views.py
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
+from django.http import JsonResponse
 from django.urls import reverse_lazy
 from django.views.generic import ListView, CreateView, UpdateView
 
 from .models import Product
 from .forms import ProductForm
+from common.services import cached_autocomplete, prefix_search
+from .cache import catalog_cache_stats
 
 class ProductListView(LoginRequiredMixin, ListView):
     model = Product
@@ -13,6 +18,12 @@ class ProductListView(LoginRequiredMixin, ListView):
     context_object_name = 'products'
     paginate_by = 20
 
+    def get_queryset(self):
+        # Deactivated products are hidden unless explicitly requested
+        if self.request.GET.get('show_inactive'):
+            return Product.objects.all()
+        return Product.active.all()
+
 class ProductCreateView(LoginRequiredMixin, CreateView):
     model = Product
     form_class = ProductForm
@@ -29,4 +40,23 @@ class ProductUpdateView(LoginRequiredMixin, UpdateView):
     success_url = reverse_lazy('product-list')
     def form_valid(self, form):
         messages.success(self.request, "Product updated successfully.")
-        return super().form_valid(form)
\ No newline at end of file
+        return super().form_valid(form)
+
+@login_required
+def product_autocomplete(request):
+    """Returns active products whose name starts with ?q= as JSON."""
+    term = request.GET.get('q', '')
+    if not term.strip():
+        return JsonResponse({'results': []})
+
+    def build_results(term):
+        matches = prefix_search(Product.active.only('name', 'unit_price'), ['name'], term)
+        return [{'id': p.pk, 'text': f"{p.name} (${p.unit_price:.2f})"} for p in matches]
+
+    return JsonResponse({'results': cached_autocomplete('product', term, build_results)})
+
+
+@staff_member_required
+def catalog_cache_stats_view(request):
+    """Reports this worker's catalog cache hit/miss counters as JSON."""
+    return JsonResponse(catalog_cache_stats())
@@ -5,7 +5,21 @@ from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 from django.urls import reverse
 
-from .models import Customer
+from .models import Customer, CustomerStats
+
+
+class CustomerStatsInline(admin.StackedInline):
+    """Read-only financial summary shown on the Customer page."""
+    model = CustomerStats
+    can_delete = False
+    readonly_fields = (
+        'invoice_count', 'lifetime_billed', 'lifetime_paid', 'outstanding',
+        'last_invoice_at', 'last_payment_at', 'updated_at',
+    )
+    fields = readonly_fields
+
+    def has_add_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(Customer)
@@ -16,15 +30,28 @@ class CustomerAdmin(admin.ModelAdmin):
     list_filter = ('is_active', 'created_at')
     search_fields = ('name', 'email')
     ordering = ('name',)
+
+    inlines = [CustomerStatsInline]
+
+    # Stats are read from the denormalized table in the same query
+    list_select_related = ('stats',)
     
     # Add a direct link to view all invoices for a customer
     def invoice_count(self, obj):
-        count = obj.invoices.count()
+        stats = getattr(obj, 'stats', None)
+        count = stats.invoice_count if stats else 0
         if count > 0:
             url = reverse('admin:billing_invoice_changelist') + f'?customer__id__exact={obj.id}'
             return format_html('<a href="{}">{} Invoices</a>', url, count)
         return "0 Invoices"
     invoice_count.short_description = _('Invoices')
+    invoice_count.admin_order_field = 'stats__invoice_count'
+
+    def outstanding(self, obj):
+        stats = getattr(obj, 'stats', None)
+        return f"{stats.outstanding:.2f}" if stats else "0.00"
+    outstanding.short_description = _('Outstanding')
+    outstanding.admin_order_field = 'stats__outstanding'
 
     # Add the custom method to the list display
-    list_display = ('name', 'email', 'phone', 'invoice_count', 'is_active')
\ No newline at end of file
+    list_display = ('name', 'email', 'phone', 'invoice_count', 'outstanding', 'is_active')
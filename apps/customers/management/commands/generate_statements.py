@@ -0,0 +1,86 @@
+import datetime
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+
+def _init_worker():
+    """Sets up Django in a freshly spawned worker process."""
+    import django
+    django.setup()
+
+
+def render_statement(customer_id, start_date, end_date, output_dir):
+    """Renders one customer's statement to a file. Runs inside a worker process."""
+    from apps.billing.utils import generate_customer_statement_pdf
+    from apps.customers.models import Customer
+
+    customer = Customer.objects.get(pk=customer_id)
+    path = Path(output_dir) / f"statement_{customer_id}_{start_date:%Y%m%d}_{end_date:%Y%m%d}.pdf"
+    generate_customer_statement_pdf(customer, start_date, end_date, str(path))
+    return str(path)
+
+
+def _parse_date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD.")
+
+
+class Command(BaseCommand):
+    help = "Renders statement PDFs for every customer (or the given ones) in parallel worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help="First day of the period (default: first day of last month).")
+        parser.add_argument('--end', help="Last day of the period (default: last day of last month).")
+        parser.add_argument('--output-dir', default='statements', help="Directory to write the PDFs to.")
+        parser.add_argument('--customer', type=int, action='append', dest='customer_ids',
+                            help="Only render this customer; may be repeated.")
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help="Number of worker processes (default: number of CPUs).")
+
+    def handle(self, *args, **options):
+        from apps.reports.services import get_statement_customer_ids
+
+        this_month = timezone.localdate().replace(day=1)
+        end_date = _parse_date(options['end']) if options['end'] else this_month - datetime.timedelta(days=1)
+        start_date = _parse_date(options['start']) if options['start'] else end_date.replace(day=1)
+        if start_date > end_date:
+            raise CommandError("--start must be on or before --end.")
+
+        output_dir = Path(options['output_dir'])
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        customer_ids = options['customer_ids'] or get_statement_customer_ids(end_date)
+        if not customer_ids:
+            self.stdout.write("No customers with statement activity.")
+            return
+
+        # Workers open their own connections; never share one across processes
+        connections.close_all()
+
+        done = failed = 0
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=options['workers'], mp_context=context, initializer=_init_worker) as pool:
+            futures = {
+                pool.submit(render_statement, customer_id, start_date, end_date, str(output_dir)): customer_id
+                for customer_id in customer_ids
+            }
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                    done += 1
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"Customer {futures[future]}: {e}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered {done} statements for {start_date:%Y-%m-%d} to {end_date:%Y-%m-%d} into {output_dir}"
+            + (f" ({failed} failed)" if failed else "")
+        ))
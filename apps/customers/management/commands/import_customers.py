@@ -0,0 +1,54 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.customers.services import import_customers
+
+
+class Command(BaseCommand):
+    help = "Bulk imports customers from a CSV or JSON-lines file, upserting on email."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or JSON-lines file to import.")
+        parser.add_argument(
+            '--format', choices=['csv', 'ndjson'],
+            help="Input format (default: guessed from the file extension).",
+        )
+        parser.add_argument(
+            '--rejects',
+            help="Write rejected rows and the reason to this CSV file "
+                 "(default: <path>.rejects.csv).",
+        )
+        parser.add_argument(
+            '--no-update', action='store_true',
+            help="Reject rows whose email already exists instead of updating them.",
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--dry-run', action='store_true', help="Validate only; write nothing.")
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        if not path.exists():
+            raise CommandError(f"File not found: {path}")
+
+        fmt = options['format'] or ('csv' if path.suffix.lower() == '.csv' else 'ndjson')
+        reject_path = Path(options['rejects'] or f"{path}.rejects.csv")
+
+        with open(path, newline='', encoding='utf-8') as source, \
+                open(reject_path, 'w', newline='', encoding='utf-8') as rejects:
+            counts = import_customers(
+                source,
+                fmt=fmt,
+                reject_stream=rejects,
+                update_existing=not options['no_update'],
+                chunk_size=options['chunk_size'],
+                dry_run=options['dry_run'],
+            )
+
+        prefix = "[dry run] " if options['dry_run'] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}Created {counts['created']}, updated {counts['updated']}, "
+            f"rejected {counts['rejected']} customers."
+        ))
+        if counts['rejected']:
+            self.stdout.write(f"Rejected rows written to {reject_path}")
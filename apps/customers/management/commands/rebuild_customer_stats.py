@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from apps.customers.services import refresh_customer_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the CustomerStats table from invoices and payments."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'customer_ids', nargs='*', type=int,
+            help="Only rebuild these customers (default: all customers).",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help="Number of customers aggregated per query (default: 1000).",
+        )
+
+    def handle(self, *args, **options):
+        written = refresh_customer_stats(
+            customer_ids=options['customer_ids'] or None,
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt statistics for {written} customers."))
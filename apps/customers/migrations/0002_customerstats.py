@@ -0,0 +1,87 @@
+# Generated by Django 6.0.1 on 2026-10-19 02:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("customers", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CustomerStats",
+            fields=[
+                (
+                    "customer",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="customers.customer",
+                        verbose_name="Customer",
+                    ),
+                ),
+                (
+                    "invoice_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="invoice count"
+                    ),
+                ),
+                (
+                    "lifetime_billed",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        help_text="Sum of all non-cancelled invoice totals.",
+                        max_digits=14,
+                        verbose_name="lifetime billed",
+                    ),
+                ),
+                (
+                    "lifetime_paid",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        help_text="Sum of all payments received.",
+                        max_digits=14,
+                        verbose_name="lifetime paid",
+                    ),
+                ),
+                (
+                    "outstanding",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        help_text="Lifetime billed minus lifetime paid.",
+                        max_digits=14,
+                        verbose_name="outstanding",
+                    ),
+                ),
+                (
+                    "last_invoice_at",
+                    models.DateField(
+                        blank=True, null=True, verbose_name="last invoice date"
+                    ),
+                ),
+                (
+                    "last_payment_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="last payment date"
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "customer statistics",
+                "verbose_name_plural": "customer statistics",
+                "indexes": [
+                    models.Index(
+                        fields=["-lifetime_paid"], name="customer_stats_paid_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0.1 on 2026-10-19 02:09
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("customers", "0002_customerstats"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="customer",
+            index=models.Index(
+                django.db.models.functions.text.Lower("name"),
+                name="customer_name_lower_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="customer",
+            index=models.Index(
+                django.db.models.functions.text.Lower("email"),
+                name="customer_email_lower_idx",
+            ),
+        ),
+    ]
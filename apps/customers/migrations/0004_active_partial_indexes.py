@@ -0,0 +1,37 @@
+# Generated by Django 6.0.1 on 2026-10-19 02:13
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("customers", "0003_name_lower_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="customer",
+            name="customer_name_lower_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="customer",
+            name="customer_email_lower_idx",
+        ),
+        migrations.AddIndex(
+            model_name="customer",
+            index=models.Index(
+                django.db.models.functions.text.Lower("name"),
+                condition=models.Q(("is_active", True)),
+                name="customer_active_name_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="customer",
+            index=models.Index(
+                django.db.models.functions.text.Lower("email"),
+                condition=models.Q(("is_active", True)),
+                name="customer_active_email_idx",
+            ),
+        ),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import Q
+from django.db.models.functions import Lower
 from common.models import TimeStampedModel, SoftDeleteModel
 from django.utils.translation import gettext_lazy as _
 
@@ -39,20 +41,24 @@ class Customer(TimeStampedModel, SoftDeleteModel):
         null=True,
         help_text=_("Physical address of the customer."),
     )
-    # --- Status Field ---
-    is_active = models.BooleanField(
-        _("active status"),
-        default=True,
-        help_text=_(
-            "Designates whether this customer is active. "
-            "Unselect this instead of deleting customers to preserve data integrity."
-        ),
+    # --- Status Field (is_active, from SoftDeleteModel) ---
+    is_active_verbose_name = _("active status")
+    is_active_help_text = _(
+        "Designates whether this customer is active. "
+        "Unselect this instead of deleting customers to preserve data integrity."
     )
 
     class Meta:
         verbose_name = _("customer")
         verbose_name_plural = _("customers")
         ordering = ['name']
+        indexes = [
+            # Case-insensitive prefix search (see common.services.prefix_search).
+            # Partial, so they only cover live customers and stay small as
+            # deactivated ones accumulate.
+            models.Index(Lower('name'), condition=Q(is_active=True), name='customer_active_name_idx'),
+            models.Index(Lower('email'), condition=Q(is_active=True), name='customer_active_email_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -60,4 +66,72 @@ class Customer(TimeStampedModel, SoftDeleteModel):
     @property
     def is_inactive(self):
         """Check if the customer is inactive."""
-        return not self.is_active
\ No newline at end of file
+        return not self.is_active
+
+class CustomerStats(models.Model):
+    """
+    Denormalized financial summary for a customer.
+    Maintained incrementally by the billing and payment services so that
+    list, detail and admin pages never need per-row aggregates.
+    """
+    customer = models.OneToOneField(
+        Customer,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name=_("Customer"),
+    )
+    # --- Counters ---
+    invoice_count = models.PositiveIntegerField(
+        _("invoice count"),
+        default=0,
+    )
+
+    lifetime_billed = models.DecimalField(
+        _("lifetime billed"),
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        help_text=_("Sum of all non-cancelled invoice totals."),
+    )
+
+    lifetime_paid = models.DecimalField(
+        _("lifetime paid"),
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        help_text=_("Sum of all payments received."),
+    )
+
+    outstanding = models.DecimalField(
+        _("outstanding"),
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        help_text=_("Lifetime billed minus lifetime paid."),
+    )
+    # --- Activity Dates ---
+    last_invoice_at = models.DateField(
+        _("last invoice date"),
+        null=True,
+        blank=True,
+    )
+
+    last_payment_at = models.DateTimeField(
+        _("last payment date"),
+        null=True,
+        blank=True,
+    )
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("customer statistics")
+        verbose_name_plural = _("customer statistics")
+        indexes = [
+            # Top-customer reports read the N largest payers directly
+            models.Index(fields=['-lifetime_paid'], name='customer_stats_paid_idx'),
+        ]
+
+    def __str__(self):
+        return f"Stats for {self.customer}"
@@ -1,8 +1,20 @@
 # customers/services.py
 
+import csv
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth.base_user import BaseUserManager
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+
 from django.db import transaction
+from django.db.models import Count, DateField, DateTimeField, F, Max, Q, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
-from .models import Customer
+from common.services import apply_bulk_updates, find_duplicates, iter_import_rows
+from .models import Customer, CustomerStats
 
 @transaction.atomic
 def deactivate_customer(customer_id: int) -> Customer:
@@ -11,8 +23,304 @@ def deactivate_customer(customer_id: int) -> Customer:
     """
     try:
         customer = Customer.objects.get(pk=customer_id)
-        customer.is_active = False
-        customer.save()
+        customer.deactivate()
         return customer
     except Customer.DoesNotExist:
         raise ValueError(_("Customer with ID %(id)s does not exist.") % {'id': customer_id})
+
+
+# --- Bulk Customer Services ---
+
+@transaction.atomic
+def bulk_create_customers(rows: list, batch_size: int = 500) -> list:
+    """
+    Creates customers from a list of field dicts with one uniqueness query and
+    batched INSERTs. Raises ValueError if an email is repeated or taken.
+    """
+    emails = [row['email'] for row in rows]
+    taken = find_duplicates(emails) | set(Customer.objects.filter(email__in=emails).values_list('email', flat=True))
+    if taken:
+        raise ValueError(_("Email addresses already in use: %(emails)s.") % {'emails': ', '.join(sorted(taken))})
+    return Customer.objects.bulk_create([Customer(**row) for row in rows], batch_size=batch_size)
+
+
+@transaction.atomic
+def bulk_update_customers(rows: list, batch_size: int = 500) -> list:
+    """
+    Applies partial updates (dicts with an 'id' key) to many customers with
+    one read and batched UPDATEs. Raises ValueError on unknown ids or emails
+    that belong to another customer.
+    """
+    emails = {row['email']: row['id'] for row in rows if 'email' in row}
+    taken = find_duplicates(row.get('email') for row in rows) | {
+        email for email, pk in Customer.objects.filter(email__in=emails).values_list('email', 'pk')
+        if emails[email] != pk
+    }
+    if taken:
+        raise ValueError(_("Email addresses already in use: %(emails)s.") % {'emails': ', '.join(sorted(taken))})
+    return apply_bulk_updates(Customer.objects.all(), rows, ('name', 'email', 'phone', 'address'), batch_size)
+
+
+# --- Customer Statistics Services ---
+
+def apply_customer_stats_delta(
+    customer_id: int,
+    invoices: int = 0,
+    billed: Decimal = Decimal('0.00'),
+    paid: Decimal = Decimal('0.00'),
+    invoice_date=None,
+    payment_date=None,
+) -> None:
+    """
+    Incrementally adjusts the CustomerStats row for a customer.
+
+    Uses a single UPDATE with F() expressions so concurrent writers never
+    lose increments. The row is created on first use.
+    """
+    updates = {
+        'invoice_count': F('invoice_count') + invoices,
+        'lifetime_billed': F('lifetime_billed') + billed,
+        'lifetime_paid': F('lifetime_paid') + paid,
+        'outstanding': F('outstanding') + billed - paid,
+        'updated_at': timezone.now(),
+    }
+    if invoice_date is not None:
+        invoice_date = Value(invoice_date, output_field=DateField())
+        updates['last_invoice_at'] = Greatest(Coalesce('last_invoice_at', invoice_date), invoice_date)
+    if payment_date is not None:
+        payment_date = Value(payment_date, output_field=DateTimeField())
+        updates['last_payment_at'] = Greatest(Coalesce('last_payment_at', payment_date), payment_date)
+
+    with transaction.atomic():
+        if CustomerStats.objects.filter(customer_id=customer_id).update(**updates):
+            return
+        # First activity for this customer: create the row, then apply the delta
+        CustomerStats.objects.get_or_create(customer_id=customer_id)
+        CustomerStats.objects.filter(customer_id=customer_id).update(**updates)
+
+
+def record_invoice_issued(invoice) -> None:
+    """Counts a newly created invoice against its customer."""
+    apply_customer_stats_delta(invoice.customer_id, invoices=1, invoice_date=invoice.issued_at)
+
+
+def record_payment_received(customer_id: int, amount: Decimal, paid_at) -> None:
+    """Adds a newly recorded payment to its customer's lifetime totals."""
+    apply_customer_stats_delta(customer_id, paid=amount, payment_date=paid_at)
+
+
+def _merge_totals(totals: dict, customer_id: int, row: dict) -> None:
+    """Adds one aggregate row into ``totals[customer_id]``: counts and sums add up, dates keep the latest."""
+    merged = totals.setdefault(customer_id, {})
+    for key, value in row.items():
+        if value is None:
+            continue
+        if key.startswith('last_'):
+            merged[key] = max(merged[key], value) if merged.get(key) else value
+        else:
+            merged[key] = merged.get(key, 0) + value
+
+
+def refresh_customer_stats(customer_ids=None, batch_size: int = 1000) -> int:
+    """
+    Recomputes CustomerStats from scratch for the given customers, or for all
+    customers when no ids are given.
+
+    Works in batches of customer ids: each batch costs two grouped aggregate
+    queries and one upsert, regardless of how many invoices it covers.
+    Returns the number of stats rows written.
+    """
+    from apps.archive.models import ArchivedInvoice, ArchivedPayment  # Avoid circular import
+    from apps.billing.models import Invoice
+    from apps.payments.models import Payment
+
+    if customer_ids is None:
+        id_iter = Customer.objects.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=batch_size)
+    else:
+        id_iter = iter(sorted(set(customer_ids)))
+
+    written = 0
+    while True:
+        batch = list(islice(id_iter, batch_size))
+        if not batch:
+            break
+
+        invoice_totals, payment_totals = {}, {}
+        # Archived invoices and payments still count towards lifetime totals
+        for invoice_model, payment_model in ((Invoice, Payment), (ArchivedInvoice, ArchivedPayment)):
+            for row in (
+                invoice_model.objects
+                .filter(customer_id__in=batch)
+                .values('customer_id')
+                .annotate(
+                    count=Count('id'),
+                    billed=Sum('total_amount', filter=~Q(status=Invoice.Status.CANCELLED)),
+                    last_issued=Max('issued_at'),
+                )
+                .order_by()
+            ):
+                _merge_totals(invoice_totals, row.pop('customer_id'), row)
+            customer_field = 'invoice__customer_id' if payment_model is Payment else 'customer_id'
+            for row in (
+                payment_model.objects
+                .filter(**{f'{customer_field}__in': batch})
+                .values(customer_field)
+                .annotate(paid=Sum('amount'), last_paid=Max('paid_at'))
+                .order_by()
+            ):
+                _merge_totals(payment_totals, row.pop(customer_field), row)
+
+        now = timezone.now()
+        rows = []
+        for pk in batch:
+            inv = invoice_totals.get(pk, {})
+            pay = payment_totals.get(pk, {})
+            billed = inv.get('billed') or Decimal('0.00')
+            paid = pay.get('paid') or Decimal('0.00')
+            rows.append(CustomerStats(
+                customer_id=pk,
+                invoice_count=inv.get('count', 0),
+                lifetime_billed=billed,
+                lifetime_paid=paid,
+                outstanding=billed - paid,
+                last_invoice_at=inv.get('last_issued'),
+                last_payment_at=pay.get('last_paid'),
+                updated_at=now,
+            ))
+
+        CustomerStats.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['customer'],
+            update_fields=[
+                'invoice_count', 'lifetime_billed', 'lifetime_paid', 'outstanding',
+                'last_invoice_at', 'last_payment_at', 'updated_at',
+            ],
+        )
+        written += len(rows)
+
+    return written
+
+
+# --- Bulk Import Services ---
+
+IMPORT_FIELDS = ('name', 'email', 'phone', 'address')
+
+
+def _clean_import_row(row: dict) -> dict:
+    """
+    Validates and normalises a single import row without touching the database.
+    Raises ValidationError with a human readable message on bad input.
+    """
+    if '_error' in row:
+        raise ValidationError(row['_error'])
+
+    name = (row.get('name') or '').strip()
+    email = BaseUserManager.normalize_email((row.get('email') or '').strip())
+    phone = (row.get('phone') or '').strip() or None
+    address = (row.get('address') or '').strip() or None
+
+    if not name:
+        raise ValidationError(_("Name is required."))
+    if len(name) > Customer._meta.get_field('name').max_length:
+        raise ValidationError(_("Name is too long."))
+    if not email:
+        raise ValidationError(_("Email is required."))
+    validate_email(email)
+    if len(email) > Customer._meta.get_field('email').max_length:
+        raise ValidationError(_("Email is too long."))
+    if phone and len(phone) > Customer._meta.get_field('phone').max_length:
+        raise ValidationError(_("Phone number is too long."))
+
+    return {'name': name, 'email': email, 'phone': phone, 'address': address}
+
+
+def _flush_customer_chunk(chunk: list) -> None:
+    """Upserts one chunk of validated customers keyed on the unique email."""
+    with transaction.atomic():
+        Customer.objects.bulk_create(
+            chunk,
+            update_conflicts=True,
+            unique_fields=['email'],
+            update_fields=['name', 'phone', 'address', 'updated_at'],
+        )
+
+
+def import_customers(
+    stream,
+    fmt: str = 'csv',
+    reject_stream=None,
+    update_existing: bool = True,
+    chunk_size: int = 2000,
+    dry_run: bool = False,
+) -> dict:
+    """
+    Streams customers from a CSV or JSON-lines source into the database.
+
+    Rows are validated one at a time and deduplicated on email against a set
+    of existing emails loaded once up front, so no per-row queries are issued.
+    Valid rows are upserted in chunks with bulk_create(update_conflicts=True).
+    Rejected rows are written to ``reject_stream`` as CSV together with the
+    reason, if one is given.
+
+    Args:
+        stream: A text stream with the source data.
+        fmt: Either 'csv' or 'ndjson'.
+        reject_stream: Optional writable text stream for rejected rows.
+        update_existing: Update customers whose email already exists instead
+                         of rejecting the row.
+        chunk_size: Number of customers written per INSERT statement.
+        dry_run: Validate only; do not write anything.
+
+    Returns:
+        A dict with 'created', 'updated' and 'rejected' counts.
+    """
+    existing_emails = set(
+        Customer.objects.values_list('email', flat=True).iterator(chunk_size=10000)
+    )
+    seen_emails = set()
+
+    reject_writer = None
+    if reject_stream is not None:
+        reject_writer = csv.writer(reject_stream)
+        reject_writer.writerow(['line', 'error', *IMPORT_FIELDS])
+
+    counts = {'created': 0, 'updated': 0, 'rejected': 0}
+    chunk = []
+
+    def reject(line_number, row, message):
+        counts['rejected'] += 1
+        if reject_writer is not None:
+            reject_writer.writerow([line_number, message, *(row.get(f, '') for f in IMPORT_FIELDS)])
+
+    for line_number, row in iter_import_rows(stream, fmt):
+        try:
+            data = _clean_import_row(row)
+        except ValidationError as e:
+            reject(line_number, row, '; '.join(e.messages))
+            continue
+
+        email = data['email']
+        if email in seen_emails:
+            reject(line_number, row, _("Duplicate email in import file."))
+            continue
+        seen_emails.add(email)
+
+        if email in existing_emails:
+            if not update_existing:
+                reject(line_number, row, _("A customer with this email already exists."))
+                continue
+            counts['updated'] += 1
+        else:
+            counts['created'] += 1
+
+        chunk.append(Customer(**data))
+        if len(chunk) >= chunk_size:
+            if not dry_run:
+                _flush_customer_chunk(chunk)
+            chunk = []
+
+    if chunk and not dry_run:
+        _flush_customer_chunk(chunk)
+
+    return counts
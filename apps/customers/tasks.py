@@ -0,0 +1,11 @@
+# customers/tasks.py
+"""Background jobs for customer bookkeeping (see common.jobs)."""
+from common.jobs.services import job
+
+from .services import refresh_customer_stats
+
+
+@job('customers.refresh_stats')
+def refresh_stats(customer_ids: list = None):
+    """Recomputes CustomerStats for the given customers, or for everyone; queue it with a unique_key."""
+    refresh_customer_stats(customer_ids)
@@ -1,3 +1,150 @@
-from django.test import TestCase
+import csv
+import datetime
+import io
+from decimal import Decimal
+from types import SimpleNamespace
 
-# Create your tests here.
+from django.contrib.admin.sites import site
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from apps.accounts.models import User
+from apps.billing.models import Invoice
+from apps.billing.services import add_invoice_item, cancel_invoice, create_invoice
+from apps.catalog.models import Product
+from apps.payments.services import record_payment
+
+from .models import Customer, CustomerStats
+from .services import import_customers, refresh_customer_stats
+
+STATS_FIELDS = (
+    'invoice_count', 'lifetime_billed', 'lifetime_paid', 'outstanding', 'last_invoice_at', 'last_payment_at',
+)
+
+
+@override_settings(CATALOG_CACHE_ALIAS='default', CATALOG_CACHE_VERSION_CHECK=0)
+class CustomerStatsTests(TestCase):
+    """The incremental updates must leave the same stats as a rebuild from scratch."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('staff@example.com', 'secret', is_staff=True)
+        cls.product = Product.objects.create(name='Widget', unit_price=Decimal('10.00'))
+        cls.customer = Customer.objects.create(name='Customer', email='customer@example.com')
+        cls.other = Customer.objects.create(name='Other', email='other@example.com')
+
+    def invoice(self, quantity=2):
+        invoice = create_invoice(self.customer.pk, self.user, datetime.date(2030, 1, 1))
+        add_invoice_item(invoice, self.product.pk, quantity)
+        invoice.refresh_from_db()
+        return invoice
+
+    def stats(self):
+        rows = CustomerStats.objects.order_by('customer_id').values_list('customer_id', *STATS_FIELDS)
+        # A rebuild also writes a row of zeros for customers without any activity
+        return [row for row in rows if any(row[1:])]
+
+    def assertStatsMatchRebuild(self):
+        incremental = self.stats()
+        refresh_customer_stats()
+        self.assertEqual(incremental, self.stats())
+
+    def test_creating_an_invoice(self):
+        invoice = self.invoice()
+        self.assertEqual(CustomerStats.objects.get(customer=self.customer).lifetime_billed, invoice.total_amount)
+        self.assertStatsMatchRebuild()
+
+    def test_editing_an_item(self):
+        item = self.invoice().items.get()
+        item.quantity = 5
+        item.save()
+        self.assertStatsMatchRebuild()
+
+    def test_payments(self):
+        invoice = self.invoice()
+        record_payment(invoice.pk, Decimal('5.00'), 'cash', notes='')
+        record_payment(invoice.pk, invoice.total_amount - Decimal('5.00'), 'cash', notes='')
+
+        stats = CustomerStats.objects.get(customer=self.customer)
+        self.assertEqual(stats.outstanding, Decimal('0.00'))
+        self.assertStatsMatchRebuild()
+
+    def test_cancelling(self):
+        self.invoice(1)
+        cancel_invoice(self.invoice(3))
+        self.assertStatsMatchRebuild()
+
+    def test_moving_an_invoice_to_another_customer_in_the_admin(self):
+        invoice = self.invoice()
+        invoice.customer = self.other
+        form = SimpleNamespace(changed_data=['customer'], initial={'customer': self.customer.pk})
+        request = RequestFactory().post('/')
+        request.user = self.user
+
+        site._registry[Invoice].save_model(request, invoice, form, change=True)
+        # Later increments land on top of the rebuilt rows
+        record_payment(invoice.pk, Decimal('4.00'), 'cash', notes='')
+
+        self.assertEqual(CustomerStats.objects.get(customer=self.customer).invoice_count, 0)
+        self.assertEqual(CustomerStats.objects.get(customer=self.other).lifetime_paid, Decimal('4.00'))
+        self.assertStatsMatchRebuild()
+
+
+class ImportCustomersTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Customer.objects.create(name='Old name', email='known@example.com')
+
+    def test_rows_are_deduplicated_and_rejected_with_a_reason(self):
+        source = io.StringIO(
+            "name,email,phone,address\n"
+            "New,new@example.com,,\n"
+            "Again,new@example.com,,\n"
+            "Known,known@example.com,555,\n"
+            ",nameless@example.com,,\n"
+            "Broken,not-an-email,,\n"
+        )
+        rejects = io.StringIO()
+
+        counts = import_customers(source, reject_stream=rejects)
+
+        self.assertEqual(counts, {'created': 1, 'updated': 1, 'rejected': 3})
+        self.assertEqual(Customer.objects.get(email='new@example.com').name, 'New')
+        self.assertEqual(Customer.objects.get(email='known@example.com').name, 'Known')
+        rejected = list(csv.DictReader(io.StringIO(rejects.getvalue())))
+        self.assertEqual([row['line'] for row in rejected], ['3', '5', '6'])
+        self.assertEqual(rejected[0]['error'], 'Duplicate email in import file.')
+
+    def test_existing_emails_can_be_refused(self):
+        source = io.StringIO('{"name": "Known", "email": "known@example.com"}\n')
+        counts = import_customers(source, fmt='ndjson', update_existing=False)
+        self.assertEqual(counts, {'created': 0, 'updated': 0, 'rejected': 1})
+        self.assertEqual(Customer.objects.get().name, 'Old name')
+
+
+class CustomerAutocompleteTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('staff@example.com', 'secret', is_staff=True)
+        Customer.objects.create(name='Émile Zola', email='zola@example.com')
+        Customer.objects.create(name='Emma Stone', email='stone@example.com')
+        Customer.objects.create(name='Zelda', email='emerald@example.com', is_active=False)
+
+    def setUp(self):
+        cache.clear()  # Results are cached per term
+        self.client.force_login(self.user)
+
+    def search(self, term):
+        response = self.client.get(reverse('customer-autocomplete'), {'q': term})
+        return sorted(result['text'] for result in response.json()['results'])
+
+    def test_prefix_matches_name_or_email_ignoring_case(self):
+        self.assertEqual(self.search('em'), ['Emma Stone (stone@example.com)'])
+        self.assertEqual(self.search('ZO'), ['Émile Zola (zola@example.com)'])
+        self.assertEqual(self.search('mma'), [])
+
+    def test_non_ascii_letters_match_in_the_stored_case(self):
+        self.assertEqual(self.search('Ém'), ['Émile Zola (zola@example.com)'])
@@ -5,6 +5,8 @@ from . import views
 urlpatterns = [
     path('', views.CustomerListView.as_view(), name='customer-list'),
     path('<int:pk>/', views.CustomerDetailView.as_view(), name='customer-detail'),
+    path('autocomplete/', views.customer_autocomplete, name='customer-autocomplete'),
+    path('<int:pk>/statement/', views.customer_statement_pdf, name='customer-statement'),
     path('new/', views.CustomerCreateView.as_view(), name='customer-create'),
     path('<int:pk>/edit/', views.CustomerUpdateView.as_view(), name='customer-update'),
     path('<int:pk>/delete/', views.CustomerDeleteView.as_view(), name='customer-delete'),
@@ -1,11 +1,18 @@
 # customers/views.py
+from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
+import tempfile
+
+from django.http import FileResponse, HttpResponseBadRequest, JsonResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.utils import timezone
 from django.urls import reverse_lazy
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 
 from .models import Customer
-from .forms import CustomerForm
+from .forms import CustomerForm, StatementForm
+from common.services import cached_autocomplete, prefix_search
 
 class CustomerListView(LoginRequiredMixin, ListView):
     model = Customer
@@ -13,10 +20,25 @@ class CustomerListView(LoginRequiredMixin, ListView):
     context_object_name = 'customers'
     paginate_by = 20
 
+    def get_queryset(self):
+        # Deactivated customers are hidden unless explicitly requested
+        manager = Customer.objects if self.request.GET.get('show_inactive') else Customer.active
+        # Financial summaries come from the stats table in the same query
+        return manager.select_related('stats')
+
 class CustomerDetailView(LoginRequiredMixin, DetailView):
     model = Customer
     template_name = 'customers/customer_detail.html'
     context_object_name = 'customer'
+    queryset = Customer.objects.select_related('stats')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['stats'] = getattr(self.object, 'stats', None)
+        context['recent_invoices'] = self.object.invoices.order_by('-issued_at', '-pk')[:10]
+        today = timezone.localdate()
+        context['statement_form'] = StatementForm(initial={'start_date': today.replace(day=1), 'end_date': today})
+        return context
 
 class CustomerCreateView(LoginRequiredMixin, CreateView):
     model = Customer
@@ -45,8 +67,44 @@ class CustomerDeleteView(LoginRequiredMixin, DeleteView):
     context_object_name = 'customer'
 
     def form_valid(self, form):
-        messages.success(self.request, "Customer deactivated successfully.")
         # Instead of deleting, we perform a soft delete
-        self.object.is_active = False
-        self.object.save()
-        return super().form_valid(form)
\ No newline at end of file
+        self.object.deactivate()
+        messages.success(self.request, "Customer deactivated successfully.")
+        return redirect(self.get_success_url())
+
+@login_required
+def customer_autocomplete(request):
+    """Returns active customers whose name or email starts with ?q= as JSON."""
+    term = request.GET.get('q', '')
+    if not term.strip():
+        return JsonResponse({'results': []})
+
+    def build_results(term):
+        matches = prefix_search(Customer.active.only('name', 'email'), ['name', 'email'], term)
+        return [{'id': c.pk, 'text': f"{c.name} ({c.email})"} for c in matches]
+
+    return JsonResponse({'results': cached_autocomplete('customer', term, build_results)})
+
+
+@login_required
+def customer_statement_pdf(request, pk):
+    """Streams a statement of account PDF for the requested date range."""
+    from apps.billing.utils import generate_customer_statement_pdf
+
+    customer = get_object_or_404(Customer, pk=pk)
+    today = timezone.localdate()
+    form = StatementForm(request.GET or {'start_date': today.replace(day=1), 'end_date': today})
+    if not form.is_valid():
+        return HttpResponseBadRequest(form.errors.as_text())
+    start_date, end_date = form.cleaned_data['start_date'], form.cleaned_data['end_date']
+
+    # Large statements spill to disk instead of being held in memory
+    output = tempfile.SpooledTemporaryFile(max_size=5 * 1024 * 1024)
+    generate_customer_statement_pdf(customer, start_date, end_date, output)
+    output.seek(0)
+    return FileResponse(
+        output,
+        as_attachment=True,
+        filename=f"Statement_{customer.pk}_{start_date:%Y%m%d}_{end_date:%Y%m%d}.pdf",
+        content_type='application/pdf',
+    )
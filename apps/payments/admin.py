@@ -6,6 +6,7 @@ from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
 from .models import Payment
+from apps.customers.services import refresh_customer_stats
 
 
 @admin.register(Payment)
@@ -27,4 +28,14 @@ class PaymentAdmin(admin.ModelAdmin):
             return format_html('<a href="{}">{}</a>', url, obj.invoice.invoice_number)
         return "-"
     invoice_link.short_description = _('Invoice')
-    invoice_link.admin_order_field = 'invoice__invoice_number'
\ No newline at end of file
+    invoice_link.admin_order_field = 'invoice__invoice_number'
+
+    def save_model(self, request, obj, form, change):
+        """Keep the customer's statistics in line with manual payment edits."""
+        super().save_model(request, obj, form, change)
+        refresh_customer_stats([obj.invoice.customer_id])
+
+    def delete_model(self, request, obj):
+        customer_id = obj.invoice.customer_id
+        super().delete_model(request, obj)
+        refresh_customer_stats([customer_id])
\ No newline at end of file
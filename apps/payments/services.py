@@ -7,7 +7,12 @@ from django.utils.translation import gettext_lazy as _
 
 from .models import Payment
 from apps.billing.models import Invoice
+from apps.billing.services import settle_invoices
+from apps.customers.services import record_payment_received
+from common.services import find_duplicates
 from django.db import models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.core.exceptions import ValidationError
 
 
@@ -66,17 +71,95 @@ def record_payment(
         transaction_id=transaction_id,
         notes=notes
     )
+    record_payment_received(invoice.customer_id, payment.amount, payment.paid_at)
 
     # --- Side Effect: Update Invoice Status ---
     # After payment is recorded, check if the invoice is now fully paid.
     new_balance = get_balance_due(invoice)
-    if new_balance <= 0 and invoice.status != Invoice.Status.PAID:
-        # Use a direct update to avoid triggering model save() side effects
-        Invoice.objects.filter(pk=invoice.id).update(status=Invoice.Status.PAID)
+    if new_balance <= 0:
+        # A conditional update, so reserved stock becomes a real deduction only once
+        settle_invoices([invoice.pk])
 
     return payment
 
 
+@transaction.atomic
+def bulk_record_payments(entries: list) -> list:
+    """
+    Records many payments at once. Each entry is a dict with 'invoice_id',
+    'amount', 'method' and optional 'paid_at', 'transaction_id' and 'notes'.
+
+    The invoices are locked and their paid totals read with one query,
+    payments are inserted with bulk_create, customer totals are adjusted once
+    per customer, and invoices that become fully paid are flipped with a
+    single conditional UPDATE before their stock reservations are consumed
+    together (see settle_invoices).
+
+    Raises:
+        ValueError: On unknown or cancelled invoices or duplicate transaction IDs.
+        ValidationError: If the payments would overpay an invoice.
+    """
+    paid_so_far = (
+        Payment.objects.filter(invoice=OuterRef('pk'))
+        .values('invoice').annotate(total=Sum('amount')).values('total')
+    )
+    invoices = (
+        Invoice.objects.select_for_update()
+        .annotate(paid_total=Coalesce(Subquery(paid_so_far), Decimal('0.00')))
+        .in_bulk({entry['invoice_id'] for entry in entries})
+    )
+
+    missing = {entry['invoice_id'] for entry in entries} - set(invoices)
+    if missing:
+        raise ValueError(_("Invoices do not exist: %(ids)s.") % {'ids': ', '.join(map(str, sorted(missing)))})
+
+    transaction_ids = [entry.get('transaction_id') for entry in entries]
+    taken = find_duplicates(transaction_ids) | set(
+        Payment.objects.filter(transaction_id__in=[t for t in transaction_ids if t])
+        .values_list('transaction_id', flat=True)
+    )
+    if taken:
+        raise ValueError(_("Transaction IDs already recorded: %(ids)s.") % {'ids': ', '.join(sorted(taken))})
+
+    paid = {pk: invoice.paid_total for pk, invoice in invoices.items()}
+    payments = []
+    for entry in entries:
+        invoice = invoices[entry['invoice_id']]
+        if invoice.status == Invoice.Status.CANCELLED:
+            raise ValueError(_("Cannot record a payment for a cancelled invoice."))
+        if paid[invoice.pk] + entry['amount'] > invoice.total_amount:
+            raise ValidationError(
+                _('Payment amount of %(amount)s exceeds the outstanding balance of %(balance)s.') %
+                {'amount': entry['amount'], 'balance': invoice.total_amount - paid[invoice.pk]}
+            )
+        paid[invoice.pk] += entry['amount']
+        payments.append(Payment(
+            invoice=invoice,
+            amount=entry['amount'],
+            method=entry['method'],
+            paid_at=entry.get('paid_at') or timezone.now(),
+            transaction_id=entry.get('transaction_id') or None,
+            notes=entry.get('notes') or '',
+        ))
+    Payment.objects.bulk_create(payments)
+
+    per_customer = {}
+    for payment in payments:
+        customer_id = payment.invoice.customer_id
+        amount, last = per_customer.get(customer_id, (Decimal('0.00'), payment.paid_at))
+        per_customer[customer_id] = (amount + payment.amount, max(last, payment.paid_at))
+    for customer_id, (amount, last) in per_customer.items():
+        record_payment_received(customer_id, amount, last)
+
+    settled_ids = [
+        pk for pk, invoice in invoices.items()
+        if paid[pk] >= invoice.total_amount and invoice.status != Invoice.Status.PAID
+    ]
+    if settled_ids:
+        settle_invoices(settled_ids)
+    return payments
+
+
 # --- Information & Query Services ---
 
 def get_total_paid(invoice: Invoice) -> Decimal:
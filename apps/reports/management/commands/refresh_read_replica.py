@@ -0,0 +1,53 @@
+import os
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+
+def refresh_sqlite_replica(alias: str) -> Path:
+    """
+    Copies the primary SQLite database to the replica with the online backup
+    API (writers are not blocked in WAL mode), then swaps the copy into place
+    atomically so readers never see a half-written file.
+    """
+    source = settings.DATABASES[DEFAULT_DB_ALIAS]['NAME']
+    target = Path(settings.DATABASES[alias]['NAME'])
+    partial = target.with_name(f"{target.name}.partial")
+    with closing(sqlite3.connect(source)) as src, closing(sqlite3.connect(partial)) as dst:
+        src.backup(dst)
+        # A read-only copy needs no WAL or shared-memory files
+        dst.execute('PRAGMA journal_mode=DELETE')
+    os.replace(partial, target)
+    return target
+
+
+class Command(BaseCommand):
+    help = "Refreshes the SQLite reporting replica from the primary database, once or every N seconds."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--every', type=float,
+            help="Keep running and refresh every this many seconds; should stay well "
+                 "under REPLICA_MAX_STALENESS.",
+        )
+
+    def handle(self, *args, **options):
+        alias = settings.REPORTING_DATABASE
+        if not alias or alias not in settings.DATABASES:
+            raise CommandError("No REPORTING_DATABASE is configured.")
+        for name in (DEFAULT_DB_ALIAS, alias):
+            if settings.DATABASES[name]['ENGINE'] != 'django.db.backends.sqlite3':
+                raise CommandError("Only SQLite replicas are refreshed by copying; use the server's replication.")
+
+        while True:
+            started = time.perf_counter()
+            target = refresh_sqlite_replica(alias)
+            self.stdout.write(f"Refreshed {target} in {time.perf_counter() - started:.2f}s.")
+            if not options['every']:
+                return
+            time.sleep(max(0.0, options['every'] - (time.perf_counter() - started)))
@@ -1,27 +1,64 @@
+import heapq
+from decimal import Decimal
+
 from django.db.models import Sum, Count, F
 from django.db.models.functions import TruncMonth
 from django.utils import timezone
 from datetime import timedelta
 
+from apps.archive.models import ArchivedInvoice, ArchivedPayment
+from apps.archive.services import cached_archive_horizon
 from apps.billing.models import Invoice
 from apps.payments.models import Payment
+from apps.customers.models import CustomerStats
+from common.db_routers import reporting_alias
+
+
+def _reads(model):
+    """Report queries read from the reporting replica when it is fresh enough (see common.db_routers)."""
+    return model.objects.using(reporting_alias())
+
+
+def _needs_archive(start_date=None) -> bool:
+    """
+    Whether a report period starting at ``start_date`` (all time when None)
+    reaches back into archived invoices and payments (see apps.archive).
+    Recent periods never do, and skip the archive tables altogether.
+    """
+    horizon = cached_archive_horizon(using=reporting_alias())
+    return horizon is not None and (start_date is None or start_date <= horizon)
 
 
-def get_monthly_revenue(years: int = 2):
+def get_monthly_revenue(years: int = 2) -> list:
     """
-    Returns a queryset of monthly revenue for the last N years.
+    Returns monthly revenue for the last N years as a list of
+    ``{'month', 'revenue'}`` rows in month order.
     """
     start_date = timezone.now().date() - timedelta(days=365 * years)
     
     revenue = (
-        Payment.objects
+        _reads(Payment)
+        .filter(paid_at__date__gte=start_date, invoice__status=Invoice.Status.PAID)
+        .annotate(month=TruncMonth('paid_at'))
+        .values('month')
+        .annotate(revenue=Sum('amount'))
+        .order_by('month')
+    )
+    if not _needs_archive(start_date):
+        return list(revenue)
+
+    archived = (
+        _reads(ArchivedPayment)
         .filter(paid_at__date__gte=start_date, invoice__status=Invoice.Status.PAID)
         .annotate(month=TruncMonth('paid_at'))
         .values('month')
         .annotate(revenue=Sum('amount'))
         .order_by('month')
     )
-    return revenue
+    months = {}
+    for row in [*archived, *revenue]:
+        months[row['month']] = months.get(row['month'], 0) + row['revenue']
+    return [{'month': month, 'revenue': months[month]} for month in sorted(months)]
 
 
 def get_total_due():
@@ -29,7 +66,7 @@ def get_total_due():
     Calculates the total outstanding balance across all active (non-paid, non-cancelled) invoices.
     """
     total_due = (
-        Invoice.objects
+        _reads(Invoice)
         .exclude(status__in=[Invoice.Status.PAID, Invoice.Status.CANCELLED])
         .annotate(
             balance=F('total_amount') - Sum('payments__amount')
@@ -44,24 +81,165 @@ def get_invoice_status_counts():
     Returns a breakdown of invoice counts by their status.
     """
     counts = (
-        Invoice.objects
+        _reads(Invoice)
         .values('status')
         .annotate(count=Count('id'))
         .order_by('status')
     )
     # Convert to a more usable dictionary format
-    return {item['status']: item['count'] for item in counts}
+    result = {item['status']: item['count'] for item in counts}
+    if _needs_archive():
+        for item in _reads(ArchivedInvoice).values('status').annotate(count=Count('id')).order_by():
+            result[item['status']] = result.get(item['status'], 0) + item['count']
+        result = dict(sorted(result.items()))
+    return result
 
 
 def get_top_customers(limit: int = 5):
     """
     Returns the top N customers by total amount paid.
+    Reads the denormalized CustomerStats table, so no payments are scanned.
     """
     top_customers = (
-        Invoice.objects
-        .values('customer__name', 'customer__id')
-        .annotate(total_spent=Sum('payments__amount'))
-        .filter(total_spent__isnull=False) # Exclude customers who haven't paid anything
-        .order_by('-total_spent')[:limit]
+        _reads(CustomerStats)
+        .filter(lifetime_paid__gt=0) # Exclude customers who haven't paid anything
+        .order_by('-lifetime_paid')
+        .values('customer__name', 'customer__id', total_spent=F('lifetime_paid'))[:limit]
+    )
+    return top_customers
+
+
+# --- Customer Statement ---
+
+# Invoices that were never sent (or were voided) do not appear on statements
+STATEMENT_EXCLUDED_STATUSES = [Invoice.Status.DRAFT, Invoice.Status.CANCELLED]
+
+
+def get_statement_opening_balance(customer_id: int, start_date) -> Decimal:
+    """
+    Returns what the customer owed at the start of a statement period:
+    everything invoiced before ``start_date`` minus everything paid before it.
+    """
+    billed = (
+        _reads(Invoice)
+        .filter(customer_id=customer_id, issued_at__lt=start_date)
+        .exclude(status__in=STATEMENT_EXCLUDED_STATUSES)
+        .aggregate(total=Sum('total_amount'))['total']
+    ) or Decimal('0.00')
+    paid = (
+        _reads(Payment)
+        .filter(invoice__customer_id=customer_id, paid_at__date__lt=start_date)
+        .aggregate(total=Sum('amount'))['total']
+    ) or Decimal('0.00')
+    # Everything before the period counts, so archived history always does
+    if _needs_archive():
+        billed += (
+            _reads(ArchivedInvoice)
+            .filter(customer_id=customer_id, issued_at__lt=start_date)
+            .exclude(status__in=STATEMENT_EXCLUDED_STATUSES)
+            .aggregate(total=Sum('total_amount'))['total']
+        ) or Decimal('0.00')
+        paid += (
+            _reads(ArchivedPayment)
+            .filter(customer_id=customer_id, paid_at__date__lt=start_date)
+            .aggregate(total=Sum('amount'))['total']
+        ) or Decimal('0.00')
+    return billed - paid
+
+
+def iter_customer_statement(customer_id: int, start_date, end_date, opening_balance: Decimal = Decimal('0.00')):
+    """
+    Yields the lines of a customer statement in date order, each with the
+    running balance after it.
+
+    Invoices and payments are read with one ordered query each, streamed in
+    chunks and merged in a single pass, so memory use does not grow with the
+    number of invoices on the statement.
+    """
+    invoices = (
+        _reads(Invoice)
+        .filter(customer_id=customer_id, issued_at__gte=start_date, issued_at__lte=end_date)
+        .exclude(status__in=STATEMENT_EXCLUDED_STATUSES)
+        .order_by('issued_at', 'pk')
+        .values_list('issued_at', 'pk', 'invoice_number', 'total_amount', 'due_at')
+        .iterator(chunk_size=2000)
+    )
+    payments = (
+        _reads(Payment)
+        .filter(invoice__customer_id=customer_id, paid_at__date__gte=start_date, paid_at__date__lte=end_date)
+        .order_by('paid_at', 'pk')
+        .values_list('paid_at', 'pk', 'invoice__invoice_number', 'amount', 'method')
+        .iterator(chunk_size=2000)
+    )
+
+    if _needs_archive(start_date):
+        archived_invoices = (
+            _reads(ArchivedInvoice)
+            .filter(customer_id=customer_id, issued_at__gte=start_date, issued_at__lte=end_date)
+            .exclude(status__in=STATEMENT_EXCLUDED_STATUSES)
+            .order_by('issued_at', 'pk')
+            .values_list('issued_at', 'pk', 'invoice_number', 'total_amount', 'due_at')
+            .iterator(chunk_size=2000)
+        )
+        archived_payments = (
+            _reads(ArchivedPayment)
+            .filter(customer_id=customer_id, paid_at__date__gte=start_date, paid_at__date__lte=end_date)
+            .order_by('paid_at', 'pk')
+            .values_list('paid_at', 'pk', 'invoice__invoice_number', 'amount', 'method')
+            .iterator(chunk_size=2000)
+        )
+        # Both sides are in (date, pk) order, so the merged streams are too
+        invoices = heapq.merge(archived_invoices, invoices, key=lambda row: (row[0], row[1]))
+        payments = heapq.merge(archived_payments, payments, key=lambda row: (row[0], row[1]))
+
+    invoice_lines = (
+        {
+            'date': issued_at,
+            'kind': 'invoice',
+            'reference': number,
+            'description': f"Due {due_at:%Y-%m-%d}",
+            'debit': total,
+            'credit': None,
+        }
+        for issued_at, pk, number, total, due_at in invoices
+    )
+    payment_lines = (
+        {
+            'date': timezone.localdate(paid_at),
+            'kind': 'payment',
+            'reference': number,
+            'description': method.replace('_', ' ').title(),
+            'debit': None,
+            'credit': amount,
+        }
+        for paid_at, pk, number, amount, method in payments
+    )
+
+    balance = opening_balance
+    # On the same day invoices come before the payments made against them
+    for line in heapq.merge(invoice_lines, payment_lines, key=lambda line: (line['date'], line['kind'] == 'payment')):
+        balance += (line['debit'] or 0) - (line['credit'] or 0)
+        line['balance'] = balance
+        yield line
+
+
+def get_statement_customer_ids(end_date) -> list:
+    """Returns the sorted ids of customers that have any statement activity up to ``end_date``."""
+    customer_ids = (
+        _reads(Invoice)
+        .filter(issued_at__lte=end_date)
+        .exclude(status__in=STATEMENT_EXCLUDED_STATUSES)
+        .order_by('customer_id')
+        .values_list('customer_id', flat=True)
+        .distinct()
+    )
+    if not _needs_archive():
+        return list(customer_ids)
+    archived = (
+        _reads(ArchivedInvoice)
+        .filter(issued_at__lte=end_date)
+        .exclude(status__in=STATEMENT_EXCLUDED_STATUSES)
+        .values_list('customer_id', flat=True)
+        .distinct()
     )
-    return top_customers
\ No newline at end of file
+    return sorted(set(customer_ids).union(archived))
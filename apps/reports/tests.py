@@ -1,3 +1,56 @@
-from django.test import TestCase
+import datetime
+from decimal import Decimal
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.billing.models import Invoice
+from apps.customers.models import Customer
+from apps.payments.models import Payment
+
+from .services import get_statement_opening_balance, iter_customer_statement
+
+
+@override_settings(REPORTING_DATABASE=None)
+class CustomerStatementTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = Customer.objects.create(name='Customer', email='customer@example.com')
+
+        def invoice(issued_at, total, status=Invoice.Status.SENT):
+            return Invoice.objects.create(
+                customer=cls.customer, status=status, issued_at=issued_at,
+                due_at=issued_at + datetime.timedelta(days=30), total_amount=Decimal(total),
+            )
+
+        def payment(invoice, paid_at, amount):
+            paid_at = timezone.make_aware(datetime.datetime.combine(paid_at, datetime.time(12)))
+            Payment.objects.create(invoice=invoice, amount=Decimal(amount), paid_at=paid_at)
+
+        earlier = invoice(datetime.date(2024, 12, 20), '50.00')
+        payment(earlier, datetime.date(2024, 12, 28), '20.00')
+        cls.first = invoice(datetime.date(2025, 1, 5), '100.00')
+        cls.second = invoice(datetime.date(2025, 1, 12), '40.00')
+        invoice(datetime.date(2025, 1, 8), '999.00', status=Invoice.Status.DRAFT)
+        invoice(datetime.date(2025, 1, 9), '999.00', status=Invoice.Status.CANCELLED)
+        # Paid the same day it was issued: the invoice line comes first
+        payment(cls.second, datetime.date(2025, 1, 12), '40.00')
+        payment(cls.first, datetime.date(2025, 1, 10), '60.00')
+
+    def test_lines_carry_a_running_balance_from_the_opening_balance(self):
+        start, end = datetime.date(2025, 1, 1), datetime.date(2025, 1, 31)
+        opening = get_statement_opening_balance(self.customer.pk, start)
+        self.assertEqual(opening, Decimal('30.00'))
+
+        lines = list(iter_customer_statement(self.customer.pk, start, end, opening_balance=opening))
+
+        self.assertEqual(
+            [(line['kind'], line['reference'], line['balance']) for line in lines],
+            [
+                ('invoice', self.first.invoice_number, Decimal('130.00')),
+                ('payment', self.first.invoice_number, Decimal('70.00')),
+                ('invoice', self.second.invoice_number, Decimal('110.00')),
+                ('payment', self.second.invoice_number, Decimal('70.00')),
+            ],
+        )
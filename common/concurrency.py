@@ -0,0 +1,163 @@
+"""
+Helpers for running work off the request path without letting it pile up.
+"""
+import contextvars
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from functools import lru_cache
+from time import perf_counter
+
+from django.db import close_old_connections, connection, connections
+
+logger = logging.getLogger(__name__)
+
+
+class Overloaded(Exception):
+    """Raised when a ConcurrencyLimit is full; the caller should shed the request."""
+
+
+class ConcurrencyLimit:
+    """
+    Admits at most ``limit`` jobs at once and turns the rest away instead of
+    queueing them. A full pool then costs a fast 503 rather than a request
+    that waits behind everything already queued until it times out.
+
+    Usable from threads and event loops alike, as acquiring never blocks.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self):
+        with self._lock:
+            if self.in_flight >= self.limit:
+                raise Overloaded(f"{self.in_flight} jobs already running or queued")
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+class Unavailable:
+    """Stands in for a fan_out() result that failed or did not arrive in time. It is falsy."""
+
+    def __init__(self, reason: str):
+        self.reason = reason
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return f"<Unavailable: {self.reason}>"
+
+
+@lru_cache(maxsize=None)
+def _pool(workers: int) -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix='fan-out')
+
+
+class _RunningTasks:
+    """
+    The database connections of the fan_out() tasks currently running, so a
+    task that overruns its timeout can have its query interrupted and its
+    pool thread handed back instead of staying busy until the query ends.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connections = {}
+
+    def enter(self, name):
+        # Connection wrappers are per thread: collect this thread's own
+        with self._lock:
+            self._connections[name] = [connections[alias] for alias in connections]
+
+    def exit(self, name):
+        with self._lock:
+            self._connections.pop(name, None)
+
+    def interrupt(self, name) -> bool:
+        """Aborts the statement ``name`` is running, if any. Returns whether the task was still running."""
+        with self._lock:  # Held so the task cannot move on to other work meanwhile
+            wrappers = self._connections.get(name)
+            for wrapper in wrappers or ():
+                raw = wrapper.connection
+                if raw is None:
+                    continue
+                if wrapper.vendor == 'sqlite':
+                    raw.interrupt()
+                elif wrapper.vendor == 'postgresql':
+                    raw.cancel()
+            return wrappers is not None
+
+
+def _with_connection(func, name, running):
+    # Pool threads are long-lived, so treat each task like a request: drop a
+    # connection past its CONN_MAX_AGE or left broken, before and after
+    close_old_connections()
+    running.enter(name)
+    try:
+        return func()
+    finally:
+        running.exit(name)
+        close_old_connections()
+
+
+def fan_out(tasks: dict, timeout: float, workers: int) -> dict:
+    """
+    Runs independent, read-only callables concurrently and returns their
+    results by name, so the wall-clock time is that of the slowest rather
+    than the sum of all. Each callable must evaluate its queries itself
+    (return a list, not a lazy queryset).
+
+    Tasks run on a shared pool of ``workers`` threads, each with its own
+    database connection, in a copy of the caller's context (so
+    common.db_routers.reporting_reads() carries over). A task that raises,
+    or has not finished ``timeout`` seconds after the fan-out started, is
+    returned as an Unavailable instead; the others are unaffected. A task
+    still running then has its query interrupted (SQLite and PostgreSQL),
+    so a hung query cannot keep a pool thread from the next requests.
+
+    Tasks run one after another on the calling thread when ``workers`` is 0
+    or inside a transaction, whose uncommitted rows other connections
+    cannot see.
+    """
+    results = {}
+    if not workers or connection.in_atomic_block:
+        for name, func in tasks.items():
+            try:
+                results[name] = func()
+            except Exception as e:
+                logger.exception("%s failed", name)
+                results[name] = Unavailable(str(e))
+        return results
+
+    started = perf_counter()
+    pool = _pool(workers)
+    running = _RunningTasks()
+    futures = {
+        name: pool.submit(contextvars.copy_context().run, _with_connection, func, name, running)
+        for name, func in tasks.items()
+    }
+    wait(futures.values(), timeout=timeout)
+    for name, future in futures.items():
+        if not future.done():
+            if future.cancel():
+                logger.warning("%s did not start within %.1fs", name, timeout)
+            elif running.interrupt(name):
+                logger.warning("%s did not finish within %.1fs; interrupted its query", name, timeout)
+            results[name] = Unavailable("timed out")
+        elif future.exception() is not None:
+            logger.error("%s failed", name, exc_info=future.exception())
+            results[name] = Unavailable(str(future.exception()))
+        else:
+            results[name] = future.result()
+    logger.debug("Fanned out %d tasks in %.1f ms", len(tasks), (perf_counter() - started) * 1000)
+    return results
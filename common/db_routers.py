@@ -0,0 +1,111 @@
+# common/db_routers.py
+import os
+import time
+from contextlib import ContextDecorator, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# True inside reporting_reads(); reads then go to the reporting replica
+_reporting = ContextVar('reporting_reads', default=False)
+# True when the client wrote within REPLICA_PIN_SECONDS (set per request by
+# ReadReplicaMiddleware); reads then stay on the primary
+_pinned = ContextVar('pinned_to_primary', default=False)
+# True once the current request, job or command has written; reads then stay
+# on the primary for the rest of it
+_wrote = ContextVar('wrote_to_primary', default=False)
+
+
+def replica_age(alias: str):
+    """
+    Seconds since the SQLite replica file was last refreshed, or None if it
+    does not exist. Replicas on other engines are assumed to be in sync.
+    """
+    database = settings.DATABASES[alias]
+    if database['ENGINE'] != 'django.db.backends.sqlite3':
+        return 0.0
+    try:
+        return time.time() - os.path.getmtime(database['NAME'])
+    except OSError:
+        return None
+
+
+def reporting_alias() -> str:
+    """
+    The database that reporting reads should use right now: the
+    REPORTING_DATABASE replica, unless none is configured, it is older than
+    REPLICA_MAX_STALENESS, or reads are pinned to the primary.
+    """
+    alias = settings.REPORTING_DATABASE
+    if not alias or alias not in settings.DATABASES or _pinned.get() or _wrote.get():
+        return DEFAULT_DB_ALIAS
+    age = replica_age(alias)
+    if age is None or age > settings.REPLICA_MAX_STALENESS:
+        return DEFAULT_DB_ALIAS
+    return alias
+
+
+def pin_to_primary():
+    """Keeps the rest of this request's (or job's, or command's) reads on the primary."""
+    _wrote.set(True)
+
+
+@contextmanager
+def replica_scope(pinned: bool = False):
+    """
+    Scopes the pinning state to one request or background job, so that a
+    write only pins the reads that follow it in the same unit of work:
+    ``pinned`` says whether the client wrote recently. Yields a callable
+    telling whether the scope itself wrote.
+
+    Code running outside any scope, such as a management command, stays
+    pinned from its first write until it exits.
+    """
+    pinned_token, wrote_token = _pinned.set(pinned), _wrote.set(False)
+    try:
+        yield _wrote.get
+    finally:
+        _pinned.reset(pinned_token)
+        _wrote.reset(wrote_token)
+
+
+class reporting_reads(ContextDecorator):
+    """
+    Context manager and decorator that sends every read inside it to the
+    reporting replica (see reporting_alias()). Writes always go to the
+    primary, and pin later reads there.
+    """
+
+    def __enter__(self):
+        self._token = _reporting.set(True)
+        return self
+
+    def __exit__(self, *exc):
+        _reporting.reset(self._token)
+        return False
+
+
+class ReadReplicaRouter:
+    """
+    Routes reads made inside reporting_reads() to the reporting replica and
+    everything else to the primary. Sessions and users are always read from
+    the primary, so a login is never lost to replica lag. The replica is a
+    copy of the primary, so it is never migrated.
+    """
+    primary_only_apps = {'accounts', 'admin', 'auth', 'contenttypes', 'sessions'}
+
+    def db_for_read(self, model, **hints):
+        if _reporting.get() and model._meta.app_label not in self.primary_only_apps:
+            return reporting_alias()
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
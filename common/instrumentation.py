@@ -0,0 +1,96 @@
+# common/instrumentation.py
+import logging
+import re
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)')
+_SAVEPOINT_NAME = re.compile(r'"s\d+_x\d+"')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql: str) -> str:
+    """
+    Reduces a statement to its shape: literals become ?, IN lists of any
+    length collapse to (...), so the same query run for different rows
+    shares one fingerprint.
+    """
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = _SAVEPOINT_NAME.sub('?', sql)
+    sql = _PLACEHOLDER_LIST.sub('(...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class QueryRecorder:
+    """
+    A connection.execute_wrapper that counts the statements run through it,
+    their total time, and how often each statement shape repeats.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0  # seconds
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += perf_counter() - started
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def repeated(self, threshold: int = None) -> list:
+        """(fingerprint, count) pairs run at least ``threshold`` times, most frequent first."""
+        threshold = threshold or settings.QUERY_REPEAT_THRESHOLD
+        return [(sql, n) for sql, n in self.fingerprints.most_common() if n >= threshold]
+
+    def report(self, threshold: int = None) -> str:
+        lines = [f"{self.count} queries in {self.duration * 1000:.1f} ms"]
+        for sql, n in self.repeated(threshold):
+            lines.append(f"  {n}x {sql[:300]}")
+        return '\n'.join(lines)
+
+
+@contextmanager
+def record_queries(using=None):
+    """
+    Records every statement run on the ``using`` database alias, or on all of
+    them, while the block runs:
+
+        with record_queries() as queries:
+            ...
+        queries.count, queries.duration, queries.repeated()
+    """
+    recorder = QueryRecorder()
+    aliases = [using] if using else list(settings.DATABASES)
+    with ExitStack() as stack:
+        for alias in aliases:
+            stack.enter_context(connections[alias].execute_wrapper(recorder))
+        yield recorder
+
+
+def get_query_budget(view_name) -> int:
+    """The most queries the named view (URL name) may run per request."""
+    return settings.QUERY_BUDGETS.get(view_name, settings.DEFAULT_QUERY_BUDGET)
+
+
+def check_query_budget(view_name, recorder) -> list:
+    """Describes each way a request to ``view_name`` broke its query budget; empty if none."""
+    problems = []
+    budget = get_query_budget(view_name)
+    if recorder.count > budget:
+        problems.append(f"{view_name}: {recorder.count} queries, budget is {budget}")
+    for sql, n in recorder.repeated():
+        problems.append(f"{view_name}: possible N+1, {n}x {sql[:300]}")
+    return problems
@@ -0,0 +1,7 @@
+"""
+A database-backed background job queue that needs nothing but the database.
+
+Register a function with @job (in a ``tasks`` module of any installed app),
+queue it with enqueue() and run the queue with ``manage.py run_workers``.
+See common.jobs.services for the queue semantics.
+"""
@@ -0,0 +1,24 @@
+# jobs/admin.py
+
+from django.contrib import admin
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'priority', 'run_at', 'attempts', 'max_attempts', 'locked_by', 'finished_at')
+    list_filter = ('status', 'name')
+    search_fields = ('name', 'unique_key')
+    readonly_fields = ('attempts', 'locked_by', 'locked_at', 'last_error', 'created_at', 'finished_at')
+    actions = ['retry_now']
+
+    @admin.action(description=_("Retry now"))
+    def retry_now(self, request, queryset):
+        """Queues failed jobs again with a fresh set of attempts."""
+        count = queryset.filter(status=Job.Status.FAILED).update(
+            status=Job.Status.QUEUED, run_at=timezone.now(), attempts=0, finished_at=None,
+        )
+        self.message_user(request, _("%(count)d jobs queued again.") % {'count': count})
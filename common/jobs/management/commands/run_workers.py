@@ -0,0 +1,97 @@
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import uuid
+from time import monotonic
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from common.jobs.services import JOBS, requeue_stale_jobs, work
+
+
+def _worker_id(index: int) -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{index}:{uuid.uuid4().hex[:8]}"
+
+
+def _process_main(index, stop, poll_interval, burst):
+    # The parent handles Ctrl-C and sets ``stop``; a job is never cut short
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    work(_worker_id(index), stop, poll_interval, burst)
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs background jobs from the database queue (common.jobs) on N worker threads or "
+        "processes until interrupted. Ctrl-C or SIGTERM lets running jobs finish first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=1, help="Jobs run at once (default: 1).")
+        parser.add_argument(
+            '--processes', action='store_true',
+            help="Run workers as processes instead of threads, for CPU-bound jobs such as PDF rendering.",
+        )
+        parser.add_argument(
+            '--burst', action='store_true', help="Exit once the queue is empty instead of waiting for jobs.",
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=settings.JOBS_POLL_INTERVAL,
+            help=f"Seconds an idle worker waits before looking again (default: {settings.JOBS_POLL_INTERVAL}).",
+        )
+
+    def handle(self, *args, **options):
+        concurrency = options['concurrency']
+        if concurrency < 1:
+            raise CommandError("--concurrency must be at least 1.")
+        poll_interval, burst = options['poll_interval'], options['burst']
+
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stderr.write(f"Requeued {requeued} abandoned jobs.")
+
+        if options['processes']:
+            stop = multiprocessing.get_context('fork').Event()
+            connections.close_all()  # Never share a connection across fork()
+            workers = [
+                multiprocessing.get_context('fork').Process(
+                    target=_process_main, args=(index, stop, poll_interval, burst), daemon=True,
+                )
+                for index in range(concurrency)
+            ]
+        else:
+            stop = threading.Event()
+            workers = [
+                threading.Thread(target=work, args=(_worker_id(index), stop, poll_interval, burst), daemon=True)
+                for index in range(concurrency)
+            ]
+
+        def shut_down(signum, frame):
+            self.stderr.write("Stopping once the running jobs finish...")
+            stop.set()
+
+        signal.signal(signal.SIGINT, shut_down)
+        signal.signal(signal.SIGTERM, shut_down)
+
+        kind = 'processes' if options['processes'] else 'threads'
+        self.stdout.write(f"Running {len(JOBS)} job types on {concurrency} {kind}.")
+        for worker in workers:
+            worker.start()
+
+        # Supervise: look out for jobs abandoned by dead workers elsewhere
+        lock_check = settings.JOBS_LOCK_TIMEOUT / 2
+        next_check = monotonic() + lock_check
+        while any(worker.is_alive() for worker in workers) and not stop.is_set():
+            stop.wait(min(poll_interval, 1.0))
+            if monotonic() >= next_check:
+                if requeue_stale_jobs():
+                    self.stderr.write("Requeued abandoned jobs.")
+                connections.close_all()
+                next_check = monotonic() + lock_check
+        for worker in workers:
+            worker.join()
+        self.stdout.write(self.style.SUCCESS("Workers stopped."))
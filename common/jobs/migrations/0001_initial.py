@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:09
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Registered name of the job function.', max_length=100, verbose_name='name')),
+                ('kwargs', models.JSONField(blank=True, default=dict, verbose_name='arguments')),
+                ('status', models.CharField(choices=[('QUEUED', 'Queued'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='QUEUED', max_length=10, verbose_name='status')),
+                ('priority', models.SmallIntegerField(default=0, help_text='Higher runs first.', verbose_name='priority')),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, help_text='The job is not started before this time.', verbose_name='run at')),
+                ('unique_key', models.CharField(blank=True, help_text='At most one queued job may carry the same key.', max_length=200, null=True, verbose_name='unique key')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='attempts')),
+                ('max_attempts', models.PositiveSmallIntegerField(default=3, verbose_name='max attempts')),
+                ('locked_by', models.CharField(blank=True, help_text='The worker running the job.', max_length=100, verbose_name='locked by')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='locked at')),
+                ('last_error', models.TextField(blank=True, verbose_name='last error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='finished at')),
+            ],
+            options={
+                'verbose_name': 'job',
+                'verbose_name_plural': 'jobs',
+                'indexes': [models.Index(condition=models.Q(('status', 'QUEUED')), fields=['-priority', 'run_at'], name='job_queued_idx'), models.Index(condition=models.Q(('status', 'RUNNING')), fields=['locked_at'], name='job_running_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status', 'QUEUED')), fields=('unique_key',), name='job_unique_queued_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,121 @@
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class Job(models.Model):
+    """
+    One queued call of a registered job function (see common.jobs.registry).
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = 'QUEUED', _('Queued')
+        RUNNING = 'RUNNING', _('Running')
+        DONE = 'DONE', _('Done')
+        FAILED = 'FAILED', _('Failed')
+
+    name = models.CharField(
+        _("name"),
+        max_length=100,
+        help_text=_("Registered name of the job function."),
+    )
+
+    kwargs = models.JSONField(
+        _("arguments"),
+        default=dict,
+        blank=True,
+    )
+
+    status = models.CharField(
+        _("status"),
+        max_length=10,
+        choices=Status.choices,
+        default=Status.QUEUED,
+    )
+
+    priority = models.SmallIntegerField(
+        _("priority"),
+        default=0,
+        help_text=_("Higher runs first."),
+    )
+
+    run_at = models.DateTimeField(
+        _("run at"),
+        default=timezone.now,
+        help_text=_("The job is not started before this time."),
+    )
+
+    unique_key = models.CharField(
+        _("unique key"),
+        max_length=200,
+        null=True,
+        blank=True,
+        help_text=_("At most one queued job may carry the same key."),
+    )
+    # --- Execution ---
+    attempts = models.PositiveSmallIntegerField(
+        _("attempts"),
+        default=0,
+    )
+
+    max_attempts = models.PositiveSmallIntegerField(
+        _("max attempts"),
+        default=3,
+    )
+
+    locked_by = models.CharField(
+        _("locked by"),
+        max_length=100,
+        blank=True,
+        help_text=_("The worker running the job."),
+    )
+
+    locked_at = models.DateTimeField(
+        _("locked at"),
+        null=True,
+        blank=True,
+    )
+
+    last_error = models.TextField(
+        _("last error"),
+        blank=True,
+    )
+
+    created_at = models.DateTimeField(
+        _("created at"),
+        auto_now_add=True,
+    )
+
+    finished_at = models.DateTimeField(
+        _("finished at"),
+        null=True,
+        blank=True,
+    )
+
+    class Meta:
+        verbose_name = _("job")
+        verbose_name_plural = _("jobs")
+        indexes = [
+            # Claiming only ever looks at queued jobs, most urgent first
+            models.Index(
+                fields=['-priority', 'run_at'],
+                condition=models.Q(status='QUEUED'),
+                name='job_queued_idx',
+            ),
+            # Finding jobs left running by a worker that died
+            models.Index(
+                fields=['locked_at'],
+                condition=models.Q(status='RUNNING'),
+                name='job_running_idx',
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['unique_key'],
+                condition=models.Q(status='QUEUED'),
+                name='job_unique_queued_key',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
@@ -0,0 +1,233 @@
+# jobs/services.py
+"""
+The job queue.
+
+Jobs are rows in jobs_job. A worker picks the most urgent due job and claims
+it with a conditional UPDATE (only a row still QUEUED can be taken), so
+workers never wait on each other's locks and a job is never run twice at
+once; a worker that loses a job to another one tries the next straight
+away. Because the queue lives in the application database, a job enqueued
+inside a transaction only becomes visible to workers once it commits.
+
+A job that raises is retried after an exponential backoff until it has had
+``max_attempts``; a job left RUNNING by a worker that died is queued again
+once its lock is older than JOBS_LOCK_TIMEOUT.
+"""
+import logging
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from common.db_routers import replica_scope
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# Registered job functions by name
+JOBS = {}
+
+# Returned by claim_job() when another worker took the job it picked
+CONTENDED = object()
+
+
+def job(name: str = None, *, priority: int = 0, max_attempts: int = 3):
+    """
+    Registers a function as a job. Its arguments must be JSON serialisable
+    keyword arguments. The function gains an ``enqueue(**kwargs)`` shortcut
+    that also accepts the options of enqueue() (``priority``, ``run_at``,
+    ``delay``, ``unique_key``).
+
+        @job('billing.email_invoice', max_attempts=5)
+        def email_invoice(invoice_id):
+            ...
+
+        email_invoice.enqueue(invoice_id=invoice.pk, unique_key=f'email-invoice-{invoice.pk}')
+    """
+    def register(func):
+        job_name = name or f"{func.__module__}.{func.__qualname__}"
+        if job_name in JOBS and JOBS[job_name] is not func:
+            raise ValueError(f"A job named {job_name!r} is already registered.")
+        JOBS[job_name] = func
+
+        def enqueue_job(*, priority=priority, run_at=None, delay=None, unique_key=None, **kwargs):
+            return enqueue(
+                job_name, kwargs, priority=priority, run_at=run_at, delay=delay,
+                unique_key=unique_key, max_attempts=max_attempts,
+            )
+
+        func.job_name = job_name
+        func.enqueue = enqueue_job
+        return func
+    return register
+
+
+def enqueue(
+    name: str,
+    kwargs: dict = None,
+    *,
+    priority: int = 0,
+    run_at=None,
+    delay: float = None,
+    unique_key: str = None,
+    max_attempts: int = 3,
+) -> Job:
+    """
+    Queues a call of the registered job ``name``, to run at ``run_at`` or
+    ``delay`` seconds from now (default: as soon as a worker is free).
+
+    With a ``unique_key``, a job with the same key that is still queued is
+    returned instead of queueing another one.
+    """
+    if name not in JOBS:
+        raise ValueError(_("There is no job named %(name)s.") % {'name': name})
+    if run_at is None:
+        run_at = timezone.now() + timedelta(seconds=delay or 0)
+    fields = {
+        'name': name,
+        'kwargs': kwargs or {},
+        'priority': priority,
+        'run_at': run_at,
+        'unique_key': unique_key,
+        'max_attempts': max_attempts,
+    }
+    if unique_key is None:
+        return Job.objects.create(**fields)
+
+    existing = Job.objects.filter(unique_key=unique_key, status=Job.Status.QUEUED).first()
+    if existing is not None:
+        return existing
+    try:
+        with transaction.atomic():
+            return Job.objects.create(**fields)
+    except IntegrityError:  # Queued by someone else in the meantime
+        return Job.objects.get(unique_key=unique_key, status=Job.Status.QUEUED)
+
+
+def claim_job(worker_id: str):
+    """
+    Marks the most urgent due job as running by ``worker_id`` and returns it.
+    Returns None when there is nothing to do, and CONTENDED when another
+    worker claimed that job first (there may well be more to do).
+    ``worker_id`` must be unique to the calling worker, which runs one job
+    at a time.
+    """
+    now = timezone.now()
+    next_job = (
+        Job.objects.filter(status=Job.Status.QUEUED, run_at__lte=now)
+        .order_by('-priority', 'run_at', 'pk')
+        .values_list('pk', flat=True)
+        .first()
+    )
+    if next_job is None:
+        return None
+    claimed = Job.objects.filter(pk=next_job, status=Job.Status.QUEUED).update(
+        status=Job.Status.RUNNING, locked_by=worker_id, locked_at=now, attempts=F('attempts') + 1,
+    )
+    if not claimed:
+        return CONTENDED
+    return Job.objects.get(pk=next_job)
+
+
+def _held(job: Job):
+    # A worker that lost its job to requeue_stale_jobs() must not record an outcome for it
+    return Job.objects.filter(pk=job.pk, status=Job.Status.RUNNING, locked_by=job.locked_by)
+
+
+def complete_job(job: Job) -> None:
+    _held(job).update(
+        status=Job.Status.DONE, finished_at=timezone.now(), locked_by='', locked_at=None,
+    )
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds before the next attempt: JOBS_RETRY_BACKOFF doubled per failed attempt, with jitter."""
+    delay = min(settings.JOBS_RETRY_BACKOFF * 2 ** (attempts - 1), settings.JOBS_RETRY_BACKOFF_MAX)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def fail_job(job: Job, error: str) -> None:
+    """Queues the job again after a backoff, or marks it failed once it has used its attempts."""
+    now = timezone.now()
+    if job.attempts < job.max_attempts:
+        try:
+            with transaction.atomic():
+                _held(job).update(
+                    status=Job.Status.QUEUED, run_at=now + timedelta(seconds=retry_delay(job.attempts)),
+                    locked_by='', locked_at=None, last_error=error,
+                )
+            return
+        except IntegrityError:
+            # The same work was queued again while this attempt ran; that job will do it
+            error = f"{error}\nNot retried: a job with the same key is already queued."
+    _held(job).update(
+        status=Job.Status.FAILED, finished_at=now, locked_by='', locked_at=None, last_error=error,
+    )
+
+
+def run_job(job: Job) -> bool:
+    """Runs a claimed job and records the outcome. Returns whether it succeeded."""
+    func = JOBS.get(job.name)
+    if func is None:
+        job.attempts = job.max_attempts  # Retrying cannot help
+        fail_job(job, f"There is no job named {job.name}.")
+        return False
+    try:
+        func(**job.kwargs)
+    except Exception:
+        logger.exception("Job %s failed (attempt %d of %d)", job, job.attempts, job.max_attempts)
+        fail_job(job, traceback.format_exc())
+        return False
+    complete_job(job)
+    return True
+
+
+def requeue_stale_jobs(timeout: float = None) -> int:
+    """
+    Hands jobs whose worker has held them for more than ``timeout`` seconds
+    (JOBS_LOCK_TIMEOUT) back to the queue, on the assumption that the worker
+    died. Returns how many were found.
+    """
+    timeout = settings.JOBS_LOCK_TIMEOUT if timeout is None else timeout
+    stale = Job.objects.filter(status=Job.Status.RUNNING, locked_at__lt=timezone.now() - timedelta(seconds=timeout))
+    count = 0
+    for job in stale:
+        logger.warning("Job %s was abandoned by %s", job, job.locked_by)
+        fail_job(job, f"Abandoned by worker {job.locked_by}.")
+        count += 1
+    return count
+
+
+def work(worker_id: str, stop, poll_interval: float = None, burst: bool = False) -> int:
+    """
+    Claims and runs jobs until ``stop`` (a threading or multiprocessing
+    Event) is set, waiting ``poll_interval`` seconds whenever the queue is
+    empty. With ``burst``, returns as soon as the queue is empty instead.
+    Returns the number of jobs run.
+    """
+    poll_interval = settings.JOBS_POLL_INTERVAL if poll_interval is None else poll_interval
+    processed = 0
+    try:
+        while not stop.is_set():
+            close_old_connections()  # Each job is treated like a request
+            job = claim_job(worker_id)
+            if job is CONTENDED:
+                continue  # Another job may be due; sleeping or stopping now would leave it waiting
+            if job is None:
+                if burst:
+                    break
+                stop.wait(poll_interval)
+                continue
+            # Like a request, a job that writes only pins its own reads to the primary
+            with replica_scope():
+                run_job(job)
+            processed += 1
+    finally:
+        close_old_connections()
+    return processed
@@ -0,0 +1,132 @@
+import threading
+from io import StringIO
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management import call_command
+from django.db.models.query import QuerySet
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from common.db_routers import reporting_alias
+
+from .models import Job
+from .services import CONTENDED, claim_job, enqueue, job, requeue_stale_jobs, run_job, work
+
+calls = []
+
+
+@job('tests.record')
+def record(value):
+    calls.append(value)
+
+
+@job('tests.write_then_report')
+def write_then_report():
+    calls.append(reporting_alias())
+    Job.objects.filter(pk=0).update(priority=0)  # Pins the rest of this job to the primary
+    calls.append(reporting_alias())
+
+
+@job('tests.explode', max_attempts=2)
+def explode():
+    raise RuntimeError("boom")
+
+
+@override_settings(JOBS_RETRY_BACKOFF=10, JOBS_RETRY_BACKOFF_MAX=60)
+class JobQueueTests(TestCase):
+
+    def setUp(self):
+        calls.clear()
+
+    def test_claims_most_urgent_due_job_first(self):
+        enqueue('tests.record', {'value': 'later'}, delay=60)
+        low = enqueue('tests.record', {'value': 'low'})
+        high = record.enqueue(value='high', priority=5)
+
+        self.assertEqual(claim_job('w1'), high)
+        self.assertEqual(claim_job('w2'), low)
+        self.assertIsNone(claim_job('w3'))  # The last one is not due yet
+        self.assertEqual(Job.objects.get(pk=high.pk).locked_by, 'w1')
+
+    def test_losing_the_claim_to_another_worker_is_not_an_empty_queue(self):
+        record.enqueue(value='x')
+        pick = QuerySet.first
+
+        def picked_then_taken(queryset):
+            pk = pick(queryset)
+            Job.objects.filter(pk=pk).update(status=Job.Status.RUNNING, locked_by='w2')
+            return pk
+
+        with mock.patch.object(QuerySet, 'first', picked_then_taken):
+            self.assertIs(claim_job('w1'), CONTENDED)
+        self.assertEqual(Job.objects.get().locked_by, 'w2')
+
+    def test_unique_key_deduplicates_queued_jobs(self):
+        first = record.enqueue(value=1, unique_key='k')
+        self.assertEqual(record.enqueue(value=2, unique_key='k'), first)
+
+        claim_job('w1')  # Running jobs do not block a new one
+        self.assertNotEqual(record.enqueue(value=3, unique_key='k'), first)
+
+    def test_failed_job_backs_off_then_fails(self):
+        explode.enqueue()
+        self.assertFalse(run_job(claim_job('w1')))
+        retry = Job.objects.get()
+        self.assertEqual(retry.status, Job.Status.QUEUED)
+        self.assertGreater(retry.run_at, timezone.now() + timedelta(seconds=7))
+        self.assertIn('boom', retry.last_error)
+
+        Job.objects.update(run_at=timezone.now())
+        run_job(claim_job('w1'))
+        self.assertEqual(Job.objects.get().status, Job.Status.FAILED)
+
+    def test_abandoned_job_is_requeued_and_old_worker_cannot_finish_it(self):
+        record.enqueue(value='x')
+        claimed = claim_job('dead')
+        Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(requeue_stale_jobs(timeout=60), 1)
+        Job.objects.update(run_at=timezone.now())
+        self.assertEqual(claim_job('alive').attempts, 2)
+
+        run_job(claimed)  # The dead worker comes back and finishes late
+        self.assertEqual(Job.objects.get().status, Job.Status.RUNNING)
+
+
+class RunWorkersCommandTests(TransactionTestCase):
+    # work() drops connections between jobs like a request would, so these
+    # cannot run inside a TestCase transaction
+
+    def test_work_in_burst_mode_drains_the_queue(self):
+        calls.clear()
+        for value in range(3):
+            record.enqueue(value=value)
+        self.assertEqual(work('w1', threading.Event(), burst=True), 3)
+        self.assertEqual(calls, [0, 1, 2])
+        self.assertEqual(Job.objects.filter(status=Job.Status.DONE).count(), 3)
+
+    def test_burst_worker_keeps_going_after_losing_a_claim(self):
+        calls.clear()
+        record.enqueue(value=1)
+        lost = iter([CONTENDED])
+        with mock.patch('common.jobs.services.claim_job', side_effect=lambda worker_id: next(lost, None) or claim_job(worker_id)):
+            self.assertEqual(work('w1', threading.Event(), burst=True), 1)
+        self.assertEqual(calls, [1])
+
+    @override_settings(REPORTING_DATABASE='replica', REPLICA_MAX_STALENESS=60)
+    @mock.patch('common.db_routers.replica_age', return_value=5.0)
+    def test_a_write_pins_only_its_own_job_to_the_primary(self, replica_age):
+        calls.clear()
+        write_then_report.enqueue()
+        write_then_report.enqueue()
+        work('w1', threading.Event(), burst=True)
+        self.assertEqual(calls, ['replica', 'default', 'replica', 'default'])
+
+    def test_threads_run_every_job_once(self):
+        calls.clear()
+        for value in range(20):
+            record.enqueue(value=value)
+        call_command('run_workers', concurrency=4, burst=True, poll_interval=0.01, stdout=StringIO())
+        self.assertEqual(sorted(calls), list(range(20)))
+        self.assertEqual(Job.objects.filter(status=Job.Status.DONE).count(), 20)
@@ -0,0 +1,194 @@
+# common/middleware.py
+import random
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.urls import Resolver404, resolve
+
+from .db_routers import replica_scope
+from .instrumentation import check_query_budget, logger, record_queries
+from .profiling import PROFILERS, check_profile_token, profile_path, prune_profiles
+
+
+class HybridMiddleware:
+    """
+    Base for middleware that runs natively in sync (WSGI) and async (ASGI)
+    chains. Django would otherwise adapt a sync-only middleware with
+    sync_to_async, so every async request, async views included, would hold
+    a thread for its whole duration. Subclasses start ``__call__`` with
+    ``if self.async_mode: return self.__acall__(request)``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+
+class QueryInstrumentationMiddleware(HybridMiddleware):
+    """
+    Records the queries each request runs. Adds a Server-Timing header with
+    the SQL time and query count next to the total view time, and logs a
+    warning when a view exceeds its budget in QUERY_BUDGETS or repeats one
+    statement shape QUERY_REPEAT_THRESHOLD times or more (a likely N+1).
+
+    Enabled with QUERY_INSTRUMENTATION; when off the middleware removes
+    itself from the chain at startup and costs nothing per request.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        started = perf_counter()
+        with record_queries() as queries:
+            response = self.get_response(request)
+        return self.report(request, response, queries, perf_counter() - started)
+
+    async def __acall__(self, request):
+        started = perf_counter()
+        # Connections are per thread and the request's ORM calls (and sync
+        # views) run on its sync_to_async thread, so record there
+        recording = record_queries()
+        queries = await sync_to_async(recording.__enter__)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(recording.__exit__)(None, None, None)
+        return self.report(request, response, queries, perf_counter() - started)
+
+    def report(self, request, response, queries, elapsed):
+        response['Server-Timing'] = (
+            f'db;dur={queries.duration * 1000:.1f};desc="{queries.count} queries", '
+            f'app;dur={elapsed * 1000:.1f}'
+        )
+        match = request.resolver_match
+        view_name = match.view_name if match else request.path
+        for problem in check_query_budget(view_name, queries):
+            logger.warning("%s %s", request.method, problem)
+        return response
+
+
+class RequestProfilerMiddleware(HybridMiddleware):
+    """
+    Profiles a random REQUEST_PROFILE_RATE share of the requests to the URL
+    names in REQUEST_PROFILE_VIEWS (all views when empty), and any request
+    carrying a valid signed ?__profile=<token>. Each profile is written under
+    REQUEST_PROFILE_DIR/<url name>/ by the REQUEST_PROFILER ("cprofile" for
+    pstats files, "sampler" for collapsed stacks), which keeps only the newest
+    REQUEST_PROFILE_KEEP per view; the profile_report command aggregates them.
+
+    Under ASGI only the event loop thread is profiled: time spent in
+    sync_to_async threads (ORM calls, sync views) shows up as waiting, and
+    other requests served by the loop meanwhile show up too.
+
+    Enabled with REQUEST_PROFILING; when off the middleware removes itself
+    from the chain at startup.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILING:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        self.profiler_class = PROFILERS[settings.REQUEST_PROFILER]
+
+    def should_profile(self, request) -> bool:
+        token = request.GET.get('__profile')
+        if token:
+            return check_profile_token(token)
+        if random.random() >= settings.REQUEST_PROFILE_RATE:
+            return False
+        if not settings.REQUEST_PROFILE_VIEWS:
+            return True
+        try:
+            return resolve(request.path_info).view_name in settings.REQUEST_PROFILE_VIEWS
+        except Resolver404:
+            return False
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        profiler = self.profiler_class()
+        try:
+            profiler.start()
+        except ValueError:  # Another profiler is already active in this process
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.stop()
+        self.save(request, profiler)
+        return response
+
+    async def __acall__(self, request):
+        if not self.should_profile(request):
+            return await self.get_response(request)
+
+        profiler = self.profiler_class()
+        try:
+            profiler.start()
+        except ValueError:
+            return await self.get_response(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            profiler.stop()
+        self.save(request, profiler)
+        return response
+
+    def save(self, request, profiler):
+        match = request.resolver_match
+        try:
+            path = profile_path(match.view_name if match else 'unresolved', profiler.suffix)
+            profiler.save(path)
+            prune_profiles(path.parent)
+        except OSError as e:
+            logger.warning("Could not write request profile: %s", e)
+
+
+class ReadReplicaMiddleware(HybridMiddleware):
+    """
+    Read-your-writes for the reporting replica: once a request writes, the
+    client gets a cookie that keeps its reports on the primary for
+    REPLICA_PIN_SECONDS, long enough for the next replica refresh to include
+    the write. Removed from the chain when no REPORTING_DATABASE is set.
+    """
+    cookie_name = 'replica_pin'
+
+    def __init__(self, get_response):
+        if not settings.REPORTING_DATABASE:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with replica_scope(self.cookie_name in request.COOKIES) as wrote:
+            response = self.get_response(request)
+            return self.pin(response, wrote())
+
+    async def __acall__(self, request):
+        # Writes made through sync_to_async still reach this scope: asgiref
+        # copies context changes back to the awaiting coroutine
+        with replica_scope(self.cookie_name in request.COOKIES) as wrote:
+            response = await self.get_response(request)
+            return self.pin(response, wrote())
+
+    def pin(self, response, wrote: bool):
+        if wrote:
+            response.set_cookie(
+                self.cookie_name, '1', max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax',
+            )
+        return response
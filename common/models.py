@@ -1,4 +1,12 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import class_prepared
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+# Sent by SoftDeleteQuerySet.deactivate() with ``sender`` (the model) and
+# ``pks``, since its UPDATE skips post_save. Receivers cascade the soft
+# delete to related rows, inside the same transaction.
+deactivated = Signal()
 
 
 class TimeStampedModel(models.Model):
@@ -9,8 +17,73 @@ class TimeStampedModel(models.Model):
         abstract = True
 
 
+class SoftDeleteQuerySet(models.QuerySet):
+    """QuerySet with bulk soft-delete helpers."""
+
+    def active(self):
+        return self.filter(is_active=True)
+
+    def inactive(self):
+        return self.filter(is_active=False)
+
+    @transaction.atomic
+    def deactivate(self) -> int:
+        """
+        Soft-deletes every row in the queryset with a single UPDATE and sends
+        ``deactivated`` for them, so that the cascade commits or rolls back
+        together with it. Returns the number of rows deactivated.
+        """
+        model = self.model
+        pks = list(self.filter(is_active=True).values_list('pk', flat=True))
+        if not pks:
+            return 0
+
+        fields = {'is_active': False}
+        if any(f.name == 'updated_at' for f in model._meta.concrete_fields):
+            fields['updated_at'] = timezone.now()  # update() bypasses auto_now
+        count = model._base_manager.filter(pk__in=pks).update(**fields)
+        deactivated.send(sender=model, pks=pks)
+        return count
+
+
+class ActiveManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
+    """Manager that only returns live (non soft-deleted) rows."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_active=True)
+
+
 class SoftDeleteModel(models.Model):
     is_active = models.BooleanField(default=True)
 
+    objects = models.Manager.from_queryset(SoftDeleteQuerySet)()
+    active = ActiveManager()
+
+    # Label and help text of is_active on the concrete model (see label_is_active)
+    is_active_verbose_name = None
+    is_active_help_text = None
+
     class Meta:
         abstract = True
+
+    def deactivate(self):
+        """Soft-deletes this object instead of deleting it."""
+        SoftDeleteQuerySet(model=type(self)).filter(pk=self.pk).deactivate()
+        self.is_active = False
+
+
+@receiver(class_prepared)
+def label_is_active(sender, **kwargs):
+    """
+    Applies a soft-deletable model's is_active_verbose_name and
+    is_active_help_text to its own copy of the inherited field, so the model
+    does not have to declare the column again.
+    """
+    if not issubclass(sender, SoftDeleteModel):
+        return
+    field = sender._meta.get_field('is_active')
+    if sender.is_active_verbose_name is not None:
+        # _verbose_name is what the field deconstructs to in migrations
+        field.verbose_name = field._verbose_name = sender.is_active_verbose_name
+    if sender.is_active_help_text is not None:
+        field.help_text = sender.is_active_help_text
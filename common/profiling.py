@@ -0,0 +1,117 @@
+# common/profiling.py
+import cProfile
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+
+PROFILE_TOKEN_SALT = 'common.profiling.token'
+_UNSAFE_NAME = re.compile(r'[^\w.-]+')
+
+
+def make_profile_token() -> str:
+    """A token that profiles any request it is sent with as ?__profile=<token>, until it expires."""
+    return signing.TimestampSigner(salt=PROFILE_TOKEN_SALT).sign('profile')
+
+
+def check_profile_token(token: str) -> bool:
+    try:
+        signing.TimestampSigner(salt=PROFILE_TOKEN_SALT).unsign(token, max_age=settings.REQUEST_PROFILE_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def profile_path(view_name: str, suffix: str) -> Path:
+    """Where a profile of one request to ``view_name`` is written: one directory per URL name."""
+    directory = Path(settings.REQUEST_PROFILE_DIR) / (_UNSAFE_NAME.sub('_', view_name) or 'unknown')
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{time.perf_counter_ns()}{suffix}"
+
+
+def prune_profiles(directory: Path, keep: int = None) -> int:
+    """
+    Deletes all but the newest ``keep`` (REQUEST_PROFILE_KEEP) profiles in one
+    view's directory, so sampling in production cannot fill the disk.
+    Returns the number deleted.
+    """
+    keep = settings.REQUEST_PROFILE_KEEP if keep is None else keep
+    profiles = sorted(directory.iterdir(), key=lambda path: path.stat().st_mtime_ns)
+    pruned = 0
+    for path in profiles[:max(len(profiles) - keep, 0)]:
+        try:
+            path.unlink()
+            pruned += 1
+        except FileNotFoundError:  # Pruned by another worker
+            pass
+    return pruned
+
+
+class CProfiler:
+    """Deterministic profile of the current thread, saved in pstats format."""
+    suffix = '.prof'
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def save(self, path):
+        self.profile.dump_stats(path)
+
+
+class StackSampler:
+    """
+    Records the current thread's Python stack every ``interval`` seconds from
+    a background thread, saved as collapsed stacks ("a;b;c count" per line,
+    the input format of flamegraph tools). Costs far less than cProfile on
+    call-heavy code such as PDF rendering, at the price of being statistical.
+    """
+    suffix = '.folded'
+
+    def __init__(self, interval: float = None):
+        self.interval = interval or settings.REQUEST_PROFILE_SAMPLE_INTERVAL
+        self.target = threading.get_ident()
+        self.root = None
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_filename}:{code.co_name}:{code.co_firstlineno}")
+                if frame is self.root:  # Leave out the frames above the caller of start()
+                    break
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self.root = sys._getframe(1)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def save(self, path):
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+PROFILERS = {'cprofile': CProfiler, 'sampler': StackSampler}
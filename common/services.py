@@ -0,0 +1,151 @@
+# common/services.py
+
+import csv
+import hashlib
+import json
+import string
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+# Sorts after every valid character, so [term, term + PREFIX_END) covers all
+# strings starting with term.
+PREFIX_END = '\U0010ffff'
+
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def ascii_lower(value: str) -> str:
+    """Lowercases A-Z only, the way SQLite's LOWER() does."""
+    return value.translate(_ASCII_LOWER)
+
+
+# --- Search Services ---
+
+def prefix_search(queryset, fields, term: str, limit: int = 20) -> list:
+    """
+    Returns up to ``limit`` objects from ``queryset`` where any of ``fields``
+    starts with ``term``, ignoring case.
+
+    The match is written as a range on LOWER(field) rather than a LIKE, so
+    SQLite answers it from an index on that expression. Each field is searched
+    separately in index order with its own LIMIT and the results are merged,
+    so even a one-letter prefix touches at most ``limit`` rows per field.
+
+    SQLite's LOWER() only folds ASCII letters, so the term is folded the same
+    way: "Ém" finds "Émile", but "ém" does not.
+    """
+    term = ascii_lower(term.strip())
+    matches = {}
+    for field in fields:
+        alias = f'{field}_lower'
+        rows = (
+            queryset
+            .alias(**{alias: Lower(field)})
+            .filter(**{f'{alias}__gte': term, f'{alias}__lt': term + PREFIX_END})
+            .order_by(alias)[:limit]
+        )
+        for obj in rows:
+            matches.setdefault(obj.pk, obj)
+    return sorted(matches.values(), key=lambda obj: str(obj).lower())[:limit]
+
+
+def cached_autocomplete(namespace: str, term: str, build_results):
+    """
+    Returns autocomplete results for ``term``, caching them briefly so that
+    hot prefixes (the first few keystrokes everyone types) skip the database.
+
+    ``build_results`` is called with the normalised term on a cache miss and
+    must return a JSON-serialisable list.
+    """
+    term = ascii_lower(term.strip())
+    key = f'autocomplete:{namespace}:{hashlib.md5(term.encode()).hexdigest()}'
+    results = cache.get(key)
+    if results is None:
+        results = build_results(term)
+        cache.set(key, results, getattr(settings, 'AUTOCOMPLETE_CACHE_TIMEOUT', 60))
+    return results
+
+
+# --- Import Services ---
+
+def iter_import_rows(stream, fmt: str):
+    """Yields (line_number, row_dict) pairs from a CSV or JSON-lines stream."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == 'ndjson':
+        for line_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, {'_error': f"Invalid JSON: {e}", '_raw': line}
+                continue
+            if not isinstance(row, dict):
+                row = {'_error': "Expected a JSON object.", '_raw': line}
+            yield line_number, row
+    else:
+        raise ValueError(_("Unsupported import format: %(format)s") % {'format': fmt})
+
+
+# --- Bulk Write Services ---
+
+def find_duplicates(values) -> set:
+    """Returns the values that occur more than once, ignoring empty ones."""
+    seen, duplicates = set(), set()
+    for value in values:
+        if value in (None, ''):
+            continue
+        if value in seen:
+            duplicates.add(value)
+        seen.add(value)
+    return duplicates
+
+
+def apply_bulk_updates(queryset, rows: list, fields, batch_size: int = 500) -> list:
+    """
+    Applies partial updates, given as dicts with an 'id' key, to the matching
+    objects in ``queryset``: one SELECT for every row, then bulk_update in
+    batches. Only keys listed in ``fields`` are applied. Raises ValueError if
+    an id is not in ``queryset``. Returns the updated objects in row order.
+    """
+    objects = queryset.in_bulk([row['id'] for row in rows])
+    missing = [str(row['id']) for row in rows if row['id'] not in objects]
+    if missing:
+        raise ValueError(_("Objects not found: %(ids)s.") % {'ids': ', '.join(missing)})
+
+    changed = set()
+    for row in rows:
+        obj = objects[row['id']]
+        for field in fields:
+            if field in row:
+                setattr(obj, field, row[field])
+                changed.add(field)
+
+    if changed:
+        model = queryset.model
+        if any(f.name == 'updated_at' for f in model._meta.concrete_fields):
+            now = timezone.now()  # bulk_update bypasses auto_now
+            for obj in objects.values():
+                obj.updated_at = now
+            changed.add('updated_at')
+        model._base_manager.bulk_update(list(objects.values()), sorted(changed), batch_size=batch_size)
+    return [objects[row['id']] for row in rows]
+
+
+def raw_delete(queryset) -> int:
+    """
+    Deletes the rows in ``queryset`` with a single DELETE and returns how
+    many went. Unlike QuerySet.delete(), nothing is loaded first and neither
+    signals nor on_delete cascades run, so the caller must already have dealt
+    with every row that references these (and with whatever the skipped
+    signal handlers would have done).
+    """
+    return queryset._raw_delete(queryset.db)
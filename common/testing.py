@@ -0,0 +1,18 @@
+# common/testing.py
+from .instrumentation import check_query_budget, record_queries
+
+
+class QueryBudgetTestMixin:
+    """
+    For TestCase classes: requests a view and fails when it runs more queries
+    than its budget in QUERY_BUDGETS, or repeats one statement shape
+    QUERY_REPEAT_THRESHOLD times or more.
+    """
+
+    def assertWithinQueryBudget(self, url, method='get', data=None, **extra):
+        with record_queries() as queries:
+            response = getattr(self.client, method)(url, data, **extra)
+        problems = check_query_budget(response.resolver_match.view_name, queries)
+        if problems:
+            self.fail('\n'.join(problems) + '\n' + queries.report())
+        return response
@@ -0,0 +1,166 @@
+import tempfile
+from pathlib import Path
+from time import perf_counter
+from unittest import mock
+
+from django.core.handlers.asgi import ASGIHandler
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from apps.accounts.models import User
+from apps.benchmarks.management.commands.profile_report import aggregate_folded
+from apps.billing.models import Invoice
+from apps.customers.models import Customer
+
+from .concurrency import Unavailable, fan_out
+from .db_routers import ReadReplicaRouter, reporting_alias, reporting_reads, replica_scope
+from .middleware import ReadReplicaMiddleware, RequestProfilerMiddleware
+from .profiling import check_profile_token, make_profile_token
+
+
+class RequestProfilingTests(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+
+    def test_profile_token(self):
+        token = make_profile_token()
+        self.assertTrue(check_profile_token(token))
+        self.assertFalse(check_profile_token(token + 'x'))
+        with override_settings(REQUEST_PROFILE_TOKEN_MAX_AGE=-1):
+            self.assertFalse(check_profile_token(token))
+
+    def test_only_the_newest_profiles_are_kept(self):
+        token = make_profile_token()
+        with override_settings(
+            REQUEST_PROFILING=True, REQUEST_PROFILER='sampler', REQUEST_PROFILE_DIR=self.root, REQUEST_PROFILE_KEEP=2,
+        ):
+            middleware = RequestProfilerMiddleware(lambda request: HttpResponse())
+            for _ in range(4):
+                middleware(RequestFactory().get('/', {'__profile': token}))
+            middleware(RequestFactory().get('/', {'__profile': 'forged'}))
+        self.assertEqual(len(list((self.root / 'unresolved').iterdir())), 2)
+
+    def test_aggregate_folded(self):
+        (self.root / 'a.folded').write_text("main;render;draw 3\nmain;query 1\n")
+        (self.root / 'b.folded').write_text("main;render;render 2\n")
+        total, own, inclusive = aggregate_folded(sorted(self.root.iterdir()))
+        self.assertEqual(total, 6)
+        self.assertEqual(own, {'draw': 3, 'query': 1, 'render': 2})
+        self.assertEqual(inclusive['main'], 6)
+        self.assertEqual(inclusive['render'], 5)  # Counted once per stack despite the recursion
+
+
+@override_settings(REPORTING_DATABASE='replica', REPLICA_MAX_STALENESS=60)
+class ReadReplicaRouterTests(SimpleTestCase):
+
+    def setUp(self):
+        patcher = mock.patch('common.db_routers.replica_age', return_value=5.0)
+        self.replica_age = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.router = ReadReplicaRouter()
+
+    def test_reporting_reads_go_to_a_fresh_replica(self):
+        with replica_scope():
+            self.assertEqual(self.router.db_for_read(Invoice), 'default')
+            with reporting_reads():
+                self.assertEqual(self.router.db_for_read(Invoice), 'replica')
+                self.assertEqual(self.router.db_for_read(User), 'default')  # Logins never lag
+
+    def test_stale_or_missing_replica_falls_back_to_the_primary(self):
+        with replica_scope():
+            self.replica_age.return_value = 61.0
+            self.assertEqual(reporting_alias(), 'default')
+            self.replica_age.return_value = None
+            self.assertEqual(reporting_alias(), 'default')
+            with override_settings(REPORTING_DATABASE=None):
+                self.replica_age.return_value = 0.0
+                self.assertEqual(reporting_alias(), 'default')
+
+    def test_reads_stay_on_the_primary_after_a_write_until_the_scope_ends(self):
+        with replica_scope() as wrote:
+            self.router.db_for_write(Invoice)
+            self.assertTrue(wrote())
+            self.assertEqual(reporting_alias(), 'default')
+        with replica_scope() as wrote:
+            self.assertFalse(wrote())
+            self.assertEqual(reporting_alias(), 'replica')
+
+    def test_middleware_pins_clients_that_wrote(self):
+        seen = []
+
+        def view(request):
+            seen.append(reporting_alias())
+            if request.method == 'POST':
+                self.router.db_for_write(Invoice)
+            return HttpResponse()
+
+        middleware = ReadReplicaMiddleware(view)
+        response = middleware(RequestFactory().post('/'))
+        self.assertIn(ReadReplicaMiddleware.cookie_name, response.cookies)
+
+        request = RequestFactory().get('/')
+        request.COOKIES[ReadReplicaMiddleware.cookie_name] = '1'
+        self.assertNotIn(ReadReplicaMiddleware.cookie_name, middleware(request).cookies)
+        middleware(RequestFactory().get('/'))
+        self.assertEqual(seen, ['replica', 'default', 'replica'])
+
+
+@override_settings(QUERY_INSTRUMENTATION=True, REQUEST_PROFILING=True, REPORTING_DATABASE='replica')
+class AsyncMiddlewareTests(TestCase):
+
+    @override_settings(DEBUG=True)  # Adaptation is only logged in debug mode
+    def test_no_middleware_is_adapted_under_asgi(self):
+        with self.assertNoLogs('django.request', 'DEBUG'):
+            ASGIHandler()
+
+    async def test_queries_are_recorded_under_asgi(self):
+        user = await User.objects.acreate(email='staff@example.com', is_staff=True)
+        await self.async_client.aforce_login(user)
+        response = await self.async_client.get(reverse('invoice-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('desc="0 queries"', response['Server-Timing'])
+
+
+def _count_customers():
+    return Customer.objects.count()
+
+
+def _slow_query():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < 20000000) "  # About 8s
+            "SELECT count(*) FROM n"
+        )
+        return cursor.fetchone()
+
+
+def _fail():
+    raise RuntimeError("widget broke")
+
+
+class FanOutTests(TransactionTestCase):
+    # Threaded fan-out only happens outside a transaction, so not in a TestCase
+
+    def setUp(self):
+        Customer.objects.create(name='Customer', email='customer@example.com')
+
+    def test_tasks_run_on_the_pool_and_failures_stay_isolated(self):
+        results = fan_out({'count': _count_customers, 'broken': _fail}, timeout=5, workers=2)
+        self.assertEqual(results['count'], 1)
+        self.assertIsInstance(results['broken'], Unavailable)
+        self.assertEqual(results['broken'].reason, "widget broke")
+
+    def test_overrunning_query_is_interrupted_and_frees_its_thread(self):
+        started = perf_counter()
+        results = fan_out({'slow': _slow_query}, timeout=0.3, workers=1)
+        self.assertIsInstance(results['slow'], Unavailable)
+
+        # The single pool thread is free again almost at once
+        results = fan_out({'count': _count_customers}, timeout=2, workers=1)
+        self.assertEqual(results['count'], 1)
+        self.assertLess(perf_counter() - started, 2)
@@ -0,0 +1,60 @@
+"""
+Optional warmup for freshly started worker processes.
+
+Views import their heavy dependencies on first use, so a worker that never
+renders a PDF never loads ReportLab. The flip side is that the first request
+of each kind pays for those imports. warm_up_worker() moves that cost to the
+moment a worker starts, for the work it is expected to do. config/gunicorn.py
+calls it once each worker has loaded the application; set WORKER_WARMUP_PDF=1
+only on the workers that serve PDF traffic.
+"""
+import logging
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.template import engines
+from django.template.loader import get_template
+
+logger = logging.getLogger(__name__)
+
+
+def _template_names():
+    """The project's own templates (TEMPLATES "DIRS"), not those shipped with installed apps."""
+    names = []
+    for engine in engines.all():
+        for directory in engine.dirs:
+            directory = Path(directory)
+            names.extend(
+                path.relative_to(directory).as_posix() for path in sorted(directory.rglob('*.html'))
+            )
+    return names
+
+
+def warm_up_templates(names=None) -> int:
+    """Compiles templates into the cached loader and returns how many were loaded."""
+    loaded = 0
+    for name in names if names is not None else _template_names():
+        get_template(name)
+        loaded += 1
+    return loaded
+
+
+def warm_up_worker(pdf: bool = None):
+    """
+    Preloads the templates (WORKER_WARMUP_TEMPLATES, or all of them when None)
+    and, when ``pdf`` is true or WORKER_WARMUP_PDF is set, ReportLab and the
+    PDF stylesheet.
+    """
+    started = time.perf_counter()
+    templates = warm_up_templates(settings.WORKER_WARMUP_TEMPLATES)
+    if pdf is None:
+        pdf = settings.WORKER_WARMUP_PDF
+    if pdf:
+        from apps.billing.utils import warm_up_pdf_rendering
+
+        warm_up_pdf_rendering()
+    logger.info(
+        "Worker warmed up in %.0f ms (%d templates%s)",
+        (time.perf_counter() - started) * 1000, templates, ", PDF rendering" if pdf else "",
+    )
@@ -0,0 +1,44 @@
+# common/widgets.py
+
+from django import forms
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+
+
+class AutocompleteSelect(forms.Select):
+    """
+    A select box that only renders the currently selected option.
+
+    The remaining options are fetched on demand from a JSON endpoint returning
+    ``{"results": [{"id": ..., "text": ...}]}``, so rendering the form costs
+    the same no matter how many rows the field's queryset contains. The form
+    field still validates the submitted pk against its queryset.
+    """
+
+    class Media:
+        js = ('js/autocomplete.js',)
+
+    def __init__(self, url, attrs=None):
+        self.url = url
+        super().__init__(attrs)
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['attrs']['data-autocomplete-url'] = reverse(self.url)
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        """Only look up the selected value instead of iterating every choice."""
+        selected = {str(v) for v in value if v not in (None, '')}
+        options = [self.create_option(name, '', '---------', not selected, 0)]
+        if selected:
+            try:
+                selected_objects = list(self.choices.queryset.filter(pk__in=selected))
+            except (ValueError, TypeError, ValidationError):
+                selected_objects = []  # Garbage was posted; the field reports the error
+            for index, obj in enumerate(selected_objects, start=1):
+                options.append(self.create_option(
+                    name, self.choices.field.prepare_value(obj),
+                    self.choices.field.label_from_instance(obj), True, index,
+                ))
+        return [(None, options, 0)]
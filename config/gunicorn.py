@@ -0,0 +1,111 @@
+"""
+Gunicorn deployment profile.
+
+    gunicorn -c config/gunicorn.py
+
+Every setting can be overridden from the environment (GUNICORN_*), so the
+same file serves every deployment. With preload (the default), the master
+imports Django, the URLconf and every view, and compiles the project
+templates once before forking. The workers share those pages copy-on-write
+instead of each building its own copy. Compare both modes with
+``manage.py benchmark_gunicorn``.
+
+Worker classes (GUNICORN_WORKER_CLASS):
+
+    sync     one request at a time per worker (default)
+    gthread  GUNICORN_THREADS requests per worker on threads; keep
+             SQLITE_CONN_MAX_AGE in mind, each thread holds a connection
+    uvicorn  serves config.asgi with the async PDF and email views
+             (ASYNC_VIEWS); needs the uvicorn-worker package
+"""
+import gc
+import multiprocessing
+import os
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+WORKER_CLASSES = {
+    "sync": "sync",
+    "gthread": "gthread",
+    "uvicorn": "uvicorn_worker.UvicornWorker",
+}
+WORKER_PROFILE = os.environ.get("GUNICORN_WORKER_CLASS", "sync")
+if WORKER_PROFILE not in WORKER_CLASSES:
+    raise RuntimeError(f"GUNICORN_WORKER_CLASS must be one of {', '.join(WORKER_CLASSES)}, not {WORKER_PROFILE!r}")
+if WORKER_PROFILE == "uvicorn":
+    os.environ.setdefault("ASYNC_VIEWS", "1")
+
+# --- Server ---
+bind = os.environ.get("GUNICORN_BIND", f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+wsgi_app = "config.asgi:application" if WORKER_PROFILE == "uvicorn" else "config.wsgi:application"
+worker_class = WORKER_CLASSES[WORKER_PROFILE]
+workers = _env_int("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1)
+threads = _env_int("GUNICORN_THREADS", 4 if WORKER_PROFILE == "gthread" else 1)
+timeout = _env_int("GUNICORN_TIMEOUT", 30)
+graceful_timeout = _env_int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+keepalive = _env_int("GUNICORN_KEEPALIVE", 5)
+accesslog = os.environ.get("GUNICORN_ACCESSLOG", "-") or None  # empty disables it
+
+# --- Preloading ---
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+
+# Freezing moves everything the master built into the permanent generation,
+# so the workers' garbage collections never write to (and so never copy) the
+# shared pages. Collection stays off in the master until then so that no
+# holes are punched into those pages either.
+GC_FREEZE = preload_app and os.environ.get("GUNICORN_GC_FREEZE", "") == "1"
+if GC_FREEZE:
+    gc.disable()
+
+# --- Recycling ---
+# Restart a worker after this many requests, spread by a random jitter so the
+# workers do not all restart at once. Bounds slow leaks and fragmentation.
+max_requests = _env_int("GUNICORN_MAX_REQUESTS", 1000)
+max_requests_jitter = _env_int("GUNICORN_MAX_REQUESTS_JITTER", 100)
+
+
+def when_ready(server):
+    """Runs in the master after the preload, just before the first fork."""
+    if not preload_app:
+        return
+    from django.db import connections
+    from django.urls import get_resolver
+
+    from common.warmup import warm_up_templates
+
+    # Import every view now rather than on each worker's first request
+    get_resolver().url_patterns
+    templates = warm_up_templates()
+    # A connection must never be shared across fork()
+    connections.close_all()
+    server.log.info("Preloaded the URLconf and %d templates", templates)
+    if GC_FREEZE:
+        gc.freeze()
+        server.log.info("Froze %d objects before forking", gc.get_freeze_count())
+
+
+def post_fork(server, worker):
+    """Runs in each new worker straight after the fork."""
+    if GC_FREEZE:
+        gc.enable()
+    if preload_app:
+        from django.db import connections
+
+        # Drop any connection inherited from the master; each worker opens its own
+        connections.close_all()
+
+
+def post_worker_init(worker):
+    """Runs in each worker once the application is loaded, before it accepts requests."""
+    from django.urls import get_resolver
+
+    from common.warmup import warm_up_worker
+
+    # Both are already done, and shared, when the master preloaded
+    get_resolver().url_patterns
+    warm_up_worker()
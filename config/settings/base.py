@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
+from datetime import timedelta
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,6 +45,9 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
 
+    # Third-party apps
+    'rest_framework',
+
     # Local apps
     'apps.accounts',
     'apps.customers',
@@ -50,14 +55,21 @@ INSTALLED_APPS = [
     'apps.billing',
     'apps.payments',
     'apps.reports',
+    'apps.api',
+    'apps.benchmarks',
+    'apps.archive',
+    'common.jobs',
 ]
 
 MIDDLEWARE = [
+    "common.middleware.RequestProfilerMiddleware",
+    "common.middleware.QueryInstrumentationMiddleware",
+    "common.middleware.ReadReplicaMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "apps.accounts.middleware.CachedAuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -93,6 +105,42 @@ WSGI_APPLICATION = "config.wsgi.application"
 #     }
 # }
 
+# SQLite tuning shared by the local and production DATABASES: WAL lets
+# readers run alongside a writer, BEGIN IMMEDIATE takes the write lock at the
+# start of every transaction.atomic() block (a deferred transaction that
+# upgrades to a write fails with "database is locked" without waiting), and
+# "timeout" is the busy timeout in seconds. Connections are kept for
+# CONN_MAX_AGE so the pragmas run once per worker, not once per request.
+
+SQLITE_OPTIONS = {
+    "init_command": (
+        "PRAGMA journal_mode=WAL;"
+        "PRAGMA synchronous=NORMAL;"
+        "PRAGMA mmap_size=268435456;"  # 256 MB
+        "PRAGMA cache_size=-65536;"  # 64 MB
+        "PRAGMA temp_store=MEMORY;"
+    ),
+    "transaction_mode": "IMMEDIATE",
+    "timeout": 20,
+}
+SQLITE_CONN_MAX_AGE = 600
+
+# Read replica for reports and exports (see common.db_routers). Reads inside
+# reporting_reads() and the queries in apps.reports.services go to the
+# REPORTING_DATABASE alias while it is at most REPLICA_MAX_STALENESS seconds
+# old; otherwise, and for REPLICA_PIN_SECONDS after a client writes, they use
+# the primary. Locally the replica is a SQLite copy kept up to date by the
+# refresh_read_replica command.
+
+DATABASE_ROUTERS = ["common.db_routers.ReadReplicaRouter"]
+REPORTING_DATABASE = "replica"
+REPLICA_MAX_STALENESS = 5 * 60
+REPLICA_PIN_SECONDS = 60
+SQLITE_REPLICA_OPTIONS = {
+    "init_command": "PRAGMA query_only=ON;PRAGMA mmap_size=268435456;PRAGMA cache_size=-65536;",
+    "timeout": 20,
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -129,8 +177,199 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/4.2/howto/static-files/
 
 STATIC_URL = "static/"
+STATICFILES_DIRS = [BASE_DIR / 'static']
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# Caches
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# 'default' is private to each process; 'shared' is visible to every worker
+# on the host and carries cross-process version stamps.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "shared": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / ".cache" / "shared",
+    },
+    "sessions": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / ".cache" / "sessions",
+    },
+}
+
+
+# Sessions
+# SESSION_TIER picks where sessions live:
+#   "db"            one SELECT per request, plus an UPDATE when modified
+#   "cached_db"     reads from the host-wide 'sessions' cache, writes through
+#                   to the database (the default)
+#   "signed_cookie" no server-side storage; sessions cannot be revoked
+#                   before they expire and are limited to ~4 KB
+
+SESSION_TIER = os.environ.get("SESSION_TIER", "cached_db")
+SESSION_ENGINE = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookie": "django.contrib.sessions.backends.signed_cookies",
+}[SESSION_TIER]
+SESSION_CACHE_ALIAS = "sessions"
+
+# Per-process cache of the logged-in accounts.User row (see
+# apps.accounts.middleware). Seconds another worker may keep serving a user
+# changed elsewhere; 0 disables it.
+USER_CACHE_ALIAS = "default"
+USER_CACHE_TIMEOUT = 30
+
+# Catalog cache (see apps.catalog.cache)
+CATALOG_CACHE_ALIAS = "shared"
+CATALOG_CACHE_VERSION_CHECK = 1.0  # seconds between version stamp reads
+CATALOG_CACHE_MAX_ENTRIES = 10000
+
+
+# Query instrumentation (see common.middleware.QueryInstrumentationMiddleware)
+# Per-view query budgets, keyed on URL name, are enforced in tests by
+# common.testing.QueryBudgetTestMixin and logged at runtime when enabled.
+
+QUERY_INSTRUMENTATION = os.environ.get("QUERY_INSTRUMENTATION", "") == "1"
+QUERY_REPEAT_THRESHOLD = 5  # same statement shape this often in one request looks like an N+1
+DEFAULT_QUERY_BUDGET = 20
+QUERY_BUDGETS = {
+    "dashboard": 12,
+    "customer-list": 4,
+    "customer-detail": 4,
+    "product-list": 4,
+    "invoice-list": 4,
+    "invoice-detail": 6,
+    "payment-list": 4,
+}
+
+
+# Request profiling (see common.middleware.RequestProfilerMiddleware)
+# Profiles REQUEST_PROFILE_RATE of the requests to REQUEST_PROFILE_VIEWS (all
+# views when empty), plus any request sent with ?__profile=<token> from the
+# profile_token command. Summarise the dumps with the profile_report command.
+# Only the newest REQUEST_PROFILE_KEEP dumps per view are kept.
+
+REQUEST_PROFILING = os.environ.get("REQUEST_PROFILING", "") == "1"
+REQUEST_PROFILER = os.environ.get("REQUEST_PROFILER", "sampler")  # "sampler" or "cprofile"
+REQUEST_PROFILE_RATE = float(os.environ.get("REQUEST_PROFILE_RATE", "0.01"))
+REQUEST_PROFILE_VIEWS = ["dashboard", "invoice-download-pdf"]
+REQUEST_PROFILE_DIR = BASE_DIR / ".profiles"
+REQUEST_PROFILE_KEEP = 200
+REQUEST_PROFILE_SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+REQUEST_PROFILE_TOKEN_MAX_AGE = 60 * 60
+
+
+# Worker warmup (see common.warmup)
+# Run from the server's post-fork hook. Templates to compile up front (all of
+# them when None); ReportLab is only preloaded where WORKER_WARMUP_PDF=1, i.e.
+# on the workers that serve PDF downloads. Compare startup costs with the
+# import_times command.
+
+WORKER_WARMUP_TEMPLATES = None
+WORKER_WARMUP_PDF = os.environ.get("WORKER_WARMUP_PDF", "") == "1"
+
+
+# Async PDF view (see apps.billing.async_views)
+# Set ASYNC_VIEWS=1 when serving config.asgi. PDFs then render in a pool of
+# PDF_RENDER_PROCESSES processes. Requests beyond PDF_RENDER_MAX_PENDING get
+# a 503 with Retry-After instead of queueing.
+
+ASYNC_VIEWS = os.environ.get("ASYNC_VIEWS", "") == "1"
+PDF_RENDER_PROCESSES = int(os.environ.get("PDF_RENDER_PROCESSES", "2"))
+PDF_RENDER_MAX_PENDING = 16  # per server process, running plus queued
+PDF_RENDER_TIMEOUT = 30  # seconds
+
+
+# Dashboard fan-out (see common.concurrency.fan_out)
+# The dashboard widgets run concurrently on a pool of this many threads per
+# process, each with its own connection; 0 runs them one after another. A
+# widget still running after the timeout is shown as unavailable.
+
+DASHBOARD_FANOUT_WORKERS = int(os.environ.get("DASHBOARD_FANOUT_WORKERS", "4"))
+DASHBOARD_WIDGET_TIMEOUT = 2.0  # seconds
+
+
+# Background jobs (see common.jobs)
+# Run the queue with the run_workers command. A failed job is retried after
+# JOBS_RETRY_BACKOFF seconds, doubling per attempt up to JOBS_RETRY_BACKOFF_MAX.
+# A job running for longer than JOBS_LOCK_TIMEOUT is assumed to have lost its
+# worker and is queued again, so keep it above the slowest job.
+
+JOBS_POLL_INTERVAL = 1.0  # seconds an idle worker waits
+JOBS_RETRY_BACKOFF = 10
+JOBS_RETRY_BACKOFF_MAX = 60 * 60
+JOBS_LOCK_TIMEOUT = 15 * 60
+
+
+# Invoice archive (see apps.archive)
+# The archive_invoices command moves paid and cancelled invoices issued more
+# than ARCHIVE_AFTER_MONTHS months ago into the archive tables, with their
+# items and payments, ARCHIVE_CHUNK_SIZE invoices per transaction. Reports
+# re-check how far back the archive reaches every
+# ARCHIVE_HORIZON_CACHE_SECONDS, or as soon as an archive run bumps the
+# version stamp in ARCHIVE_CACHE_ALIAS.
+
+ARCHIVE_AFTER_MONTHS = 24
+ARCHIVE_CHUNK_SIZE = 500
+ARCHIVE_HORIZON_CACHE_SECONDS = 60
+ARCHIVE_CACHE_ALIAS = "shared"
+
+
+# Stock reservations
+# Seconds a reservation on a draft invoice holds stock before the
+# release_expired_reservations command may give it back.
+
+STOCK_RESERVATION_TTL = 24 * 60 * 60
+
+
+# Stale draft purge
+# The purge_stale_drafts command deletes drafts older than STALE_DRAFT_AGE_DAYS
+# that have no items and no payments, DRAFT_PURGE_BATCH_SIZE per transaction
+# with a DRAFT_PURGE_PAUSE second pause between batches.
+
+STALE_DRAFT_AGE_DAYS = 30
+DRAFT_PURGE_BATCH_SIZE = 500
+DRAFT_PURGE_PAUSE = 0.1
+
+
+# Autocomplete
+# Seconds a prefix search result stays cached for the invoice form pickers.
+
+AUTOCOMPLETE_CACHE_TIMEOUT = 60
+
+
+# REST API (/api/v1/, see apps.api)
+
+REST_FRAMEWORK = {
+    "DEFAULT_AUTHENTICATION_CLASSES": [
+        "apps.api.authentication.ApiJWTAuthentication",
+        "rest_framework.authentication.SessionAuthentication",
+    ],
+    "DEFAULT_PERMISSION_CLASSES": [
+        "rest_framework.permissions.IsAuthenticated",
+    ],
+    "DEFAULT_PAGINATION_CLASS": "apps.api.pagination.ApiCursorPagination",
+    "PAGE_SIZE": 50,
+}
+
+# JWT access for machine clients (see apps.api.authentication). Tokens carry
+# the role claims, so a request with a valid access token needs no session
+# or user query; role changes apply from the next refresh.
+
+SIMPLE_JWT = {
+    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5),
+    "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
+    "AUTH_HEADER_TYPES": ("Bearer",),
+    "UPDATE_LAST_LOGIN": False,
+    "TOKEN_USER_CLASS": "apps.api.authentication.ApiTokenUser",
+    "TOKEN_OBTAIN_SERIALIZER": "apps.api.authentication.ApiTokenObtainSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "apps.api.authentication.ApiTokenRefreshSerializer",
+}
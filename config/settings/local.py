@@ -9,11 +9,29 @@ DEBUG = True
 
 ALLOWED_HOSTS = []
 
+# Server-Timing headers and query budget warnings on every request
+QUERY_INSTRUMENTATION = True
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'OPTIONS': SQLITE_OPTIONS,
+        'CONN_MAX_AGE': SQLITE_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        # A file, not the in-memory default: shared-cache memory databases fail
+        # concurrent writers at once instead of waiting, which breaks the
+        # threaded worker tests in common.jobs
+        'TEST': {'NAME': BASE_DIR / 'db.test.sqlite3'},
+    },
+    # Reporting copy refreshed by the refresh_read_replica command. Connections
+    # are not kept, so each request sees the latest copy.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.replica.sqlite3',
+        'OPTIONS': SQLITE_REPLICA_OPTIONS,
+        'TEST': {'MIRROR': 'default'},
+    },
 }
 
 
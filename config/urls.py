@@ -41,6 +41,9 @@ urlpatterns = [
 
     # Placeholder for future reports
     path('reports/', include('apps.reports.urls')), 
+
+    # Versioned REST API
+    path('api/v1/', include('apps.api.urls')),
 ]
 
 # Serve media and static files during development
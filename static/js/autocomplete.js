@@ -0,0 +1,39 @@
+// Turns <select data-autocomplete-url="..."> elements into type-ahead pickers.
+// The select keeps its name, so the form still posts a plain primary key.
+document.addEventListener('DOMContentLoaded', function () {
+    document.querySelectorAll('select[data-autocomplete-url]').forEach(function (select) {
+        var search = document.createElement('input');
+        search.type = 'search';
+        search.placeholder = 'Type to search...';
+        search.autocomplete = 'off';
+        select.parentNode.insertBefore(search, select);
+
+        var timer = null;
+        var latest = 0;
+        search.addEventListener('input', function () {
+            clearTimeout(timer);
+            var term = search.value.trim();
+            if (!term) { return; }
+            timer = setTimeout(function () {
+                var request = ++latest;
+                var url = select.dataset.autocompleteUrl + '?q=' + encodeURIComponent(term);
+                fetch(url, {headers: {'Accept': 'application/json'}})
+                    .then(function (response) { return response.json(); })
+                    .then(function (data) {
+                        if (request !== latest) { return; } // A newer search is in flight
+                        var current = select.value;
+                        select.innerHTML = '';
+                        select.appendChild(new Option('---------', ''));
+                        data.results.forEach(function (item) {
+                            var option = new Option(item.text, item.id);
+                            option.selected = String(item.id) === current;
+                            select.appendChild(option);
+                        });
+                        if (data.results.length && !select.value) {
+                            select.selectedIndex = 1;
+                        }
+                    });
+            }, 200);
+        });
+    });
+});